@@ -0,0 +1,501 @@
+import copy
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+import cv2
+import numpy as np
+
+from pipeline import FramePipeline, combine
+from scenes import SCENE_DETECTION, SCENE_THUMBNAIL_GUARD, SceneHistogram, detect_cuts, scene_summary
+from screening import create_screener
+from thumbnails import THUMBNAIL_SIZES, ThumbnailCollector, cached_thumbnails, write_thumbnails
+from timeline import save_timeline, timeline_path_for
+
+# Tam çözünürlükte kalibre edilmiş varsayılan değerler
+BLUR_KERNEL = 21
+DIFF_THRESHOLD = 25
+MOTION_THRESHOLD = 1000  # eşiklenmiş karenin (0/255) toplamı
+
+
+@dataclass(frozen=True)
+class AnalysisProfile:
+    """Hareket analizinin hız/doğruluk dengesi.
+
+    frame_step: her N. kareyi analiz et (target_fps verilirse ondan hesaplanır)
+    target_fps: saniyede analiz edilecek kare sayısı
+    max_width: analizden önce kareler bu genişliğe küçültülür
+    keyframes_only: yalnızca anahtar kareleri çöz (ffmpeg gerekir)
+    """
+    name: str
+    frame_step: int = 1
+    target_fps: Optional[float] = None
+    max_width: Optional[int] = None
+    keyframes_only: bool = False
+
+    def step_for(self, fps: float) -> int:
+        if self.target_fps and fps > 0:
+            return max(1, int(round(fps / self.target_fps)))
+        return max(1, self.frame_step)
+
+
+PROFILES = {
+    "full": AnalysisProfile("full"),
+    "balanced": AnalysisProfile("balanced", target_fps=10, max_width=640),
+    "fast": AnalysisProfile("fast", target_fps=5, max_width=320),
+    "keyframe": AnalysisProfile("keyframe", max_width=320, keyframes_only=True),
+}
+
+DEFAULT_PROFILE = os.getenv("ANALYSIS_PROFILE", "full")
+
+# Segment paralelliği: 1 ise analiz çağıran thread'de sıralı çalışır
+ANALYSIS_PROCESSES = int(os.getenv("ANALYSIS_PROCESSES", "1"))
+MIN_SEGMENT_FRAMES = int(os.getenv("ANALYSIS_MIN_SEGMENT_FRAMES", "300"))
+
+# ffmpeg showinfo satırlarındaki sunum zamanı (saniye)
+SHOWINFO_PTS = re.compile(rb"Parsed_showinfo.*\bpts_time:\s*(-?[\d.]+)")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    # OpenCV ve thread'lerle güvenli olması için spawn kullanılır
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=ANALYSIS_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+@dataclass(frozen=True)
+class ScanParams:
+    width: int
+    height: int
+    ksize: int
+    resize: bool
+    step: int
+    scenes: bool = False  # kesme tespiti için örnekler arası histogram uzaklığı da ölçülür
+
+
+def get_profile(profile=None) -> AnalysisProfile:
+    if isinstance(profile, AnalysisProfile):
+        return profile
+    name = profile or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Bilinmeyen analiz profili: {name}")
+    return PROFILES[name]
+
+
+def analysis_size(width: int, height: int, max_width: Optional[int]):
+    # En-boy oranını koruyarak analiz çözünürlüğünü hesapla (çift sayılara yuvarlanır)
+    if not max_width or width <= max_width:
+        return width, height
+    scale = max_width / width
+    return max_width - max_width % 2, max(2, int(round(height * scale)) & ~1)
+
+
+def blur_kernel_for(scale: float) -> int:
+    # Bulanıklaştırma çekirdeği çözünürlükle orantılı küçülür, tek sayı kalmalı
+    k = int(round(BLUR_KERNEL * scale))
+    return max(3, k | 1)
+
+
+def sampled_frames(cap, step: int, start: int = 0, end: Optional[int] = None) -> Iterator[np.ndarray]:
+    # `start`tan itibaren her `step`. kare; atlananlar grab() ile yalnızca demux edilir
+    index = start
+    while end is None or index < end:
+        ret, frame = cap.read()
+        if not ret:
+            return
+        yield frame
+        for _ in range(step - 1):
+            if not cap.grab():
+                return
+        index += step
+
+
+def changed_pixels(thresh: np.ndarray, diff: np.ndarray) -> int:
+    # Eşiklenmiş maskenin 0/255 toplamıyla aynı birimde, ama toplama yapmadan
+    return cv2.countNonZero(thresh) * 255
+
+
+def mean_difference(thresh: np.ndarray, diff: np.ndarray) -> float:
+    # Eşikten bağımsız ortalama parlaklık farkı
+    return cv2.mean(diff)[0]
+
+
+class MotionDetector:
+    """Ardışık kareler arasındaki hareketi ölçer.
+
+    Ara görüntüler (küçültülmüş, gri, bulanık, fark, eşik) bir kez ayrılır ve
+    OpenCV'nin `dst=` çıktılarıyla her karede yeniden kullanılır. `metric`
+    eşiklenmiş maske ve fark görüntüsünden tek bir sayı üretir. `params.scenes`
+    açıksa aynı karelerden histogram uzaklıkları `distances`'ta biriktirilir.
+    """
+
+    def __init__(self, params: ScanParams,
+                 metric: Callable[[np.ndarray, np.ndarray], float] = changed_pixels):
+        self.params = params
+        self.metric = metric
+        shape = (params.height, params.width)
+        self._dsize = (params.width, params.height)
+        self._ksize = (params.ksize, params.ksize)
+        self._small = np.empty(shape + (3,), np.uint8) if params.resize else None
+        self._gray = np.empty(shape, np.uint8)
+        self._prev = np.empty(shape, np.uint8)
+        self._cur = np.empty(shape, np.uint8)
+        self._diff = np.empty(shape, np.uint8)
+        self._thresh = np.empty(shape, np.uint8)
+        self._primed = False
+        self.scenes = SceneHistogram() if params.scenes else None
+        self.distances = []
+
+    def reset(self):
+        self._primed = False
+        if self.scenes is not None:
+            self.scenes.reset()
+
+    def update(self, frame: np.ndarray) -> Optional[float]:
+        """Kareyi işler; ilk karede None, sonrakilerde önceki kareye göre metriği döner."""
+        if frame.ndim == 3 and self._small is not None:
+            frame = self._small = cv2.resize(
+                frame, self._dsize, dst=self._small, interpolation=cv2.INTER_AREA
+            )
+        # Kesme histogramı analiz çözünürlüğündeki renkli kareden
+        distance = self.scenes.update(frame) if self.scenes is not None else None
+        if frame.ndim == 3:
+            frame = self._gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        self._cur = cv2.GaussianBlur(frame, self._ksize, 0, dst=self._cur)
+
+        value = None
+        if self._primed:
+            self._diff = cv2.absdiff(self._prev, self._cur, dst=self._diff)
+            self._thresh = cv2.threshold(
+                self._diff, DIFF_THRESHOLD, 255, cv2.THRESH_BINARY, dst=self._thresh
+            )[1]
+            value = self.metric(self._thresh, self._diff)
+            if self.scenes is not None:
+                self.distances.append(distance)
+        self._primed = True
+        self._prev, self._cur = self._cur, self._prev
+        return value
+
+
+class MotionScan:
+    """Hareket dedektörünü kare boru hattına analizci olarak bağlar; metrikler `changed`'de birikir."""
+
+    def __init__(self, detector: MotionDetector):
+        self.detector = detector
+        self.changed = []
+
+    def observe(self, index: int, frame: np.ndarray):
+        value = self.detector.update(frame)
+        if value is not None:
+            self.changed.append(value)
+
+
+def indexed_frames(cap, step: int, start: int = 0, end: Optional[int] = None) -> Iterator[tuple]:
+    # Boru hattı kaynağı: (kare indisi, kare)
+    for k, frame in enumerate(sampled_frames(cap, step, start, end)):
+        yield start + k * step, frame
+
+
+def scan_segment(video_path: str, params: ScanParams, start: int, end: Optional[int],
+                 analyzers: Optional[dict] = None) -> tuple:
+    """[start, end) aralığındaki örnekleri tarar.
+
+    Segment sınırındaki farkın kaybolmaması için bir önceki örnek de çözülür ve
+    ilk karşılaştırmada kullanılır; böylece segmentlerin sonuçları art arda
+    eklendiğinde sıralı taramayla aynı olur. `analyzers` ana süreçte `seek`
+    ile konumlanmış ek analizcilerdir (küçük resim, görsel tarama); aynı
+    karelerle doldurulup geri döner. (metrikler, histogram uzaklıkları,
+    analizciler, aşama süreleri) döner.
+    """
+    analyzers = analyzers or {}
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError("Video açılamadı")
+    try:
+        detector = MotionDetector(params)
+        if start > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start - params.step)
+            ret, frame = cap.read()
+            if not ret:
+                return [], [], analyzers, None
+            detector.update(frame)
+            for _ in range(params.step - 1):
+                cap.grab()
+        pipeline = FramePipeline()
+        motion = pipeline.add("motion", MotionScan(detector))
+        for name, analyzer in analyzers.items():
+            pipeline.add(name, analyzer)
+        stages = pipeline.run(indexed_frames(cap, params.step, start, end), complete=end is None)
+        return motion.changed, detector.distances, analyzers, stages
+    finally:
+        cap.release()
+
+
+def segment_bounds(frame_count: int, step: int, segments: int) -> list:
+    # Sınırlar örnekleme adımının katlarına hizalanır; son segment dosya sonuna kadar gider
+    samples = -(-frame_count // step)
+    per_segment = -(-samples // segments)
+    bounds = []
+    for i in range(segments):
+        start = i * per_segment * step
+        if start >= frame_count:
+            break
+        bounds.append(start)
+    return [(start, bounds[i + 1] if i + 1 < len(bounds) else None) for i, start in enumerate(bounds)]
+
+
+def keyframe_frames(video_path: str, width: int, height: int, fps: float, frame_count: int) -> Iterator[tuple]:
+    """ffmpeg ile yalnızca anahtar kareleri renkli çözer; (kare indisi, kare) üretir.
+
+    İndisler showinfo filtresinin stderr'e yazdığı zaman damgalarından
+    (ilk kareye göre) hesaplanır, böylece küçük resim ve görsel tarama
+    hedeflerine oturur.
+    """
+    cmd = [
+        "ffmpeg", "-hide_banner", "-nostats", "-v", "info", "-skip_frame", "nokey", "-i", video_path,
+        "-vsync", "vfr", "-vf", f"showinfo,scale={width}:{height}", "-pix_fmt", "bgr24",
+        "-f", "rawvideo", "-",
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    times = queue.Queue()
+
+    def read_times():
+        # stderr sürekli boşaltılır ki ffmpeg dolu boruda takılmasın
+        for line in proc.stderr:
+            match = SHOWINFO_PTS.search(line)
+            if match:
+                times.put(float(match.group(1)))
+        times.put(None)
+
+    reader = threading.Thread(target=read_times, name="keyframe-times", daemon=True)
+    reader.start()
+    frame_size = width * height * 3
+    first = None
+    last = -1
+    try:
+        while True:
+            data = proc.stdout.read(frame_size)
+            if len(data) < frame_size:
+                break
+            pts_time = times.get()
+            if pts_time is None:
+                break
+            first = pts_time if first is None else first
+            index = min(int(round((pts_time - first) * fps)), max(frame_count - 1, 0))
+            if index <= last:
+                continue
+            last = index
+            yield index, np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+    finally:
+        proc.stdout.close()
+        proc.kill()
+        proc.wait()
+        reader.join()
+
+
+def analyze_video(video_path: str, profile=None, processes: Optional[int] = None,
+                  thumbnail_key: Optional[str] = None) -> dict:
+    """Hareket analizini yapar; küçük resimler, görsel tarama ve sahne kesmeleri aynı taramada çıkarılır.
+
+    Video bir kez çözülür ve kareler `FramePipeline` ile kayıtlı analizcilere
+    dağıtılır; aşama süreleri sonuçta `pipeline` altında raporlanır.
+    `thumbnail_key` küçük resimlerin önbellek anahtarıdır (içerik özeti);
+    verilmezse küçük resim üretilmez.
+    """
+    profile = get_profile(profile)
+    processes = ANALYSIS_PROCESSES if processes is None else processes
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError("Video açılamadı")
+
+    # Video özellikleri
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    # Analiz çözünürlüğü ve ona göre ölçeklenen eşikler. Hareket yoğunluğu tam
+    # çözünürlük eşdeğerine çevrilir, böylece profiller arası karşılaştırılabilir.
+    analysis_width, analysis_height = analysis_size(width, height, profile.max_width)
+    scale = analysis_width / width if width else 1.0
+    area_scale = (width * height) / (analysis_width * analysis_height) if width else 1.0
+    ksize = blur_kernel_for(scale)
+    resize = (analysis_width, analysis_height) != (width, height)
+
+    # Küçük resimler içerik anahtarına göre önbelleklenir; yoksa tarama
+    # sırasında görülen karelerden toplanır
+    collector = thumbnails = None
+    if thumbnail_key:
+        collector = ThumbnailCollector(frame_count, fps, width, height)
+        thumbnails = cached_thumbnails(thumbnail_key, collector)
+    ret, first_frame = cap.read()
+
+    # Hareket analizi; küçük resim ve görsel tarama aynı örneklenmiş kareleri boru hattından alır
+    step = None
+    extras = {}
+    if collector is not None and thumbnails is None:
+        extras["thumbnails"] = collector
+    if profile.keyframes_only and shutil.which("ffmpeg"):
+        screener = create_screener(frame_count, fps)
+        if screener is not None:
+            extras["screening"] = screener
+        cap.release()
+        # Anahtar kareler küçük resim için yeterli boyutta renkli çözülür; hareket
+        # dedektörü analiz çözünürlüğüne küçültür
+        decode_width, decode_height = analysis_size(width, height, max(analysis_width, *THUMBNAIL_SIZES))
+        params = ScanParams(analysis_width, analysis_height, ksize,
+                            (decode_width, decode_height) != (analysis_width, analysis_height), 1, SCENE_DETECTION)
+        detector = MotionDetector(params)
+        pipeline = FramePipeline()
+        motion = pipeline.add("motion", MotionScan(detector))
+        for name, analyzer in extras.items():
+            pipeline.add(name, analyzer)
+        stages = pipeline.run(keyframe_frames(video_path, decode_width, decode_height, fps, frame_count))
+        changed, distances = motion.changed, detector.distances
+    else:
+        step = profile.step_for(fps)
+        if profile.keyframes_only:
+            # ffmpeg yoksa yaklaşık iki saniyelik aralıklarla örnekle
+            step = max(step, int(round(fps * 2)) if fps else 1)
+        params = ScanParams(analysis_width, analysis_height, ksize, resize, step, SCENE_DETECTION)
+        screener = create_screener(frame_count, fps, step)
+        if screener is not None:
+            extras["screening"] = screener
+        segments = min(processes, frame_count // max(MIN_SEGMENT_FRAMES, step))
+        if segments > 1:
+            # Segmentler ayrı süreçlerde taranır ve sırayla birleştirilir
+            cap.release()
+            bounds = segment_bounds(frame_count, step, segments)
+            # Ek analizciler de segment süreçlerinde aynı karelerle çalışır; her
+            # segment boş bir kopyayı doldurur, kopyalar sırayla birleştirilir
+            copies = [
+                {name: segment_copy(analyzer, start - step) for name, analyzer in extras.items()}
+                for start, _ in bounds
+            ]
+            parts = list(get_pool().map(
+                scan_segment,
+                [video_path] * len(bounds), [params] * len(bounds),
+                [start for start, _ in bounds], [end for _, end in bounds], copies,
+            ))
+            changed, distances = [], []
+            for part_changed, part_distances, part_extras, _ in parts:
+                changed.extend(part_changed)
+                distances.extend(part_distances)
+                for name, analyzer in part_extras.items():
+                    extras[name].merge(analyzer)
+            stages = combine([part[3] for part in parts])
+        else:
+            def frames():
+                if ret:
+                    yield 0, first_frame
+                    for _ in range(step - 1):
+                        cap.grab()
+                    yield from indexed_frames(cap, step, step)
+            detector = MotionDetector(params)
+            pipeline = FramePipeline()
+            motion = pipeline.add("motion", MotionScan(detector))
+            for name, analyzer in extras.items():
+                pipeline.add(name, analyzer)
+            try:
+                stages = pipeline.run(frames())
+            finally:
+                cap.release()
+            changed, distances = motion.changed, detector.distances
+
+    # Anahtar karelerde örnekler arası aralık bilinmediğinden ortalama aralık kullanılır
+    if step is None:
+        step = frame_count / (len(changed) + 1) if changed else 1
+    scene_cuts = detect_cuts(distances, changed, analysis_width * analysis_height, step, fps) \
+        if params.scenes else None
+
+    # Tarama videonun sonuna varamadıysa (kare sayısı fazla bildirilmiş) kalan hedefler atlanarak okunur
+    extra_reads = 0
+    if collector is not None and thumbnails is None and ret:
+        extra_reads += collector.read_missing(video_path)
+        if scene_cuts:
+            # Geçiş anlarındaki kareler temsili resim olmasın
+            collector.avoid(scene_cuts, int(SCENE_THUMBNAIL_GUARD * fps))
+        thumbnails = write_thumbnails(thumbnail_key, collector)
+    screening = None
+    if screener is not None:
+        extra_reads += screener.read_missing(video_path)
+        screening = screener.finish()
+    if stages is not None:
+        stages["extra_reads"] = extra_reads
+
+    return build_results(video_path, profile, fps, frame_count, width, height, step,
+                         motion_series(changed, area_scale, step), thumbnails, screening, scene_cuts, stages)
+
+
+def segment_copy(analyzer, after: int):
+    # Paralel tarama için henüz kare görmemiş analizcinin segment başına konumlanmış kopyası
+    part = copy.deepcopy(analyzer)
+    part.seek(after)
+    return part
+
+
+def motion_series(changed: list, area_scale: float, step: float) -> np.ndarray:
+    # Örnekler arası kare aralığı kadar birikmiş değişim kare başına indirgenir
+    motion_intensity = np.asarray(changed, dtype=np.float64) * (area_scale / step)
+    if motion_intensity.size == 0:
+        motion_intensity = np.zeros(1)
+    return motion_intensity
+
+
+def motion_summary(motion_intensity: np.ndarray, frame_count: int, step: float) -> dict:
+    # Her örnek farkı `step` kareyi temsil eder; oran tüm profillerde ilk sürümdeki gibi
+    # toplam kare sayısına göredir (full profilde birebir aynı)
+    motion_frames = int(np.count_nonzero(motion_intensity > MOTION_THRESHOLD))  # Hareket eşiği
+    return {
+        "analyzed_frames": len(motion_intensity) + 1,
+        "motion_percentage": min(100.0, motion_frames * step / frame_count * 100) if frame_count else 0.0,
+        "motion_intensity": {
+            "min": float(np.min(motion_intensity)),
+            "max": float(np.max(motion_intensity)),
+            "mean": float(np.mean(motion_intensity))
+        },
+    }
+
+
+def build_results(video_path: str, profile: AnalysisProfile, fps: float, frame_count: int,
+                  width: int, height: int, step: float, motion_intensity: np.ndarray,
+                  thumbnails: Optional[dict], screening: Optional[dict] = None,
+                  scene_cuts: Optional[list] = None, stages: Optional[dict] = None) -> dict:
+    # Tüm zaman serisini grafikler için ikili dosyada sakla
+    timeline_path = timeline_path_for(video_path)
+    save_timeline(timeline_path, motion_intensity)
+
+    # Analiz sonuçları
+    return {
+        "duration": frame_count / fps if fps else 0,
+        "fps": fps,
+        "frame_count": frame_count,
+        "resolution": f"{width}x{height}",
+        "profile": profile.name,
+        **motion_summary(motion_intensity, frame_count, step),
+        "timeline": {
+            "path": timeline_path,
+            "samples": int(motion_intensity.size),
+            "interval": step / fps if fps else 0.0,  # örnekler arası saniye
+        },
+        "thumbnail_path": thumbnails["sizes"][str(THUMBNAIL_SIZES[0])] if thumbnails else None,
+        "thumbnails": thumbnails,
+        "screening": screening,
+        "scenes": scene_summary(scene_cuts, fps) if scene_cuts is not None else None,
+        "pipeline": stages,  # aşama süreleri (saniye)
+    }
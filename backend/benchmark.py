@@ -0,0 +1,362 @@
+"""Analiz motoru için basit performans ölçümleri.
+
+Kullanım:
+    python benchmark.py profiles [video.mp4] [--width 3840 --height 2160 --seconds 10]
+    python benchmark.py segments [video.mp4] [--processes 4]
+    python benchmark.py detector [--frames 300]
+    python benchmark.py auth [--requests 500 --logins 8]
+    python benchmark.py probe [video.mp4] [--max-bytes 1048576]
+    python benchmark.py screening [--model model.onnx --batch-sizes 1,4,16,32 --threads 0]
+    python benchmark.py pipeline [video.mp4] [--profile full --screening stub]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+import analysis
+import pipeline
+from analysis import PROFILES, MotionDetector, ScanParams, analyze_video
+from probe import PROBE_MAX_BYTES, estimate_cost, probe_video
+
+
+def make_synthetic_video(path: str, width: int, height: int, seconds: float, fps: int = 30):
+    # Gürültülü arka plan üzerinde aralıklı hareket eden bir kare
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 40, (height, width, 3), dtype=np.uint8)
+    size = max(8, height // 8)
+    for i in range(int(seconds * fps)):
+        frame = background.copy()
+        # Her iki saniyenin ilk yarısında kare hareket eder, ikinci yarısında durur
+        t = i if (i // fps) % 2 == 0 else (i // fps) * fps
+        x = (t * width // (fps * 4)) % (width - size)
+        y = height // 2 - size // 2
+        frame[y:y + size, x:x + size] = (255, 255, 255)
+        writer.write(frame)
+    writer.release()
+
+
+def bench_profiles(video_path: str):
+    rows = []
+    for name in PROFILES:
+        start = time.perf_counter()
+        results = analyze_video(video_path, name)
+        elapsed = time.perf_counter() - start
+        rows.append((name, elapsed, results))
+
+    baseline = rows[0][2]
+    print(f"{'profil':<10} {'süre (s)':>9} {'kare/s':>9} {'analiz':>7} "
+          f"{'hareket %':>10} {'Δ hareket':>10} {'ort. yoğ.':>12} {'Δ yoğ. %':>9}")
+    for name, elapsed, results in rows:
+        mean = results["motion_intensity"]["mean"]
+        base_mean = baseline["motion_intensity"]["mean"]
+        rel = (mean - base_mean) / base_mean * 100 if base_mean else 0.0
+        print(f"{name:<10} {elapsed:>9.2f} {results['frame_count'] / elapsed:>9.1f} "
+              f"{results['analyzed_frames']:>7} {results['motion_percentage']:>10.2f} "
+              f"{results['motion_percentage'] - baseline['motion_percentage']:>+10.2f} "
+              f"{mean:>12.0f} {rel:>+9.1f}")
+
+
+def synthetic_frames(count: int, width: int = 1920, height: int = 1080):
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 40, (height, width, 3), dtype=np.uint8)
+    size = height // 8
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        x = (i * 16) % (width - size)
+        frame[height // 2:height // 2 + size, x:x + size] = 255
+        frames.append(frame)
+    return frames
+
+
+def legacy_motion_loop(frames):
+    # Önceki döngü: her karede yeni diziler ve iki kez np.sum
+    prev_frame = None
+    motion_intensity = []
+    motion_frames = 0
+    for frame in frames:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (21, 21), 0)
+        if prev_frame is None:
+            prev_frame = gray
+            continue
+        frame_diff = cv2.absdiff(prev_frame, gray)
+        thresh = cv2.threshold(frame_diff, 25, 255, cv2.THRESH_BINARY)[1]
+        motion_intensity.append(np.sum(thresh))
+        if np.sum(thresh) > 1000:
+            motion_frames += 1
+        prev_frame = gray
+    return motion_intensity
+
+
+def bench_detector(count: int):
+    frames = synthetic_frames(count)
+    height, width = frames[0].shape[:2]
+
+    start = time.perf_counter()
+    legacy = legacy_motion_loop(frames)
+    legacy_time = time.perf_counter() - start
+
+    detector = MotionDetector(ScanParams(width, height, 21, False, 1))
+    start = time.perf_counter()
+    current = [value for value in map(detector.update, frames) if value is not None]
+    current_time = time.perf_counter() - start
+
+    # Aynı döngüde sahne kesmesi için histogram uzaklığı
+    detector = MotionDetector(ScanParams(width, height, 21, False, 1, True))
+    start = time.perf_counter()
+    for frame in frames:
+        detector.update(frame)
+    scenes_time = time.perf_counter() - start
+
+    print(f"önce:  {count / legacy_time:8.1f} kare/s")
+    print(f"sonra: {count / current_time:8.1f} kare/s (x{legacy_time / current_time:.2f})")
+    print(f"kesme tespitiyle: {count / scenes_time:8.1f} kare/s ({(scenes_time / current_time - 1) * 100:+.1f} %)")
+    if [int(v) for v in legacy] != [int(v) for v in current]:
+        raise SystemExit("Hareket değerleri farklı")
+
+
+def bench_segments(video_path: str, processes: int, profile: str):
+    # Paralel segment taramasının sıralı taramayla birebir aynı sonucu verdiğini doğrula
+    analysis.ANALYSIS_PROCESSES = processes
+    start = time.perf_counter()
+    sequential = analyze_video(video_path, profile, processes=1)
+    sequential_time = time.perf_counter() - start
+
+    analysis.get_pool()  # süreç başlatma maliyetini ölçüme katma
+    start = time.perf_counter()
+    parallel = analyze_video(video_path, profile, processes=processes)
+    parallel_time = time.perf_counter() - start
+
+    print(f"sıralı:  {sequential_time:.2f} s")
+    print(f"paralel: {parallel_time:.2f} s ({processes} süreç, x{sequential_time / parallel_time:.2f})")
+    # Aşama süreleri her çalıştırmada farklıdır
+    for results in (sequential, parallel):
+        results.pop("pipeline")
+    if sequential != parallel:
+        raise SystemExit(f"Sonuçlar farklı:\n{sequential}\n{parallel}")
+    print("sonuçlar birebir aynı")
+
+
+async def timed_requests(client, count: int, concurrency: int, method: str, url: str, **kwargs):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    await asyncio.gather(*(one() for _ in range(count)))
+    return np.asarray(latencies) * 1000
+
+
+async def run_auth_bench(app, requests: int, logins: int, concurrency: int):
+    import httpx
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        credentials = {"username": "bench", "password": "bench-password"}
+        await client.post("/users/", json={**credentials, "email": "bench@example.com"})
+        token = (await client.post("/token", data=credentials)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def report(label, latencies):
+            print(f"{label:<28} p50 {np.percentile(latencies, 50):7.1f} ms   "
+                  f"p99 {np.percentile(latencies, 99):7.1f} ms")
+
+        report("/videos/ (tek başına)", await timed_requests(
+            client, requests, concurrency, "GET", "/videos/", headers=headers))
+
+        # Liste istekleri sürerken arka arkaya giriş yapan istemciler
+        done = asyncio.Event()
+        login_count = 0
+
+        async def login_loop():
+            nonlocal login_count
+            while not done.is_set():
+                await client.post("/token", data=credentials)
+                login_count += 1
+
+        loggers = [asyncio.create_task(login_loop()) for _ in range(logins)]
+        start = time.perf_counter()
+        latencies = await timed_requests(client, requests, concurrency, "GET", "/videos/", headers=headers)
+        elapsed = time.perf_counter() - start
+        done.set()
+        await asyncio.gather(*loggers)
+        report(f"/videos/ ({logins} eşzamanlı giriş)", latencies)
+        print(f"giriş: {login_count / elapsed:.1f}/s")
+
+
+def bench_auth(requests: int, logins: int, concurrency: int):
+    # Ayrı bir geçici veritabanı ve çalışma dizini kullanılır
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            import main
+            asyncio.run(run_auth_bench(main.app, requests, logins, concurrency))
+        finally:
+            os.chdir(cwd)
+
+
+def bytes_read() -> int:
+    # Bu sürecin read() çağrılarıyla okuduğu toplam bayt (Linux)
+    with open("/proc/self/io") as fp:
+        return int(next(line for line in fp if line.startswith("rchar:")).split()[1])
+
+
+def bench_probe(video_path: str, max_bytes: int):
+    # Ön okumanın dosya boyutundan bağımsız, sınırlı sayıda bayt okuduğunu doğrula.
+    # ffprobe ayrı süreçte çalıştığından yalnızca OpenCV yolu ölçülür; ffprobe
+    # zaten PROBE_MAX_BYTES (-probesize) ile sınırlanır
+    import probe
+    original = probe.shutil.which
+    probe.shutil.which = lambda name: None
+    try:
+        before = bytes_read()
+        start = time.perf_counter()
+        meta = probe_video(video_path)
+        elapsed = time.perf_counter() - start
+        used = bytes_read() - before
+    finally:
+        probe.shutil.which = original
+
+    print(meta.to_dict())
+    print(f"okunan: {used} bayt / dosya {meta.file_size} bayt ({used / meta.file_size * 100:.2f} %), "
+          f"{elapsed * 1000:.1f} ms")
+    for name in PROFILES:
+        print(f"maliyet ({name}): {estimate_cost(meta, name):.1f}")
+    if used > max_bytes:
+        raise SystemExit(f"Ön okuma sınırı aşıldı: {used} > {max_bytes} bayt")
+
+
+def bench_screening(model: str, batch_sizes: list, threads: int, count: int):
+    # Görsel taramanın grup boyutuna göre çıkarım hızı ve tampon belleği
+    import screening
+    screening.SCREENING_MODEL = model
+    screening.SCREENING_THREADS = threads
+    frames = synthetic_frames(count, 640, 360)
+    size = screening.SCREENING_INPUT_SIZE
+    screening.infer([cv2.resize(frames[0], (size, size))])  # model yükleme ölçüme katılmaz
+    print(f"model: {model}  girdi: {size}x{size}  OpenCV thread: {cv2.getNumThreads()}")
+    print(f"{'grup':>6} {'kare/s':>9} {'ms/grup':>9} {'tampon MB':>10}")
+    for batch_size in batch_sizes:
+        screener = screening.FrameScreener(len(frames), 1.0 / screening.SCREENING_INTERVAL, batch_size=batch_size)
+        start = time.perf_counter()
+        for index, frame in enumerate(frames):
+            screener.observe(index, frame)
+        result = screener.finish()
+        elapsed = time.perf_counter() - start
+        # uint8 grup tamponu ve float32 blob
+        memory = batch_size * size * size * 3 * 5 / 2 ** 20
+        print(f"{batch_size:>6} {result['samples'] / elapsed:>9.1f} "
+              f"{elapsed * 1000 / -(-result['samples'] // batch_size):>9.1f} {memory:>10.1f}")
+
+
+def bench_pipeline(video_path: str, profile: str, model: str):
+    # Tek çözümün analizcilere dağıtımı: aşama süreleri, thread'li ve sıralı dağıtım
+    import screening
+    import thumbnails
+    screening.SCREENING_MODEL = model
+    print(f"{'dağıtım':<8} {'toplam':>8} {'çözme':>8} {'bekleme':>8}  analizciler (s)")
+    outputs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Küçük resimler de üretilsin ama kalıcı önbelleğe yazılmasın
+        thumbnails.THUMBNAIL_DIR = tmp
+        for threaded in (False, True):
+            pipeline.PIPELINE_THREADS = threaded
+            start = time.perf_counter()
+            results = analyze_video(video_path, profile, processes=1, thumbnail_key=f"{int(threaded):040x}")
+            elapsed = time.perf_counter() - start
+            stages = results.pop("pipeline")
+            busy = "  ".join(f"{name} {seconds:.2f}" for name, seconds in stages["analyzers"].items())
+            print(f"{'thread' if threaded else 'sıralı':<8} {elapsed:>8.2f} {stages['decode']:>8.2f} "
+                  f"{stages['stalled']:>8.2f}  {busy}  (ek okuma: {stages['extra_reads']})")
+            for key in ("thumbnail_path", "thumbnails"):
+                results.pop(key)
+            outputs.append(results)
+    if outputs[0] != outputs[1]:
+        raise SystemExit(f"Sonuçlar farklı:\n{outputs[0]}\n{outputs[1]}")
+
+
+def with_video(args, func, *extra):
+    if args.video:
+        func(args.video, *extra)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "synthetic.mp4")
+            make_synthetic_video(path, args.width, args.height, args.seconds)
+            func(path, *extra)
+
+
+def add_video_arguments(parser):
+    parser.add_argument("video", nargs="?")
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--seconds", type=float, default=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    profiles = sub.add_parser("profiles", help="Analiz profillerini hız ve doğruluk açısından karşılaştır")
+    add_video_arguments(profiles)
+
+    segments = sub.add_parser("segments", help="Paralel segment analizini sıralı analizle karşılaştır")
+    add_video_arguments(segments)
+    segments.add_argument("--processes", type=int, default=os.cpu_count() or 2)
+    segments.add_argument("--profile", default="full")
+
+    detector = sub.add_parser("detector", help="Kare döngüsünü sentetik 1080p karelerle ölç")
+    detector.add_argument("--frames", type=int, default=300)
+
+    auth = sub.add_parser("auth", help="Eşzamanlı girişler altında /videos/ gecikmesini ölç (httpx gerekir)")
+    auth.add_argument("--requests", type=int, default=500)
+    auth.add_argument("--logins", type=int, default=8)
+    auth.add_argument("--concurrency", type=int, default=20)
+
+    probe_parser = sub.add_parser("probe", help="Yükleme anındaki ön okumanın okuduğu bayt sayısını ölç")
+    add_video_arguments(probe_parser)
+    probe_parser.add_argument("--max-bytes", type=int, default=PROBE_MAX_BYTES)
+
+    screening_parser = sub.add_parser("screening", help="Görsel taramanın grup boyutuna göre hızını ölç")
+    screening_parser.add_argument("--model", default=os.getenv("SCREENING_MODEL") or "stub")
+    screening_parser.add_argument("--batch-sizes", default="1,4,16,32")
+    screening_parser.add_argument("--threads", type=int, default=0)
+    screening_parser.add_argument("--frames", type=int, default=256)
+
+    pipeline_parser = sub.add_parser("pipeline", help="Tek çözümlü analizci boru hattının aşama sürelerini ölç")
+    add_video_arguments(pipeline_parser)
+    pipeline_parser.add_argument("--profile", default="full")
+    pipeline_parser.add_argument("--screening", default=os.getenv("SCREENING_MODEL") or "stub",
+                                 help="görsel tarama modeli (boş: kapalı)")
+
+    args = parser.parse_args()
+    if args.command == "profiles":
+        with_video(args, bench_profiles)
+    elif args.command == "segments":
+        with_video(args, bench_segments, args.processes, args.profile)
+    elif args.command == "detector":
+        bench_detector(args.frames)
+    elif args.command == "auth":
+        bench_auth(args.requests, args.logins, args.concurrency)
+    elif args.command == "probe":
+        with_video(args, bench_probe, args.max_bytes)
+    elif args.command == "screening":
+        bench_screening(args.model, [int(b) for b in args.batch_sizes.split(",")], args.threads, args.frames)
+    elif args.command == "pipeline":
+        with_video(args, bench_pipeline, args.profile, args.screening)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import pytest
+
+import analysis
+import thumbnails
+from benchmark import make_synthetic_video
+
+
+@pytest.fixture(scope="session")
+def synthetic_video(tmp_path_factory):
+    # 4 saniyelik, aralıklı hareket eden küçük bir test videosu
+    path = tmp_path_factory.mktemp("video") / "synthetic.mp4"
+    make_synthetic_video(str(path), 320, 240, 4)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def thumbnail_dir(tmp_path, monkeypatch):
+    # Küçük resimler çalışma dizinine değil teste özel dizine yazılır
+    monkeypatch.setattr(thumbnails, "THUMBNAIL_DIR", str(tmp_path / "thumbnails"))
+    return tmp_path / "thumbnails"
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # Paralel segment taraması için küçük bir süreç havuzu; test sonunda kapatılır
+    monkeypatch.setattr(analysis, "ANALYSIS_PROCESSES", 3)
+    monkeypatch.setattr(analysis, "MIN_SEGMENT_FRAMES", 30)
+    yield analysis.get_pool()
+    analysis._pool.shutdown()
+    analysis._pool = None
@@ -0,0 +1,123 @@
+import os
+
+from sqlalchemy import BigInteger, Integer, create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Veritabanı bağlantısı
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./video_analyzer.db")
+
+# Havuz ayarları
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def async_url(url: str) -> str:
+    # Senkron sürücü adresini async sürücüye çevir (aiosqlite / asyncpg)
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith(("postgresql:", "postgresql+psycopg2:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def pool_options(url: str, poolclass) -> dict:
+    options = {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+    }
+    if is_sqlite(url):
+        # Bağlantılar farklı thread'lerde kullanılır; kilit beklemesini sürücü de yapsın
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    else:
+        options["pool_recycle"] = DB_POOL_RECYCLE
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL: okuyucular yazıcıyı beklemez; busy_timeout: kilitte hemen hata verme
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+# Arka plan işçileri (thread havuzu) senkron motoru kullanır
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **pool_options(SQLALCHEMY_DATABASE_URL, QueuePool))
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# API uç noktaları event loop'u bloklamamak için async motoru kullanır
+ASYNC_DATABASE_URL = async_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL, AsyncAdaptedQueuePool)
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+if is_sqlite(SQLALCHEMY_DATABASE_URL):
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+
+Base = declarative_base()
+
+
+def upgrade_schema(engine, metadata):
+    """`create_all` var olan tabloları değiştirmez; eski veritabanlarını modele yetiştirir.
+
+    Modelde olup tabloda olmayan sütunlar (boş bırakılabilir olarak) ve eksik
+    indeksler eklenir; PostgreSQL'de Integer'dan BigInteger'a geçen sütunlar
+    genişletilir (SQLite tamsayıları zaten 64 bittir). Sütun silme ve diğer
+    tür değişiklikleri yapılmaz.
+    """
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"]: column for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                current = existing.get(column.name)
+                if current is None:
+                    connection.execute(text(
+                        f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} "
+                        f"{column.type.compile(dialect=engine.dialect)}"
+                    ))
+                elif (isinstance(column.type, BigInteger) and not isinstance(current["type"], BigInteger)
+                        and isinstance(current["type"], Integer) and not is_sqlite(str(engine.url))):
+                    connection.execute(text(
+                        f"ALTER TABLE {quote(table.name)} ALTER COLUMN {quote(column.name)} TYPE BIGINT"
+                    ))
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+# Dependency
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,391 @@
+import os
+import select
+import struct
+import threading
+import time
+from typing import Optional
+
+import cv2
+
+from analysis import (
+    MotionDetector, MotionScan, ScanParams, analysis_size, blur_kernel_for, build_results, get_profile,
+    motion_series, motion_summary,
+)
+from pipeline import FramePipeline
+from scenes import SCENE_DETECTION, SCENE_THUMBNAIL_GUARD, detect_cuts
+from screening import create_screener
+from thumbnails import ThumbnailCollector, cached_thumbnails, write_thumbnails
+
+# Aynı anda yükleme sürerken analiz edilen en fazla dosya (0: kapalı)
+INCREMENTAL_SESSIONS = int(os.getenv("INCREMENTAL_SESSIONS", "2"))
+# Ara sonuçların yenilenme aralığı (saniye)
+INCREMENTAL_PARTIAL_INTERVAL = float(os.getenv("INCREMENTAL_PARTIAL_INTERVAL", "2.0"))
+# Bu kadar saniye yeni bayt gelmeyen oturum bırakılır (FIFO silinir, yer açılır);
+# yükleme sonra devam ederse tamamlanınca normal analize düşülür
+INCREMENTAL_IDLE_TIMEOUT = float(os.getenv("INCREMENTAL_IDLE_TIMEOUT", "300"))
+# Kapın akışla okunabilir olup olmadığına bu kadar baştan bakılır
+HEAD_BYTES = 64 * 1024
+FEED_CHUNK_SIZE = 256 * 1024
+POLL_INTERVAL = 0.5
+
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"  # Matroska / WebM
+TS_PACKET = 188
+
+
+def _boxes(data: bytes, offset: int = 0, end: Optional[int] = None):
+    # ISO BMFF kutuları: (tür, başlangıç, bitiş); sığmayan son kutu için bitiş None
+    end = len(data) if end is None else end
+    while offset + 8 <= end:
+        size, kind = struct.unpack(">I4s", data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size, header = struct.unpack(">Q", data[offset + 8:offset + 16])[0], 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield kind, offset + header, offset + size if offset + size <= end else None
+        offset += size
+
+
+def is_streamable(head: bytes) -> bool:
+    """Dosya başından kapın baştan sona sıralı okunabilir olup olmadığına bakar.
+
+    Matroska/WebM ve MPEG-TS her zaman, MP4 ise yalnızca parçalı (fragmented,
+    `moov` içinde `mvex`) ise kabul edilir; `moov`u sonda olan MP4'ler sıralı
+    okunamaz.
+    """
+    if head.startswith(EBML_MAGIC):
+        return True
+    if len(head) > 2 * TS_PACKET and all(head[i] == 0x47 for i in range(0, 3 * TS_PACKET, TS_PACKET)):
+        return True
+    for kind, start, end in _boxes(head):
+        if kind == b"mdat" or end is None:
+            return False
+        if kind == b"moov":
+            return any(child == b"mvex" for child, _, _ in _boxes(head, start, end))
+    return False
+
+
+class IncrementalAnalysis:
+    """Yükleme sürerken gelen baytları hareket taramasına akıtır.
+
+    Besleyici thread `.part` dosyasının büyüyen kısmını bir FIFO'ya yazar,
+    tarama thread'i OpenCV ile FIFO'dan kareleri sırayla çözer ve ara sonuçları
+    `partial` içinde yayınlar. Yükleme bittiğinde geriye yalnızca son baytların
+    çözümü kalır; `results` taramanın bitmesini bekleyip nihai sonucu üretir.
+    Yükleme `idle_timeout` saniye büyümezse oturum `expired` olur ve
+    `on_expire` çağrılır.
+    """
+
+    def __init__(self, part_path: str, fifo_path: str, profile=None,
+                 idle_timeout: float = INCREMENTAL_IDLE_TIMEOUT, on_expire=None):
+        self.part_path = part_path
+        self.fifo_path = fifo_path
+        self.profile = get_profile(profile)
+        self.status = "waiting"  # waiting, analyzing, scanned, unsupported, failed, cancelled, expired
+        self.error = None
+        self.partial = None
+        self.bytes_fed = 0
+        self.idle_timeout = idle_timeout
+        self.on_expire = on_expire
+        self._length = None
+        self._cancelled = False
+        self._expired = False
+        self._last_activity = time.monotonic()
+        self._grown = threading.Event()
+        self._scanned = threading.Event()
+        self._scan = None
+        self._feeder = threading.Thread(target=self._feed, name="incremental-feed", daemon=True)
+        self._scanner = threading.Thread(target=self._run_scan, name="incremental-scan", daemon=True)
+
+    def start(self):
+        self._feeder.start()
+
+    def notify(self):
+        # Yükleme dosyası büyüdü
+        self._last_activity = time.monotonic()
+        self._grown.set()
+
+    def finish(self, length: int):
+        # Tüm baytlar yazıldı; besleyici kalan kısmı aktarıp FIFO'yu kapatır
+        self._length = length
+        self._grown.set()
+
+    def cancel(self):
+        self._cancelled = True
+        self._grown.set()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("waiting", "analyzing", "scanned")
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "bytes_fed": self.bytes_fed,
+            "partial": self.partial,
+            "error": self.error,
+        }
+
+    def _wait(self):
+        self._grown.wait(POLL_INTERVAL)
+        self._grown.clear()
+        if self._length is None and time.monotonic() - self._last_activity > self.idle_timeout:
+            # İstemci yüklemeyi bıraktı; besleyici ve tarama iptal gibi durur
+            self._expired = self._cancelled = True
+            if self.on_expire is not None:
+                self.on_expire()
+
+    def _input_done(self) -> bool:
+        return self._cancelled or self._length is not None
+
+    def _stopped_status(self) -> str:
+        return "expired" if self._expired else "cancelled"
+
+    def _feed(self):
+        try:
+            with open(self.part_path, "rb") as src:
+                head = b""
+                while len(head) < HEAD_BYTES:
+                    chunk = src.read(HEAD_BYTES - len(head))
+                    if chunk:
+                        head += chunk
+                        self._last_activity = time.monotonic()
+                    elif self._input_done():
+                        break
+                    else:
+                        self._wait()
+                if self._cancelled:
+                    self.status = self._stopped_status()
+                    return
+                if not is_streamable(head):
+                    self.status = "unsupported"
+                    return
+
+                os.mkfifo(self.fifo_path)
+                # O_RDWR açış okuyucuyu beklemez; FIFO'yu tek yazan biz olduğumuz
+                # için kapattığımızda tarayıcı dosya sonunu görür
+                fd = os.open(self.fifo_path, os.O_RDWR | os.O_NONBLOCK)
+                self.status = "analyzing"
+                self._scanner.start()
+                try:
+                    self._write(fd, head)
+                    while not self._cancelled:
+                        # Bitiş işaretinden sonra dosyada kalanlar da okunur
+                        done = self._input_done()
+                        chunk = src.read(FEED_CHUNK_SIZE)
+                        if chunk:
+                            self._last_activity = time.monotonic()
+                            if not self._write(fd, chunk):
+                                break
+                        elif done:
+                            break
+                        else:
+                            self._wait()
+                finally:
+                    os.close(fd)
+        except Exception as e:
+            self.status, self.error = "failed", str(e)
+            self._scanned.set()
+        finally:
+            if not self._scanner.is_alive() and os.path.exists(self.fifo_path):
+                os.remove(self.fifo_path)
+            if self.status != "analyzing":
+                self._scanned.set()
+
+    def _write(self, fd: int, data: bytes) -> bool:
+        # Boru doluysa tarama yetişene kadar bekle; tarama durduysa bırak
+        view = memoryview(data)
+        while view:
+            if self._cancelled or not self._scanner.is_alive():
+                return False
+            _, writable, _ = select.select([], [fd], [], POLL_INTERVAL)
+            if writable:
+                try:
+                    written = os.write(fd, view)
+                except BlockingIOError:
+                    continue
+                view = view[written:]
+                self.bytes_fed += written
+        return True
+
+    def _run_scan(self):
+        try:
+            self._scan = self._scan_stream()
+            self.status = "scanned" if not self._cancelled else self._stopped_status()
+        except Exception as e:
+            self.status, self.error = "failed", str(e)
+        finally:
+            if os.path.exists(self.fifo_path):
+                os.remove(self.fifo_path)
+            self._scanned.set()
+
+    def _scan_stream(self) -> dict:
+        cap = cv2.VideoCapture(self.fifo_path)
+        try:
+            if not cap.isOpened():
+                raise ValueError("Video akışı açılamadı")
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+            # analyze_video'nun sıralı taramasıyla aynı parametreler
+            profile = self.profile
+            analysis_width, analysis_height = analysis_size(width, height, profile.max_width)
+            scale = analysis_width / width if width else 1.0
+            area_scale = (width * height) / (analysis_width * analysis_height) if width else 1.0
+            step = profile.step_for(fps)
+            if profile.keyframes_only:
+                # Akışta anahtar kare atlaması yapılamaz; yaklaşık iki saniyede bir örnekle
+                step = max(step, int(round(fps * 2)) if fps else 1)
+            params = ScanParams(analysis_width, analysis_height, blur_kernel_for(scale),
+                                (analysis_width, analysis_height) != (width, height), step, SCENE_DETECTION)
+            detector = MotionDetector(params)
+            pipeline = FramePipeline()
+            motion = pipeline.add("motion", MotionScan(detector))
+            screener = create_screener(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), fps, step)
+            if screener is not None:
+                pipeline.add("screening", screener)
+
+            frame_count = 0
+
+            def frames():
+                # Akışta kare sayısı bilinmez; çözülen ve atlanan kareler sayılır
+                nonlocal frame_count
+                last_partial = time.monotonic()
+                while not self._cancelled:
+                    ret, frame = cap.read()
+                    if not ret:
+                        return
+                    yield frame_count, frame
+                    frame_count += 1
+                    for _ in range(step - 1):
+                        if not cap.grab():
+                            return
+                        frame_count += 1
+                    if time.monotonic() - last_partial >= INCREMENTAL_PARTIAL_INTERVAL:
+                        last_partial = time.monotonic()
+                        self._publish(motion.changed, area_scale, step, fps, frame_count)
+
+            stages = pipeline.run(frames())
+            self._publish(motion.changed, area_scale, step, fps, frame_count)
+        finally:
+            cap.release()
+        return {"fps": fps, "width": width, "height": height, "step": step,
+                "frame_count": frame_count, "changed": motion.changed, "area_scale": area_scale,
+                "distances": detector.distances, "area": analysis_width * analysis_height,
+                "screener": screener, "stages": stages}
+
+    def _publish(self, changed, area_scale, step, fps, frame_count):
+        self.partial = {
+            "processed_seconds": round(frame_count / fps, 3) if fps else 0.0,
+            "frame_count": frame_count,
+            **motion_summary(motion_series(changed, area_scale, step), frame_count, step),
+        }
+
+    def results(self, video_path: str, thumbnail_key: str) -> Optional[dict]:
+        """Taramayı bekler ve tamamlanmış dosya için nihai sonucu üretir.
+
+        Akış taranamadıysa None döner; çağıran tam analize düşer. Küçük
+        resimler taramada toplanmaz, tamamlanmış dosyadan atlanarak okunur.
+        """
+        self._scanned.wait()
+        scan = self._scan
+        if scan is None or self._cancelled:
+            return None
+        scene_cuts = detect_cuts(scan["distances"], scan["changed"], scan["area"], scan["step"], scan["fps"]) \
+            if SCENE_DETECTION else None
+        collector = ThumbnailCollector(scan["frame_count"], scan["fps"], scan["width"], scan["height"])
+        thumbnails = cached_thumbnails(thumbnail_key, collector)
+        stages = scan["stages"]
+        stages["extra_reads"] = 0
+        if thumbnails is None and scan["frame_count"]:
+            stages["extra_reads"] = collector.read_missing(video_path)
+            if scene_cuts:
+                collector.avoid(scene_cuts, int(SCENE_THUMBNAIL_GUARD * scan["fps"]))
+            thumbnails = write_thumbnails(thumbnail_key, collector)
+        screener = scan["screener"]
+        if screener is not None:
+            # Akışta kare sayısı baştan bilinmeyebilir; taranan kadarıyla sınırla
+            screener.frame_count = scan["frame_count"]
+            screening = screener.finish()
+        else:
+            screening = None
+        return build_results(
+            video_path, self.profile, scan["fps"], scan["frame_count"], scan["width"], scan["height"],
+            scan["step"], motion_series(scan["changed"], scan["area_scale"], scan["step"]), thumbnails,
+            screening, scene_cuts, stages,
+        )
+
+
+class IncrementalAnalyses:
+    """Yükleme oturumlarına bağlı artımlı analizlerin kaydı.
+
+    Yükleme sürerken analiz yükleme kimliğiyle izlenir; yükleme bitince
+    videoya bağlanır ve analiz işçisi sonucu oradan alır.
+    """
+
+    def __init__(self, root: str, max_sessions: int = INCREMENTAL_SESSIONS):
+        self.root = root
+        self.max_sessions = max_sessions
+        self._by_upload = {}
+        self._by_video = {}
+        self._lock = threading.Lock()
+
+    def start(self, upload_id: str, part_path: str) -> bool:
+        if not hasattr(os, "mkfifo"):
+            return False
+        with self._lock:
+            running = [a for a in (*self._by_upload.values(), *self._by_video.values()) if a.active]
+            if len(running) >= self.max_sessions:
+                return False
+            analysis = IncrementalAnalysis(part_path, os.path.join(self.root, f"{upload_id}.fifo"),
+                                           on_expire=lambda: self._expire(upload_id))
+            self._by_upload[upload_id] = analysis
+        analysis.start()
+        return True
+
+    def get(self, upload_id: str) -> Optional[IncrementalAnalysis]:
+        return self._by_upload.get(upload_id)
+
+    def notify(self, upload_id: str):
+        analysis = self._by_upload.get(upload_id)
+        if analysis is not None:
+            analysis.notify()
+
+    def finish(self, upload_id: str, length: int) -> Optional[IncrementalAnalysis]:
+        with self._lock:
+            analysis = self._by_upload.pop(upload_id, None)
+        if analysis is None:
+            return None
+        analysis.finish(length)
+        return analysis
+
+    def _expire(self, upload_id: str):
+        # Süresi dolan oturum kayıttan düşer; `finish` None döner ve tam analiz yapılır
+        with self._lock:
+            analysis = self._by_upload.get(upload_id)
+            if analysis is not None and analysis._expired:
+                del self._by_upload[upload_id]
+
+    def cancel(self, upload_id: str):
+        with self._lock:
+            analysis = self._by_upload.pop(upload_id, None)
+        if analysis is not None:
+            analysis.cancel()
+
+    def attach(self, video_id: int, analysis: IncrementalAnalysis):
+        with self._lock:
+            self._by_video[video_id] = analysis
+
+    def for_video(self, video_id: int) -> Optional[IncrementalAnalysis]:
+        return self._by_video.get(video_id)
+
+    def discard(self, video_id: int):
+        with self._lock:
+            analysis = self._by_video.pop(video_id, None)
+        if analysis is not None:
+            analysis.cancel()
@@ -0,0 +1,125 @@
+import asyncio
+import itertools
+import math
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Callable, Optional
+
+
+class QueueFull(Exception):
+    """Kuyrukta yer kalmadığında fırlatılır."""
+
+
+@dataclass
+class Job:
+    id: str
+    video_id: int
+    status: str = "queued"  # queued, running, completed, error
+    cost: float = 0.0
+    created_at: datetime = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class AnalysisQueue:
+    """Sınırlı boyutlu kuyruk + sabit sayıda işçi ile arka plan analiz havuzu.
+
+    `handler(video_id)` senkron bir fonksiyondur ve event loop'u bloklamamak
+    için bir thread havuzunda çalıştırılır. Ucuz işler önce alınır: işler
+    tahmini maliyetin büyüklük mertebesine (log2) göre sıralanır, aynı
+    mertebedekiler geliş sırasını korur.
+    """
+
+    def __init__(self, handler: Callable[[int], None], workers: int = 2,
+                 max_queued: int = 32, history: int = 1000):
+        self._handler = handler
+        self._workers = max(1, workers)
+        self._max_queued = max(1, max_queued)
+        self._history = history
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks = []
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._by_video = {}
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue(maxsize=self._max_queued)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix="analysis"
+        )
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def full(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, video_id: int, cost: float = 0.0) -> Job:
+        if self._queue is None:
+            raise RuntimeError("Analiz kuyruğu başlatılmadı")
+        job = Job(id=uuid.uuid4().hex, video_id=video_id, created_at=datetime.utcnow(), cost=cost)
+        try:
+            self._queue.put_nowait((int(math.log2(1 + max(cost, 0.0))), next(self._seq), job))
+        except asyncio.QueueFull:
+            raise QueueFull()
+        self._jobs[job.id] = job
+        self._by_video[video_id] = job.id
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def get_for_video(self, video_id: int) -> Optional[Job]:
+        job_id = self._by_video.get(video_id)
+        return self._jobs.get(job_id) if job_id else None
+
+    def _prune(self):
+        # Bitmiş işlerin geçmişini sınırlı tut
+        while len(self._jobs) > self._history:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status in ("queued", "running"):
+                break
+            del self._jobs[oldest_id]
+            if self._by_video.get(oldest.video_id) == oldest_id:
+                del self._by_video[oldest.video_id]
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job = await self._queue.get()
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            try:
+                await loop.run_in_executor(self._executor, self._handler, job.video_id)
+                job.status = "completed"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.status = "error"
+                job.error = str(e)
+            finally:
+                job.finished_at = datetime.utcnow()
+                self._queue.task_done()
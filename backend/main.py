@@ -1,19 +1,34 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, status
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Header, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Boolean
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import BigInteger, Column, Integer, Float, String, DateTime, ForeignKey, Boolean, Index, event, inspect, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Optional
 from pydantic import BaseModel
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-import cv2
-import numpy as np
 import os
+import base64
+import mimetypes
 import json
+import uuid
+from email.utils import formatdate
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+from cache import TTLCache
+from database import Base, SessionLocal, engine, get_async_db, upgrade_schema
+from incremental import IncrementalAnalyses, IncrementalAnalysis
+from jobs import AnalysisQueue, QueueFull
+from uploads import ResumableUploads, save_upload, UploadTooLarge, OffsetMismatch, UploadNotFound
+from storage import BlobStore
+from streaming import RangeFileResponse, etag_matches
+from analysis import analyze_video
+from probe import estimate_cost, probe_video
+from thumbnails import FILE_PATTERN, KEY_PATTERN, is_thumbnail_url, remove_thumbnails, thumbnail_dir
+from timeline import downsample, load_timeline, timeline_path_for
 
 # .env dosyasını yükle
 load_dotenv()
@@ -27,22 +42,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Location", "Upload-Offset", "Upload-Length", "Upload-Expires", "ETag",
+                    "Accept-Ranges", "Content-Range", "Content-Length"],
 )
 
 # JWT ayarları
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# <video> etiketi Authorization başlığı gönderemez; oynatma URL'si tek videoya
+# bağlı, kısa ömürlü bir token taşır
+STREAM_TOKEN_EXPIRE_MINUTES = int(os.getenv("STREAM_TOKEN_EXPIRE_MINUTES", "360"))
+
+# Doğrulanmış kullanıcı önbelleği (token konusu -> kullanıcı)
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+THUMBNAIL_CACHE_CONTROL = os.getenv("THUMBNAIL_CACHE_CONTROL", "private, max-age=31536000, immutable")
+
+# Arka plan analiz ayarları
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", os.cpu_count() or 1))
+ANALYSIS_QUEUE_SIZE = int(os.getenv("ANALYSIS_QUEUE_SIZE", "32"))
+
+# Yükleme ayarları
+UPLOAD_DIR = "uploads"
+PARTIAL_UPLOAD_DIR = os.path.join(UPLOAD_DIR, ".partial")
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(4 * 1024 * 1024 * 1024)))
+# Bu kadar saniye veri gelmeyen devam ettirilebilir yüklemeler silinir
+UPLOAD_TTL = float(os.getenv("UPLOAD_TTL", str(24 * 3600)))
 
 # Şifreleme
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-
-# Veritabanı bağlantısı
-SQLALCHEMY_DATABASE_URL = "sqlite:///./video_analyzer.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
 
 # Pydantic modelleri
 class UserBase(BaseModel):
@@ -52,7 +86,7 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
-class User(UserBase):
+class UserOut(UserBase):
     id: int
     is_active: bool
 
@@ -85,23 +119,56 @@ class Video(Base):
     analysis_results = Column(String)  # JSON formatında analiz sonuçları
     user_id = Column(Integer, ForeignKey("users.id"))
     thumbnail_path = Column(String, nullable=True)
+    file_size = Column(BigInteger, nullable=True)
+    content_hash = Column(String, nullable=True, index=True)  # sha256
+    duration = Column(Float, nullable=True)  # saniye
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    fps = Column(Float, nullable=True)
+    video_codec = Column(String, nullable=True)
+    audio_codec = Column(String, nullable=True)
 
-Base.metadata.create_all(bind=engine)
+    __table_args__ = (
+        # Kullanıcının videolarını yükleme tarihine göre sayfalamak için
+        Index("ix_videos_user_upload_date", "user_id", "upload_date", "id"),
+        Index("ix_videos_status", "status"),
+    )
 
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Liste görünümünde döndürülen hafif alanlar (analysis_results hariç)
+VIDEO_LIST_COLUMNS = (
+    Video.id, Video.title, Video.status, Video.upload_date,
+    Video.thumbnail_path, Video.file_size, Video.duration,
+)
+
+class VideoBlob(Base):
+    # Aynı içerik için tek dosya ve paylaşılan analiz sonucu
+    __tablename__ = "video_blobs"
+    content_hash = Column(String, primary_key=True)  # sha256
+    file_path = Column(String)
+    file_size = Column(BigInteger)
+    ref_count = Column(Integer, default=0)
+    analysis_results = Column(String, nullable=True)
+    thumbnail_path = Column(String, nullable=True)
+
+Base.metadata.create_all(bind=engine)
+# Önceki sürümlerle oluşturulmuş veritabanlarına yeni sütunlar eklenir
+upgrade_schema(engine, Base.metadata)
 
 # Yardımcı fonksiyonlar
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+# bcrypt bilerek yavaştır (~100ms); event loop'u bloklamamak için thread havuzunda çalışır
+async def verify_password(plain_password, hashed_password):
+    return await run_in_threadpool(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash(password):
+    return await run_in_threadpool(pwd_context.hash, password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_user(mapper, connection, target):
+    # ORM üzerinden güncellenen/silinen kullanıcı önbellekten düşer (ad değiştiyse eski adı da).
+    # Toplu update()/delete() ifadeleri bu olayları tetiklemez; kullanıcılar nesne üzerinden değiştirilmeli
+    for username in {target.username, *inspect(target).attrs.username.history.deleted}:
+        user_cache.invalidate(username)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -113,7 +180,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Geçersiz kimlik bilgileri",
@@ -122,86 +189,240 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        # Oynatma token'ı yalnızca kendi videosunun akışında geçerlidir
+        if username is None or payload.get("scope") == "stream":
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.username == token_data.username).first()
+    return await load_user(db, token_data.username, credentials_exception)
+
+async def load_user(db: AsyncSession, username: str, credentials_exception: HTTPException) -> User:
+    user = user_cache.get(username)
     if user is None:
-        raise credentials_exception
+        user = await get_user_by_username(db, username)
+        if user is None:
+            raise credentials_exception
+        # Oturum kapandıktan sonra da yüklü alanlar okunabilir kalır
+        db.expunge(user)
+        user_cache.set(username, user)
     return user
 
-# Video analiz fonksiyonu
-def analyze_video(video_path: str) -> dict:
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise HTTPException(status_code=400, detail="Video açılamadı")
-    
-    # Video özellikleri
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    duration = frame_count / fps
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    
-    # Hareket analizi
-    motion_frames = 0
-    prev_frame = None
-    motion_intensity = []
-    
-    # Thumbnail oluştur
-    ret, frame = cap.read()
-    if ret:
-        thumbnail_path = f"thumbnails/{os.path.basename(video_path)}.jpg"
-        os.makedirs("thumbnails", exist_ok=True)
-        cv2.imwrite(thumbnail_path, frame)
-    
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-            
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (21, 21), 0)
-        
-        if prev_frame is None:
-            prev_frame = gray
-            continue
-            
-        frame_diff = cv2.absdiff(prev_frame, gray)
-        thresh = cv2.threshold(frame_diff, 25, 255, cv2.THRESH_BINARY)[1]
-        
-        motion_intensity.append(np.sum(thresh))
-        if np.sum(thresh) > 1000:  # Hareket eşiği
-            motion_frames += 1
-            
-        prev_frame = gray
-    
-    cap.release()
-    
-    # Analiz sonuçları
-    results = {
-        "duration": duration,
-        "fps": fps,
-        "frame_count": frame_count,
-        "resolution": f"{width}x{height}",
-        "motion_percentage": (motion_frames / frame_count) * 100,
-        "motion_intensity": {
-            "min": float(np.min(motion_intensity)),
-            "max": float(np.max(motion_intensity)),
-            "mean": float(np.mean(motion_intensity))
-        },
-        "thumbnail_path": thumbnail_path if ret else None
-    }
-    
-    return results
+async def get_stream_user(
+    video_id: int,
+    token: Optional[str] = None,
+    bearer: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    # Authorization başlığı ya da stream-url'den alınan `token` sorgu parametresi
+    if bearer:
+        return await get_current_user(bearer, db)
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Geçersiz kimlik bilgileri",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    if not token:
+        raise credentials_exception
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    if payload.get("scope") != "stream" or payload.get("video") != video_id or not payload.get("sub"):
+        raise credentials_exception
+    return await load_user(db, payload["sub"], credentials_exception)
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalar_one_or_none()
+
+async def get_owned_video(db: AsyncSession, video_id: int, user: User) -> Video:
+    result = await db.execute(
+        select(Video).where(Video.id == video_id, Video.user_id == user.id)
+    )
+    video = result.scalar_one_or_none()
+    if video is None:
+        raise HTTPException(status_code=404, detail="Video bulunamadı")
+    return video
+
+def process_video(video_id: int):
+    # Arka plan işçisinde çalışır, kendi oturumunu açar
+    db = SessionLocal()
+    try:
+        video = db.get(Video, video_id)
+        if video is None:
+            return
+        blob = db.get(VideoBlob, video.content_hash) if video.content_hash else None
+        if blob is not None and blob.analysis_results:
+            # Aynı içerik bu arada başka bir iş tarafından analiz edildi
+            video.status = "completed"
+            video.analysis_results = blob.analysis_results
+            video.thumbnail_path = blob.thumbnail_path
+            video.duration = json.loads(blob.analysis_results).get("duration")
+            db.commit()
+            return
+
+        video.status = "analyzing"
+        db.commit()
+        try:
+            # Yükleme sırasında akış olarak taranmışsa yalnızca sonuç toplanır
+            incremental = incremental_analyses.for_video(video_id)
+            results = incremental.results(video.file_path, video.content_hash) if incremental else None
+            if results is None:
+                results = analyze_video(video.file_path, thumbnail_key=video.content_hash)
+        except Exception:
+            video.status = "error"
+            db.commit()
+            raise
+        video.status = "completed"
+        video.analysis_results = json.dumps(results)
+        video.thumbnail_path = results.get("thumbnail_path")
+        video.duration = results.get("duration")
+        if blob is not None:
+            blob.analysis_results = video.analysis_results
+            blob.thumbnail_path = video.thumbnail_path
+        db.commit()
+    finally:
+        incremental_analyses.discard(video_id)
+        db.close()
+
+analysis_queue = AnalysisQueue(
+    process_video, workers=ANALYSIS_WORKERS, max_queued=ANALYSIS_QUEUE_SIZE
+)
+incremental_analyses = IncrementalAnalyses(PARTIAL_UPLOAD_DIR)
+# Süresi dolan ya da iptal edilen yüklemenin artımlı analizi de kayıttan düşer
+resumable_uploads = ResumableUploads(PARTIAL_UPLOAD_DIR, MAX_UPLOAD_SIZE, ttl=UPLOAD_TTL,
+                                     on_discard=incremental_analyses.cancel)
+blob_store = BlobStore(BLOB_DIR)
+
+def queue_full_exception():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Analiz kuyruğu dolu, lütfen daha sonra tekrar deneyin",
+        headers={"Retry-After": "30"},
+    )
+
+def too_large_exception():
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Dosya boyutu çok büyük (en fazla {MAX_UPLOAD_SIZE} bayt)",
+    )
+
+async def acquire_blob(db: AsyncSession, tmp_path: str, filename: str, file_size: int,
+                       content_hash: str) -> VideoBlob:
+    # Dosyayı içerik deposuna al ve referans sayısını artır
+    blob = await db.get(VideoBlob, content_hash)
+    if blob is None:
+        ext = os.path.splitext(filename)[1]
+        path = await run_in_threadpool(blob_store.adopt, tmp_path, content_hash, ext)
+        blob = VideoBlob(content_hash=content_hash, file_path=path, file_size=file_size, ref_count=0)
+        db.add(blob)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Aynı içerik eşzamanlı olarak yüklendi
+            await db.rollback()
+            blob = await db.get(VideoBlob, content_hash)
+            if blob.file_path != path:
+                blob_store.remove(path)
+    else:
+        blob_store.remove(tmp_path)
+    await db.execute(
+        update(VideoBlob)
+        .where(VideoBlob.content_hash == content_hash)
+        .values(ref_count=VideoBlob.ref_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await db.refresh(blob)
+    return blob
+
+async def release_blob(db: AsyncSession, content_hash: str):
+    # Referans sayısını azalt, son sahip silindiğinde dosyaları kaldır
+    await db.execute(
+        update(VideoBlob)
+        .where(VideoBlob.content_hash == content_hash)
+        .values(ref_count=VideoBlob.ref_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+    blob = await db.get(VideoBlob, content_hash)
+    await db.refresh(blob)
+    if blob.ref_count <= 0:
+        blob_store.remove(blob.file_path)
+        if not is_thumbnail_url(blob.thumbnail_path):
+            blob_store.remove(blob.thumbnail_path)
+        remove_thumbnails([blob.content_hash])
+        blob_store.remove(timeline_path_for(blob.file_path))
+        await db.delete(blob)
+
+async def register_video(db: AsyncSession, user_id: int, title: str, tmp_path: str, filename: str,
+                         file_size: int, content_hash: str,
+                         incremental: Optional[IncrementalAnalysis] = None) -> dict:
+    # Yüklenen dosyayı kaydet ve gerekiyorsa analizi arka plan kuyruğuna gönder
+    blob = await acquire_blob(db, tmp_path, filename, file_size, content_hash)
+    # Kap başlığından hızlı ön okuma: süre ve maliyet, analiz beklenmeden bilinir
+    meta = await run_in_threadpool(probe_video, blob.file_path)
+    video = Video(
+        title=title,
+        file_path=blob.file_path,
+        status="uploaded",
+        user_id=user_id,
+        file_size=file_size,
+        content_hash=content_hash,
+        duration=meta.duration,
+        width=meta.width,
+        height=meta.height,
+        fps=meta.fps,
+        video_codec=meta.video_codec,
+        audio_codec=meta.audio_codec,
+    )
+    if blob.analysis_results:
+        # Aynı içerik daha önce analiz edildi, sonucu yeniden kullan
+        video.status = "completed"
+        video.analysis_results = blob.analysis_results
+        video.thumbnail_path = blob.thumbnail_path
+        video.duration = json.loads(blob.analysis_results).get("duration")
+    db.add(video)
+    await db.commit()
+    await db.refresh(video)
+
+    if video.status == "completed":
+        if incremental is not None:
+            incremental.cancel()
+        return {"id": video.id, "job_id": None, "status": video.status, "cached": True}
+
+    cost = estimate_cost(meta)
+    if incremental is not None and incremental.active:
+        # Tarama yüklemeyle birlikte ilerledi; kalan iş küçük
+        incremental_analyses.attach(video.id, incremental)
+        cost = 0.0
+    try:
+        job = analysis_queue.submit(video.id, cost=cost)
+    except QueueFull:
+        # Kayıt ve içerik referansı geri alınır; istemci daha sonra yeniden yükler
+        incremental_analyses.discard(video.id)
+        await db.delete(video)
+        await release_blob(db, content_hash)
+        await db.commit()
+        raise queue_full_exception()
+
+    return {"id": video.id, "job_id": job.id, "status": video.status}
+
+@app.on_event("startup")
+async def start_analysis_queue():
+    await analysis_queue.start()
+    # Önceki çalıştırmalardan kalan süresi dolmuş yüklemeler
+    await run_in_threadpool(resumable_uploads.sweep)
+
+@app.on_event("shutdown")
+async def stop_analysis_queue():
+    await analysis_queue.stop()
 
 # API Endpoints
 @app.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await get_user_by_username(db, form_data.username)
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Geçersiz kullanıcı adı veya şifre",
@@ -213,107 +434,307 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
-@app.post("/users/", response_model=User)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.username == user.username).first()
+@app.post("/users/", response_model=UserOut)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await get_user_by_username(db, user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Kullanıcı adı zaten kullanımda")
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
-@app.post("/upload-video/")
+@app.post("/upload-video/", status_code=status.HTTP_202_ACCEPTED)
 async def upload_video(
     file: UploadFile = File(...),
     title: str = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Video kaydetme
-    video_path = f"uploads/{file.filename}"
-    os.makedirs("uploads", exist_ok=True)
-    
-    with open(video_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
-    
-    # Veritabanına kaydet
-    video = Video(
-        title=title or file.filename,
-        file_path=video_path,
-        status="uploaded",
-        user_id=current_user.id
+    if analysis_queue.full():
+        raise queue_full_exception()
+
+    # Video kaydetme (parça parça, belleğe tamamen okumadan)
+    filename = os.path.basename(file.filename)
+    tmp_path = os.path.join(PARTIAL_UPLOAD_DIR, uuid.uuid4().hex)
+    try:
+        file_size, content_hash = await save_upload(
+            file, tmp_path, MAX_UPLOAD_SIZE, UPLOAD_CHUNK_SIZE
+        )
+    except UploadTooLarge:
+        raise too_large_exception()
+
+    return await register_video(
+        db, current_user.id, title or filename, tmp_path, filename, file_size, content_hash
     )
-    db.add(video)
-    db.commit()
-    db.refresh(video)
-    
-    # Video analizi
+
+# Devam ettirilebilir yükleme (tus benzeri): POST ile oturum aç, HEAD ile ofseti
+# öğren, PATCH ile kalan baytları gönder.
+def get_upload_session(upload_id: str, user: User) -> dict:
     try:
-        results = analyze_video(video_path)
-        video.status = "completed"
-        video.analysis_results = json.dumps(results)
-        video.thumbnail_path = results.get("thumbnail_path")
-        db.commit()
-    except Exception as e:
-        video.status = "error"
-        db.commit()
-        raise HTTPException(status_code=500, detail=str(e))
-    
-    return {"id": video.id, "status": video.status, "results": results}
+        meta = resumable_uploads.info(upload_id)
+    except UploadNotFound:
+        meta = None
+    if meta is None or meta["user_id"] != user.id:
+        raise HTTPException(status_code=404, detail="Yükleme bulunamadı")
+    return meta
+
+@app.post("/uploads/", status_code=status.HTTP_201_CREATED)
+def create_upload(
+    response: Response,
+    filename: str,
+    title: str = None,
+    incremental: bool = False,
+    upload_length: int = Header(...),
+    current_user: User = Depends(get_current_user),
+):
+    if upload_length <= 0:
+        raise HTTPException(status_code=400, detail="Geçersiz Upload-Length")
+    try:
+        upload_id = resumable_uploads.create(upload_length, {
+            "user_id": current_user.id,
+            "filename": os.path.basename(filename),
+            "title": title or filename,
+        })
+    except UploadTooLarge:
+        raise too_large_exception()
+    # İsteğe bağlı: akışla okunabilen kaplarda analiz yükleme sürerken başlar
+    if incremental:
+        incremental = incremental_analyses.start(upload_id, resumable_uploads.part_path(upload_id))
+    response.headers["Location"] = f"/uploads/{upload_id}"
+    response.headers["Upload-Offset"] = "0"
+    return {"upload_id": upload_id, "upload_offset": 0, "upload_length": upload_length,
+            "incremental": incremental}
+
+@app.head("/uploads/{upload_id}")
+def get_upload_offset(upload_id: str, current_user: User = Depends(get_current_user)):
+    meta = get_upload_session(upload_id, current_user)
+    return Response(headers={
+        "Upload-Offset": str(meta["offset"]),
+        "Upload-Length": str(meta["length"]),
+        "Upload-Expires": formatdate(meta["expires"], usegmt=True),
+        "Cache-Control": "no-store",
+    })
+
+@app.patch("/uploads/{upload_id}")
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    get_upload_session(upload_id, current_user)
+    try:
+        meta = await resumable_uploads.append(upload_id, upload_offset, request.stream())
+    except OffsetMismatch as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Ofset uyuşmuyor",
+            headers={"Upload-Offset": str(e.expected)},
+        )
+    except UploadTooLarge:
+        raise too_large_exception()
+    finally:
+        incremental_analyses.notify(upload_id)
+
+    response.headers["Upload-Offset"] = str(meta["offset"])
+    result = {"upload_id": upload_id, "upload_offset": meta["offset"], "upload_length": meta["length"]}
+    if meta["offset"] < meta["length"]:
+        return result
+
+    # Yükleme tamamlandı
+    if analysis_queue.full():
+        raise queue_full_exception()
+    tmp_path = os.path.join(PARTIAL_UPLOAD_DIR, uuid.uuid4().hex)
+    file_size, content_hash = resumable_uploads.finish(upload_id, tmp_path)
+    incremental = incremental_analyses.finish(upload_id, file_size)
+    result.update(await register_video(
+        db, current_user.id, meta["title"], tmp_path, meta["filename"], file_size, content_hash,
+        incremental=incremental,
+    ))
+    return result
+
+@app.get("/uploads/{upload_id}/analysis")
+def get_upload_analysis(upload_id: str, current_user: User = Depends(get_current_user)):
+    # Yükleme sürerken biriken ara hareket sonuçları
+    meta = get_upload_session(upload_id, current_user)
+    incremental = incremental_analyses.get(upload_id)
+    if incremental is None:
+        raise HTTPException(status_code=404, detail="Artımlı analiz bulunamadı")
+    return {"upload_offset": meta["offset"], "upload_length": meta["length"], **incremental.to_dict()}
+
+@app.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def cancel_upload(upload_id: str, current_user: User = Depends(get_current_user)):
+    get_upload_session(upload_id, current_user)
+    resumable_uploads.discard(upload_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-@app.get("/videos/", response_model=List[dict])
-def get_videos(
-    skip: int = 0,
+def encode_cursor(upload_date: datetime, video_id: int) -> str:
+    raw = f"{upload_date.isoformat()}|{video_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        upload_date, video_id = raw.split("|")
+        return datetime.fromisoformat(upload_date), int(video_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+
+@app.get("/videos/")
+async def get_videos(
+    response: Response,
+    cursor: Optional[str] = None,
     limit: int = 10,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    videos = db.query(Video).filter(Video.user_id == current_user.id).offset(skip).limit(limit).all()
+    # (upload_date, id) üzerinden keyset sayfalama: OFFSET taraması yapılmaz,
+    # her sayfa (user_id, upload_date, id) indeksinden doğrudan okunur.
+    # Sonraki sayfanın cursor'ı X-Next-Cursor başlığında döner.
+    limit = min(max(limit, 1), 100)
+    query = select(*VIDEO_LIST_COLUMNS).where(Video.user_id == current_user.id)
+    if cursor:
+        query = query.where(tuple_(Video.upload_date, Video.id) < decode_cursor(cursor))
+    query = query.order_by(Video.upload_date.desc(), Video.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+
+    videos = [row._asdict() for row in rows[:limit]]
+    if len(rows) > limit:
+        last = videos[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last["upload_date"], last["id"])
     return videos
 
 @app.get("/videos/{video_id}")
-def get_video(
+async def get_video(
     video_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    video = db.query(Video).filter(
-        Video.id == video_id,
-        Video.user_id == current_user.id
-    ).first()
-    if video is None:
-        raise HTTPException(status_code=404, detail="Video bulunamadı")
+    video = await get_owned_video(db, video_id, current_user)
     return video
 
+@app.get("/videos/{video_id}/status")
+async def get_video_status(
+    video_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    video = await get_owned_video(db, video_id, current_user)
+    job = analysis_queue.get_for_video(video.id)
+    incremental = incremental_analyses.for_video(video.id)
+    return {
+        "id": video.id,
+        "status": video.status,
+        "job": job.to_dict() if job else None,
+        "queue_size": analysis_queue.qsize(),
+        "incremental": incremental.to_dict() if incremental else None,
+    }
+
+@app.get("/videos/{video_id}/motion")
+async def get_video_motion(
+    video_id: int,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    width: int = 800,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Hareket zaman serisini grafik genişliğine göre min/max dilimlerine indirger
+    video = await get_owned_video(db, video_id, current_user)
+    timeline = json.loads(video.analysis_results or "{}").get("timeline")
+    if not timeline or not os.path.exists(timeline["path"]):
+        raise HTTPException(status_code=404, detail="Hareket verisi bulunamadı")
+    values = load_timeline(timeline["path"])
+    return await run_in_threadpool(
+        downsample, values, timeline["interval"], start, end, min(max(width, 1), 10000)
+    )
+
+@app.get("/videos/{video_id}/stream-url")
+async def get_video_stream_url(
+    video_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    video = await get_owned_video(db, video_id, current_user)
+    expires = timedelta(minutes=STREAM_TOKEN_EXPIRE_MINUTES)
+    token = create_access_token(
+        data={"sub": current_user.username, "scope": "stream", "video": video.id}, expires_delta=expires
+    )
+    return {"url": f"/videos/{video.id}/stream?token={token}", "expires_in": int(expires.total_seconds())}
+
+@app.api_route("/videos/{video_id}/stream", methods=["GET", "HEAD"])
+async def stream_video(
+    video_id: int,
+    current_user: User = Depends(get_stream_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Range/206 ve koşullu istekler; oynatıcı ileri sarınca yalnızca gereken aralık okunur
+    video = await get_owned_video(db, video_id, current_user)
+    if not os.path.isfile(video.file_path):
+        raise HTTPException(status_code=404, detail="Video dosyası bulunamadı")
+    media_type = mimetypes.guess_type(video.file_path)[0] or "application/octet-stream"
+    return RangeFileResponse(video.file_path, media_type=media_type)
+
+@app.get("/thumbnails/{key}/{name}")
+async def get_thumbnail(
+    key: str,
+    name: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Yalnızca bu içeriğe sahip bir videosu olan kullanıcıya sunulur. Dosyalar
+    # içerik özetiyle adlandırıldığından değişmez; istemci süresiz saklayabilir
+    # (paylaşılan önbellekler saklamaz), yeniden doğrulamada 304 döner
+    if not KEY_PATTERN.match(key) or not FILE_PATTERN.match(name):
+        raise HTTPException(status_code=404, detail="Küçük resim bulunamadı")
+    owned = await db.scalar(
+        select(Video.id).where(Video.user_id == current_user.id, Video.content_hash == key).limit(1)
+    )
+    if owned is None:
+        raise HTTPException(status_code=404, detail="Küçük resim bulunamadı")
+    path = os.path.join(thumbnail_dir(key), name)
+    etag = f'"{key[:32]}-{name}"'
+    headers = {"ETag": etag, "Cache-Control": THUMBNAIL_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Küçük resim bulunamadı")
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
+
 @app.delete("/videos/{video_id}")
-def delete_video(
+async def delete_video(
     video_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    video = db.query(Video).filter(
-        Video.id == video_id,
-        Video.user_id == current_user.id
-    ).first()
-    if video is None:
-        raise HTTPException(status_code=404, detail="Video bulunamadı")
+    video = await get_owned_video(db, video_id, current_user)
     
-    # Dosyaları sil
-    if os.path.exists(video.file_path):
-        os.remove(video.file_path)
-    if video.thumbnail_path and os.path.exists(video.thumbnail_path):
-        os.remove(video.thumbnail_path)
+    # Dosyaları sil (paylaşılan içerik yalnızca son sahip silindiğinde kaldırılır)
+    if video.content_hash and await db.get(VideoBlob, video.content_hash) is not None:
+        await release_blob(db, video.content_hash)
+    else:
+        if os.path.exists(video.file_path):
+            os.remove(video.file_path)
+        if video.thumbnail_path and not is_thumbnail_url(video.thumbnail_path) \
+                and os.path.exists(video.thumbnail_path):
+            os.remove(video.thumbnail_path)
+        thumbnails = json.loads(video.analysis_results or "{}").get("thumbnails") or {}
+        remove_thumbnails([thumbnails.get("key")])
+        if os.path.exists(timeline_path_for(video.file_path)):
+            os.remove(timeline_path_for(video.file_path))
     
-    db.delete(video)
-    db.commit()
+    await db.delete(video)
+    await db.commit()
     return {"message": "Video başarıyla silindi"}
 
 if __name__ == "__main__":
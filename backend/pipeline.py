@@ -0,0 +1,150 @@
+import os
+import queue
+import threading
+import time
+from typing import Iterable, Optional
+
+# Her analizcinin bekleyen kare kuyruğu; çözücü en yavaş analizcinin en fazla bu kadar önüne geçer
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+# 0 ise analizciler çözücüyle aynı thread'de sırayla çalışır (hata ayıklama, tek çekirdek)
+PIPELINE_THREADS = os.getenv("PIPELINE_THREADS", "1") == "1"
+
+_DONE = object()
+
+
+class FramePipeline:
+    """Tek çözücüden kayıtlı analizcilere kare dağıtır.
+
+    Analizciler `observe(indis, kare)` yöntemi olan nesnelerdir ve adlarıyla
+    `add` ile kaydedilir. `run` (indis, kare) çiftlerini kaynaktan bir kez
+    alır ve her analizcinin sınırlı kuyruğuna aynı kareyi koyar; her analizci
+    kendi thread'inde çalışır (OpenCV çağrıları GIL'i bırakır). Bir kuyruk
+    dolunca çözücü bekler, böylece bellekteki kare sayısı kuyruk boyuyla
+    sınırlı kalır. Yeni bir analizci yalnızca bir kuyruk ekler, çözüm sayısı
+    değişmez. Kareler paylaşıldığından analizciler onları yerinde
+    değiştirmemelidir. Kaynak bitince isteğe bağlı `close(complete)` yöntemi
+    çağrılır; analizciler son örnekten sonraki hedeflerini son gördükleri
+    kareyle tamamlayabilir.
+    """
+
+    def __init__(self, queue_size: int = PIPELINE_QUEUE_SIZE, threaded: Optional[bool] = None):
+        self.queue_size = max(1, queue_size)
+        self.threaded = PIPELINE_THREADS if threaded is None else threaded
+        self.analyzers = {}
+
+    def add(self, name: str, analyzer):
+        if name in self.analyzers:
+            raise ValueError(f"Analizci zaten kayıtlı: {name}")
+        self.analyzers[name] = analyzer
+        return analyzer
+
+    def run(self, frames: Iterable[tuple], complete: bool = True) -> dict:
+        """Kaynağı sonuna kadar dağıtır; aşama sürelerini (saniye) döner.
+
+        `decode` kaynağın kare üretme süresi, `stalled` çözücünün dolu
+        kuyrukları beklediği süre, `analyzers` her analizcinin kendi
+        karelerinde geçirdiği süredir. Analizcilerden biri hata verirse
+        dağıtım durur ve hata çağırana iletilir. `complete` kaynağın videonun
+        sonuna kadar gittiğini bildirir; paralel taramada yalnızca son
+        segment için doğrudur.
+        """
+        busy = dict.fromkeys(self.analyzers, 0.0)
+        stats = {"frames": 0, "decode": 0.0, "stalled": 0.0}
+        started = time.perf_counter()
+        if self.threaded and self.analyzers:
+            self._run_threaded(frames, busy, stats)
+        else:
+            self._run_inline(frames, busy, stats)
+        for name, analyzer in self.analyzers.items():
+            if hasattr(analyzer, "close"):
+                t = time.perf_counter()
+                analyzer.close(complete)
+                busy[name] += time.perf_counter() - t
+        return {
+            "frames": stats["frames"],
+            "wall": round(time.perf_counter() - started, 3),
+            "decode": round(stats["decode"], 3),
+            "stalled": round(stats["stalled"], 3),
+            "analyzers": {name: round(seconds, 3) for name, seconds in busy.items()},
+        }
+
+    def _run_inline(self, frames, busy, stats):
+        iterator = iter(frames)
+        while True:
+            t = time.perf_counter()
+            item = next(iterator, _DONE)
+            stats["decode"] += time.perf_counter() - t
+            if item is _DONE:
+                return
+            stats["frames"] += 1
+            for name, analyzer in self.analyzers.items():
+                t = time.perf_counter()
+                analyzer.observe(*item)
+                busy[name] += time.perf_counter() - t
+
+    def _run_threaded(self, frames, busy, stats):
+        queues = {name: queue.Queue(self.queue_size) for name in self.analyzers}
+        errors = []
+
+        def work(name, analyzer, inbox):
+            # Hatadan sonra da kuyruk boşaltılır ki çözücü dolu kuyrukta takılmasın
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    return
+                if errors:
+                    continue
+                t = time.perf_counter()
+                try:
+                    analyzer.observe(*item)
+                except Exception as e:
+                    errors.append(e)
+                busy[name] += time.perf_counter() - t
+
+        workers = [
+            threading.Thread(target=work, args=(name, analyzer, queues[name]), name=f"pipeline-{name}", daemon=True)
+            for name, analyzer in self.analyzers.items()
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            iterator = iter(frames)
+            while not errors:
+                t = time.perf_counter()
+                item = next(iterator, _DONE)
+                stats["decode"] += time.perf_counter() - t
+                if item is _DONE:
+                    break
+                stats["frames"] += 1
+                for inbox in queues.values():
+                    if inbox.full():
+                        t = time.perf_counter()
+                        inbox.put(item)
+                        stats["stalled"] += time.perf_counter() - t
+                    else:
+                        inbox.put(item)
+        finally:
+            for inbox in queues.values():
+                inbox.put(_DONE)
+            for worker in workers:
+                worker.join()
+        if errors:
+            raise errors[0]
+
+
+def combine(parts: list) -> Optional[dict]:
+    # Paralel segmentlerin aşama süreleri toplanır; `wall` en uzun segmentinkidir
+    parts = [part for part in parts if part]
+    if not parts:
+        return None
+    analyzers = {}
+    for part in parts:
+        for name, seconds in part["analyzers"].items():
+            analyzers[name] = round(analyzers.get(name, 0.0) + seconds, 3)
+    return {
+        "frames": sum(part["frames"] for part in parts),
+        "wall": max(part["wall"] for part in parts),
+        "decode": round(sum(part["decode"] for part in parts), 3),
+        "stalled": round(sum(part["stalled"] for part in parts), 3),
+        "analyzers": analyzers,
+    }
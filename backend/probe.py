@@ -0,0 +1,119 @@
+import json
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import cv2
+
+from analysis import analysis_size, get_profile
+
+# ffprobe'un kap başlığından okuyacağı en fazla bayt (kare çözülmez)
+PROBE_MAX_BYTES = int(os.getenv("PROBE_MAX_BYTES", str(1024 * 1024)))
+PROBE_TIMEOUT = float(os.getenv("PROBE_TIMEOUT", "10"))
+# Anahtar kare profili için varsayılan anahtar kare aralığı (saniye)
+KEYFRAME_INTERVAL = 2.0
+
+
+@dataclass
+class VideoMetadata:
+    file_size: int
+    duration: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    frame_count: Optional[int] = None
+    video_codec: Optional[str] = None
+    audio_codec: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _rate(value: Optional[str]) -> Optional[float]:
+    # ffprobe oranları "30000/1001" biçiminde verir
+    try:
+        num, _, den = (value or "").partition("/")
+        rate = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return rate or None
+
+
+def _ffprobe(path: str, meta: VideoMetadata) -> bool:
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-probesize", str(PROBE_MAX_BYTES),
+             "-show_entries",
+             "format=duration:stream=codec_type,codec_name,width,height,avg_frame_rate,nb_frames",
+             "-of", "json", path],
+            capture_output=True, timeout=PROBE_TIMEOUT, check=True,
+        ).stdout
+        info = json.loads(output)
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return False
+
+    duration = info.get("format", {}).get("duration")
+    meta.duration = float(duration) if duration else None
+    for stream in info.get("streams", []):
+        if stream.get("codec_type") == "video" and meta.video_codec is None:
+            meta.video_codec = stream.get("codec_name")
+            meta.width = stream.get("width")
+            meta.height = stream.get("height")
+            meta.fps = _rate(stream.get("avg_frame_rate"))
+            if str(stream.get("nb_frames", "")).isdigit():
+                meta.frame_count = int(stream["nb_frames"])
+        elif stream.get("codec_type") == "audio" and meta.audio_codec is None:
+            meta.audio_codec = stream.get("codec_name")
+    return meta.video_codec is not None
+
+
+def _opencv(path: str, meta: VideoMetadata) -> bool:
+    # Yalnızca kap özellikleri okunur, kare çözülmez (ses bilgisi verilmez)
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            return False
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        meta.video_codec = "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip("\0 ") or None
+        meta.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or None
+        meta.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or None
+        meta.fps = cap.get(cv2.CAP_PROP_FPS) or None
+        meta.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+        if meta.fps and meta.frame_count:
+            meta.duration = meta.frame_count / meta.fps
+        return True
+    finally:
+        cap.release()
+
+
+def probe_video(path: str) -> VideoMetadata:
+    """Süre, çözünürlük, fps ve codec bilgisini yalnızca kap başlığından okur.
+
+    ffprobe varsa `PROBE_MAX_BYTES` ile sınırlı olarak o kullanılır, yoksa
+    OpenCV'nin kap özelliklerine düşülür. Okunamayan alanlar None kalır.
+    """
+    meta = VideoMetadata(file_size=os.path.getsize(path))
+    if shutil.which("ffprobe") is None or not _ffprobe(path, meta):
+        _opencv(path, meta)
+    if meta.frame_count is None and meta.duration and meta.fps:
+        meta.frame_count = int(round(meta.duration * meta.fps))
+    return meta
+
+
+def estimate_cost(meta: VideoMetadata, profile=None) -> float:
+    """Analizin göreli maliyeti: taranacak kare sayısı x analiz megapikseli.
+
+    Kuyruk sıralaması için kullanılır; mutlak süre tahmini değildir.
+    Bilgi yoksa dosya boyutu (MB) kaba bir vekil olarak alınır.
+    """
+    profile = get_profile(profile)
+    if not (meta.width and meta.height and meta.fps and meta.frame_count):
+        return meta.file_size / 2**20
+    width, height = analysis_size(meta.width, meta.height, profile.max_width)
+    if profile.keyframes_only:
+        frames = meta.frame_count / (meta.fps * KEYFRAME_INTERVAL)
+    else:
+        frames = meta.frame_count / profile.step_for(meta.fps)
+    return frames * width * height / 1e6
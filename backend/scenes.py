@@ -0,0 +1,102 @@
+import os
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Çekim (sahne) kesmesi tespiti hareket taramasıyla aynı geçişte yapılır
+SCENE_DETECTION = os.getenv("SCENE_DETECTION", "1") == "1"
+# Uyarlanır eşik: her örneğin iki yanındaki bu kadar saniyelik uzaklıkların medyanı + k * MAD
+SCENE_WINDOW = float(os.getenv("SCENE_WINDOW", "2.0"))
+SCENE_SENSITIVITY = float(os.getenv("SCENE_SENSITIVITY", "6.0"))
+SCENE_MIN_DISTANCE = float(os.getenv("SCENE_MIN_DISTANCE", "0.3"))  # Bhattacharyya uzaklığı tabanı
+# Bunun üstü her zaman kesme sayılır; seyrek örneklemede komşu örnekler de farklı çekimlerden olabilir
+SCENE_MAX_DISTANCE = float(os.getenv("SCENE_MAX_DISTANCE", "0.5"))
+SCENE_MIN_CHANGED = float(os.getenv("SCENE_MIN_CHANGED", "0.2"))  # kesmede değişmesi gereken piksel oranı
+SCENE_MIN_SECONDS = float(os.getenv("SCENE_MIN_SECONDS", "0.5"))  # iki kesme arası en kısa süre
+# Temsili küçük resim kesmelere bu kadar saniyeden yakın karelerden seçilmez
+SCENE_THUMBNAIL_GUARD = float(os.getenv("SCENE_THUMBNAIL_GUARD", "0.5"))
+
+HIST_SIZE = (64, 36)
+HIST_BINS = [16, 8]  # ton x doygunluk
+GRAY_BINS = [32]
+WINDOW_MAX_SAMPLES = 32  # pencerenin bir yanı
+CHUNK = 8192
+
+
+class SceneHistogram:
+    """Ardışık örneklerin renk histogramları arasındaki Bhattacharyya uzaklığı.
+
+    Kare önce 64x36'ya (en yakın komşu, maliyeti kare boyutundan bağımsız)
+    indirilir; renkli karelerde ton/doygunluk, gri karelerde parlaklık
+    histogramı kullanılır.
+    """
+
+    def __init__(self):
+        self._tiny = np.empty((HIST_SIZE[1], HIST_SIZE[0], 3), np.uint8)
+        self._hsv = np.empty_like(self._tiny)
+        self._prev = None
+
+    def reset(self):
+        self._prev = None
+
+    def update(self, frame: np.ndarray) -> Optional[float]:
+        if frame.ndim == 3:
+            tiny = cv2.resize(frame, HIST_SIZE, dst=self._tiny, interpolation=cv2.INTER_NEAREST)
+            hsv = cv2.cvtColor(tiny, cv2.COLOR_BGR2HSV, dst=self._hsv)
+            hist = cv2.calcHist([hsv], [0, 1], None, HIST_BINS, [0, 180, 0, 256])
+        else:
+            tiny = cv2.resize(frame, HIST_SIZE, interpolation=cv2.INTER_NEAREST)
+            hist = cv2.calcHist([tiny], [0], None, GRAY_BINS, [0, 256])
+        cv2.normalize(hist, hist, 1.0, 0.0, cv2.NORM_L1)
+        distance = None
+        if self._prev is not None and self._prev.shape == hist.shape:
+            distance = cv2.compareHist(self._prev, hist, cv2.HISTCMP_BHATTACHARYYA)
+        self._prev = hist
+        return distance
+
+
+def adaptive_threshold(distances: np.ndarray, half: int) -> np.ndarray:
+    # Kayan pencerede medyan + k * MAD; bellek için parçalar halinde
+    padded = np.pad(distances, half, mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1)
+    threshold = np.empty_like(distances)
+    for start in range(0, distances.size, CHUNK):
+        block = windows[start:start + CHUNK]
+        median = np.median(block, axis=1)
+        mad = np.median(np.abs(block - median[:, None]), axis=1)
+        threshold[start:start + CHUNK] = median + SCENE_SENSITIVITY * 1.4826 * mad
+    return np.clip(threshold, SCENE_MIN_DISTANCE, max(SCENE_MIN_DISTANCE, SCENE_MAX_DISTANCE))
+
+
+def detect_cuts(distances: list, changed: list, area: int, step: float, fps: float) -> list:
+    """Örnek çiftleri arası uzaklıklardan kesmeleri bulur; kesmeden sonraki ilk karenin indislerini döner.
+
+    Uzaklık yerel uyarlanır eşiği geçmeli ve kare farkı (`changed`, hareket
+    taramasının 0/255 birimli değişen piksel toplamı) alanın en az
+    `SCENE_MIN_CHANGED` kadarını kapsamalıdır; böylece yavaş ışık
+    değişimleri ve tek renk kaymaları kesme sayılmaz. Birbirine
+    `SCENE_MIN_SECONDS`'tan yakın adaylardan en güçlüsü kalır.
+    """
+    d = np.asarray(distances, dtype=np.float64)
+    if d.size == 0:
+        return []
+    samples_per_second = fps / step if fps and step else 1.0
+    half = int(min(WINDOW_MAX_SAMPLES, max(2, round(SCENE_WINDOW * samples_per_second))))
+    fraction = np.asarray(changed, dtype=np.float64)[:d.size] / (255.0 * max(area, 1))
+    candidates = np.flatnonzero((d > adaptive_threshold(d, half)) & (fraction >= SCENE_MIN_CHANGED))
+
+    min_gap = SCENE_MIN_SECONDS * samples_per_second
+    kept = []
+    for j in candidates[np.argsort(-d[candidates], kind="stable")]:
+        if all(abs(j - k) >= min_gap for k in kept):
+            kept.append(j)
+    # d[j], j. ve j+1. örnekler arasındadır; kesme j+1. örnekte başlar
+    return [int(round((j + 1) * step)) for j in sorted(kept)]
+
+
+def scene_summary(cut_frames: list, fps: float) -> dict:
+    return {
+        "count": len(cut_frames) + 1,
+        "cuts": [round(frame / fps, 3) if fps else 0.0 for frame in cut_frames],  # saniye
+    }
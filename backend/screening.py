@@ -0,0 +1,207 @@
+import os
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Görsel tarama modeli: OpenCV DNN'in okuyabildiği dosya (.onnx); "stub" test ve
+# geliştirme için ten rengi oranına bakan sahte modeldir; boşsa tarama kapalı
+SCREENING_MODEL = os.getenv("SCREENING_MODEL", "")
+# Model çıkış sütunlarının adları; "-" ile adlandırılan sütunlar (ör. "güvenli") kaydedilmez
+SCREENING_LABELS = [label.strip() for label in os.getenv("SCREENING_LABELS", "unsafe").split(",")]
+SCREENING_INPUT_SIZE = int(os.getenv("SCREENING_INPUT_SIZE", "224"))
+SCREENING_SCALE = float(os.getenv("SCREENING_SCALE", str(1 / 255)))
+SCREENING_MEAN = tuple(float(v) for v in os.getenv("SCREENING_MEAN", "0,0,0").split(","))
+SCREENING_INTERVAL = float(os.getenv("SCREENING_INTERVAL", "1.0"))  # taranan kareler arası saniye
+SCREENING_THRESHOLD = float(os.getenv("SCREENING_THRESHOLD", "0.6"))
+# Tek çıkarımdaki kare sayısı; bellek kabaca grup x girdi boyutu² x 3 x 5 bayttır
+SCREENING_BATCH_SIZE = int(os.getenv("SCREENING_BATCH_SIZE", "16"))
+# OpenCV'nin iş parçacığı sayısı (0: OpenCV varsayılanı, tüm çekirdekler)
+SCREENING_THREADS = int(os.getenv("SCREENING_THREADS", "0"))
+
+_net = None
+_net_lock = threading.Lock()
+
+
+class StubNet:
+    """Model dosyası olmadan taramayı çalıştırmak için OpenCV DNN yerine geçer.
+
+    Karedeki ten rengi piksel oranını (Kovac kuralı) puan olarak döndürür;
+    yalnızca test ve geliştirme içindir.
+    """
+
+    def setInput(self, blob: np.ndarray):
+        self._blob = blob
+
+    def forward(self) -> np.ndarray:
+        rgb = self._blob / SCREENING_SCALE + np.asarray(SCREENING_MEAN, np.float32).reshape(1, 3, 1, 1)
+        r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+        skin = (r > 95) & (g > 40) & (b > 20) & (r > g) & (r > b) & (r - np.minimum(g, b) > 15)
+        ratio = skin.reshape(len(rgb), -1).mean(axis=1)
+        return np.clip(ratio / 0.4, 0.0, 1.0).astype(np.float32).reshape(-1, 1)
+
+
+def get_net():
+    # Model süreç başına bir kez yüklenir; çıkarımlar aynı kilitle sıralanır
+    global _net
+    with _net_lock:
+        if _net is None:
+            if SCREENING_THREADS > 0:
+                cv2.setNumThreads(SCREENING_THREADS)
+            if SCREENING_MODEL == "stub":
+                _net = StubNet()
+            else:
+                _net = cv2.dnn.readNet(SCREENING_MODEL)
+                _net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+                _net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        return _net
+
+
+def infer(batch: list) -> np.ndarray:
+    """Model girdi boyutundaki BGR karelerini tek çıkarımda puanlar; (kare, sütun) döner."""
+    blob = cv2.dnn.blobFromImages(batch, SCREENING_SCALE, (SCREENING_INPUT_SIZE, SCREENING_INPUT_SIZE),
+                                  SCREENING_MEAN, swapRB=True, crop=False)
+    net = get_net()
+    with _net_lock:
+        net.setInput(blob)
+        scores = net.forward()
+    return np.asarray(scores, dtype=np.float32).reshape(len(batch), -1)
+
+
+def labels_for(columns: int) -> list:
+    return [SCREENING_LABELS[i] if i < len(SCREENING_LABELS) else f"class_{i}" for i in range(columns)]
+
+
+class FrameScreener:
+    """Hareket taramasının çözdüğü karelerden görsel içerik taraması.
+
+    Tarama döngüsü her örnek için `observe(indis, kare)` çağırır; her
+    `SCREENING_INTERVAL` saniyede bir kare model girdi boyutuna küçültülüp
+    önceden ayrılmış grup tamponuna yazılır, tampon dolunca tek çıkarımla
+    puanlanır. Böylece çözülmüş tam boy kareler tutulmaz ve bellek grup
+    boyutuyla sınırlı kalır. Paralel taramada segmentler `seek` ile
+    konumlanmış kopyaları doldurur ve sonuçlar `merge` ile birleşir. Tarama
+    videonun sonuna varamadıysa eksik indisler `read_missing` ile ayrıca
+    okunur.
+    """
+
+    def __init__(self, frame_count: int, fps: float, step: int = 1, batch_size: int = SCREENING_BATCH_SIZE):
+        self.frame_count = frame_count
+        self.fps = fps
+        # Aralık hareket örnekleme adımının katına yuvarlanır; taranan kareler
+        # sıralı ve paralel taramada aynı olur
+        every = SCREENING_INTERVAL * fps if fps else 1
+        self.every = max(1, int(round(every / step))) * step
+        self.batch_size = max(1, batch_size)
+        size = SCREENING_INPUT_SIZE
+        self._buffer = np.empty((self.batch_size, size, size, 3), np.uint8)
+        self._pending = []  # tampondaki karelerin indisleri
+        self._indices = []
+        self._scores = []
+        self._next = 0
+
+    def observe(self, index: int, frame: np.ndarray):
+        if index < self._next:
+            return
+        self._next = (index // self.every + 1) * self.every
+        slot = self._buffer[len(self._pending)]
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        cv2.resize(frame, slot.shape[1::-1], dst=slot, interpolation=cv2.INTER_AREA)
+        self._pending.append(index)
+        if len(self._pending) == self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        count = len(self._pending)
+        self._scores.append(infer([self._buffer[i] for i in range(count)]))
+        self._indices.extend(self._pending)
+        self._pending = []
+
+    def seek(self, after: int):
+        # Segment taraması: `after` indisinden sonraki ilk tarama noktasından başla
+        self._next = (after // self.every + 1) * self.every
+
+    def close(self, complete: bool):
+        # Son örnekten sonraki tarama noktaları, örnekler arasındakiler gibi atlanır
+        if complete:
+            self._next = max(self._next, self.frame_count)
+
+    def merge(self, other: "FrameScreener"):
+        # Sıradaki segmentin puanları (kopya süreçler arası taşınırken puanlanmıştır)
+        other.flush()
+        self._indices.extend(other._indices)
+        self._scores.extend(other._scores)
+        self._next = max(self._next, other._next)
+
+    def __getstate__(self):
+        # Süreçler arasında grup tamponu taşınmaz; bekleyen kareler önce puanlanır
+        self.flush()
+        return dict(self.__dict__, _buffer=None)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        size = SCREENING_INPUT_SIZE
+        self._buffer = np.empty((self.batch_size, size, size, 3), np.uint8)
+
+    def missing(self) -> list:
+        return list(range(self._next, self.frame_count, self.every))
+
+    def read_missing(self, video_path: str) -> int:
+        indices = self.missing()
+        if not indices:
+            return 0
+        cap = cv2.VideoCapture(video_path)
+        try:
+            for index in indices:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                ret, frame = cap.read()
+                if ret:
+                    self.observe(index, frame)
+        finally:
+            cap.release()
+        return len(indices)
+
+    def finish(self) -> dict:
+        """Kalan kareleri puanlar ve eşiği geçen ardışık örnekleri aralıklara birleştirir."""
+        self.flush()
+        indices = np.asarray(self._indices, dtype=np.int64)
+        scores = np.concatenate(self._scores) if self._scores else np.zeros((0, 1), np.float32)
+        order = np.argsort(indices, kind="stable")
+        indices, scores = indices[order], scores[order]
+
+        flagged = []
+        for column, label in enumerate(labels_for(scores.shape[1])):
+            if label in ("", "-"):
+                continue
+            hits = np.concatenate(([False], scores[:, column] >= SCREENING_THRESHOLD, [False]))
+            edges = np.flatnonzero(np.diff(hits.astype(np.int8)))
+            for first, last in zip(edges[::2], edges[1::2]):
+                start_frame = int(indices[first])
+                end_frame = int(min(indices[last - 1] + self.every, self.frame_count or indices[last - 1] + 1))
+                flagged.append({
+                    "label": label,
+                    "start": round(start_frame / self.fps, 3) if self.fps else 0.0,
+                    "end": round(end_frame / self.fps, 3) if self.fps else 0.0,
+                    "start_frame": start_frame,
+                    "end_frame": end_frame,
+                    "confidence": round(float(scores[first:last, column].max()), 4),
+                })
+        flagged.sort(key=lambda item: (item["start_frame"], item["label"]))
+        return {
+            "model": os.path.basename(SCREENING_MODEL),
+            "interval": self.every / self.fps if self.fps else 0.0,
+            "samples": int(indices.size),
+            "threshold": SCREENING_THRESHOLD,
+            "flagged": flagged,
+        }
+
+
+def create_screener(frame_count: int, fps: float, step: int = 1) -> Optional[FrameScreener]:
+    # Model yapılandırılmamışsa tarama yapılmaz
+    if not SCREENING_MODEL:
+        return None
+    return FrameScreener(frame_count, fps, step)
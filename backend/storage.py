@@ -0,0 +1,31 @@
+import os
+
+
+class BlobStore:
+    """İçerik özetine göre adreslenen dosya deposu.
+
+    Aynı içerik tek bir kez `root/<ilk iki karakter>/<sha256><uzantı>` altında
+    saklanır; kaç videonun bu dosyayı paylaştığı veritabanında tutulur.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, content_hash: str, ext: str = "") -> str:
+        return os.path.join(self.root, content_hash[:2], f"{content_hash}{ext.lower()}")
+
+    def adopt(self, tmp_path: str, content_hash: str, ext: str = "") -> str:
+        """Geçici dosyayı depoya taşır; içerik zaten varsa geçici dosyayı siler."""
+        path = self.path_for(content_hash, ext)
+        if os.path.exists(path):
+            self.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return path
+
+    @staticmethod
+    def remove(path: str):
+        if path and os.path.exists(path):
+            os.remove(path)
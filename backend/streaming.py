@@ -0,0 +1,162 @@
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+import anyio
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+# Aralık yanıtlarında tek seferde okunup gönderilen bayt
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", str(512 * 1024)))
+STREAM_CACHE_CONTROL = os.getenv("STREAM_CACHE_CONTROL", "private, max-age=3600")
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+# ASGI sıfır kopya gönderim uzantısı (sunucu destekliyorsa scope'ta ilan edilir)
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple]:
+    """Tek aralıklı `Range` başlığını (başlangıç, bitiş) çiftine çevirir.
+
+    Başlık yoksa, biçimi tanınmıyorsa veya birden çok aralık istenmişse None
+    döner ve dosyanın tamamı gönderilir.
+    """
+    match = RANGE_PATTERN.match((header or "").strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # bytes=-N: son N bayt
+        if int(last) == 0:
+            raise RangeNotSatisfiable()
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _http_date(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(parsedate_to_datetime(value).timestamp()) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RangeFileResponse(Response):
+    """Dosyayı Range/206 ve koşullu istek desteğiyle gönderir.
+
+    Sunucu `http.response.zerocopysend` uzantısını sunuyorsa gövde çekirdekte
+    sendfile ile kopyalanır; aksi halde `chunk_size`'lık parçalar thread
+    havuzunda okunur. Yalnızca istenen aralık okunduğundan oynatıcı büyük
+    dosyalarda ileri sarınca baştan indirme yapılmaz. `background` yanıt
+    gönderildikten sonra çalıştırılır.
+    """
+
+    def __init__(self, path: str, media_type: str = "application/octet-stream",
+                 headers: Optional[dict] = None, chunk_size: int = STREAM_CHUNK_SIZE,
+                 background: Optional[BackgroundTask] = None):
+        self.path = path
+        self.chunk_size = chunk_size
+        super().__init__(headers=headers, media_type=media_type, background=background)
+
+    def prepare(self, request_headers) -> tuple:
+        # (durum, başlıklar, aralık) döndürür; aralık None ise gövde yoktur
+        stat = os.stat(self.path)
+        size = stat.st_size
+        last_modified = int(stat.st_mtime)
+        etag = f'"{size:x}-{stat.st_mtime_ns:x}"'
+        # Uzunluk ve tür gönderilen aralığa göre belirlenir; gerisi olduğu gibi eklenir
+        extra = {k.decode("latin-1"): v.decode("latin-1") for k, v in self.raw_headers}
+        extra.pop("content-length", None)
+        content_type = extra.pop("content-type", None)
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": formatdate(last_modified, usegmt=True),
+            "cache-control": STREAM_CACHE_CONTROL,
+            **extra,
+        }
+
+        if_none_match = request_headers.get("if-none-match")
+        if etag_matches(if_none_match, etag):
+            return 304, headers, None
+        since = _http_date(request_headers.get("if-modified-since"))
+        if if_none_match is None and since is not None and last_modified <= since:
+            return 304, headers, None
+
+        byte_range = None
+        if_range = request_headers.get("if-range")
+        # If-Range eşleşmezse dosya değişmiştir; aralık yok sayılıp tamamı gönderilir
+        if not if_range or if_range == etag or _http_date(if_range) == last_modified:
+            try:
+                byte_range = parse_range(request_headers.get("range"), size)
+            except RangeNotSatisfiable:
+                headers.update({"content-range": f"bytes */{size}", "content-length": "0"})
+                return 416, headers, None
+
+        if content_type is not None:
+            headers["content-type"] = content_type
+        if byte_range is None:
+            headers["content-length"] = str(size)
+            return 200, headers, (0, size - 1)
+        start, end = byte_range
+        headers["content-length"] = str(end - start + 1)
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+        return 206, headers, byte_range
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.send_file(scope, send)
+        if self.background is not None:
+            await self.background()
+
+    async def send_file(self, scope: Scope, send: Send) -> None:
+        request_headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        try:
+            status_code, headers, byte_range = self.prepare(request_headers)
+        except FileNotFoundError:
+            status_code, headers, byte_range = 404, {"content-length": "0"}, None
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+        })
+        if byte_range is None or scope["method"] == "HEAD" or byte_range[1] < byte_range[0]:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        start, end = byte_range
+        count = end - start + 1
+        if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({"type": ZEROCOPY_EXTENSION, "file": f, "offset": start, "count": count})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(start)
+            remaining = count
+            while remaining > 0:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # Dosya gönderim sırasında kısaldıysa yanıtı kapat
+            await send({"type": "http.response.body", "body": b""})
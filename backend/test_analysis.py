@@ -0,0 +1,48 @@
+import hashlib
+import os
+
+import pytest
+
+from analysis import analyze_video
+from thumbnails import thumbnail_dir
+
+
+def comparable(results: dict) -> dict:
+    # Aşama süreleri ve küçük resim yolları çalıştırmaya özgüdür
+    return {key: value for key, value in results.items()
+            if key not in ("pipeline", "thumbnails", "thumbnail_path")}
+
+
+def thumbnail_digests(key: str) -> dict:
+    directory = thumbnail_dir(key)
+    return {name: hashlib.md5(open(os.path.join(directory, name), "rb").read()).hexdigest()
+            for name in sorted(os.listdir(directory))}
+
+
+@pytest.mark.parametrize("profile", ["full", "balanced", "keyframe"])
+def test_parallel_matches_sequential(synthetic_video, pool, profile):
+    sequential = analyze_video(synthetic_video, profile, processes=1, thumbnail_key="a" * 40)
+    parallel = analyze_video(synthetic_video, profile, processes=3, thumbnail_key="b" * 40)
+    assert parallel["pipeline"]["frames"] == sequential["pipeline"]["frames"]
+    assert comparable(parallel) == comparable(sequential)
+    assert thumbnail_digests("b" * 40) == thumbnail_digests("a" * 40)
+
+
+def test_profiles_stay_comparable(synthetic_video):
+    full = analyze_video(synthetic_video, "full", processes=1)
+    assert full["analyzed_frames"] == full["frame_count"]
+    for name in ("balanced", "fast"):
+        results = analyze_video(synthetic_video, name, processes=1)
+        assert results["profile"] == name
+        assert results["analyzed_frames"] < full["analyzed_frames"]
+        assert abs(results["motion_percentage"] - full["motion_percentage"]) < 10
+
+
+@pytest.mark.parametrize("profile", ["full", "balanced", "keyframe"])
+def test_single_decode_pass(synthetic_video, profile):
+    # Küçük resim ve görsel tarama hareket taramasının karelerini kullanır, ek okuma yapmaz
+    results = analyze_video(synthetic_video, profile, processes=1, thumbnail_key="c" * 40)
+    stages = results["pipeline"]
+    assert stages["frames"] == results["analyzed_frames"]
+    assert set(stages["analyzers"]) >= {"motion", "thumbnails"}
+    assert stages["extra_reads"] == 0
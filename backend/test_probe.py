@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+import probe
+from benchmark import bytes_read, make_synthetic_video
+from probe import PROBE_MAX_BYTES, VideoMetadata, estimate_cost, probe_video
+
+
+@pytest.fixture(scope="module")
+def large_video(tmp_path_factory):
+    # Ön okuma sınırından büyük bir dosya; sınırın dosya boyutundan bağımsız olduğu görülsün
+    path = tmp_path_factory.mktemp("probe") / "large.mp4"
+    make_synthetic_video(str(path), 640, 360, 10)
+    assert os.path.getsize(path) > PROBE_MAX_BYTES
+    return str(path)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/io"), reason="okunan bayt yalnızca Linux'ta ölçülür")
+def test_opencv_fallback_reads_header_only(large_video, monkeypatch):
+    # ffprobe yokken OpenCV yalnızca kap başlığını okur, kare çözmez
+    # (bu yolun PROBE_MAX_BYTES gibi ayarlanabilir bir sınırı yoktur)
+    monkeypatch.setattr(probe.shutil, "which", lambda name: None)
+    before = bytes_read()
+    meta = probe_video(large_video)
+    used = bytes_read() - before
+    assert used * 4 < os.path.getsize(large_video)
+    assert (meta.width, meta.height, meta.frame_count) == (640, 360, 300)
+    assert meta.fps == pytest.approx(30)
+    assert meta.duration == pytest.approx(10)
+    assert meta.file_size == os.path.getsize(large_video)
+
+
+def test_ffprobe_limits_probe_size(tmp_path, monkeypatch):
+    # ffprobe ayrı süreçte çalışır; okunan bayt yerine komut satırındaki sınır doğrulanır
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"\0" * 1024)
+    calls = []
+
+    def fake_run(argv, **kwargs):
+        calls.append(argv)
+        output = json.dumps({
+            "format": {"duration": "12.012"},
+            "streams": [
+                {"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080,
+                 "avg_frame_rate": "30000/1001", "nb_frames": "360"},
+                {"codec_type": "audio", "codec_name": "aac"},
+            ],
+        })
+        return subprocess.CompletedProcess(argv, 0, stdout=output.encode())
+
+    monkeypatch.setattr(probe.shutil, "which", lambda name: "/usr/bin/ffprobe")
+    monkeypatch.setattr(probe.subprocess, "run", fake_run)
+    meta = probe_video(str(path))
+
+    argv = calls[0]
+    assert argv[argv.index("-probesize") + 1] == str(PROBE_MAX_BYTES)
+    assert argv[-1] == str(path)
+    assert (meta.video_codec, meta.audio_codec) == ("h264", "aac")
+    assert (meta.width, meta.height, meta.frame_count) == (1920, 1080, 360)
+    assert meta.fps == pytest.approx(29.97, abs=0.01)
+    assert meta.duration == pytest.approx(12.012)
+    assert meta.file_size == 1024
+
+
+def test_estimate_cost_orders_profiles():
+    meta = VideoMetadata(file_size=0, width=1920, height=1080, fps=30.0, frame_count=1800)
+    costs = [estimate_cost(meta, name) for name in ("full", "balanced", "fast", "keyframe")]
+    assert costs == sorted(costs, reverse=True)
+    # Bilgi yoksa dosya boyutu (MB) kullanılır
+    assert estimate_cost(VideoMetadata(file_size=3 * 2**20)) == 3
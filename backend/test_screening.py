@@ -0,0 +1,44 @@
+import cv2
+import numpy as np
+import pytest
+
+import screening
+from analysis import analyze_video
+
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    # Model dosyası olmadan ten rengi oranını puanlayan sahte model; segment süreçleri ortamdan okur
+    monkeypatch.setenv("SCREENING_MODEL", "stub")
+    monkeypatch.setattr(screening, "SCREENING_MODEL", "stub")
+    monkeypatch.setattr(screening, "_net", None)
+
+
+@pytest.fixture(scope="module")
+def skin_video(tmp_path_factory):
+    # 8 saniye; 3-6 saniye arası ten renginde, gerisi koyu mavi
+    path = str(tmp_path_factory.mktemp("screening") / "skin.mp4")
+    fps = 30
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (160, 120))
+    for i in range(8 * fps):
+        writer.write(np.full((120, 160, 3), (120, 150, 220) if 3 * fps <= i < 6 * fps else (200, 60, 30), np.uint8))
+    writer.release()
+    return path
+
+
+def test_stub_flags_skin_segment(skin_video, stub_model):
+    result = analyze_video(skin_video, "full", processes=1)["screening"]
+    assert result["model"] == "stub"
+    assert result["samples"] == 8
+    assert [(item["label"], item["start"], item["end"]) for item in result["flagged"]] == [("unsafe", 3.0, 6.0)]
+
+
+def test_parallel_screening_matches_sequential(skin_video, stub_model, pool):
+    sequential = analyze_video(skin_video, "full", processes=1)["screening"]
+    parallel = analyze_video(skin_video, "full", processes=3)["screening"]
+    assert parallel == sequential
+
+
+def test_screening_disabled_without_model(skin_video, monkeypatch):
+    monkeypatch.setattr(screening, "SCREENING_MODEL", "")
+    assert analyze_video(skin_video, "full", processes=1)["screening"] is None
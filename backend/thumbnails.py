@@ -0,0 +1,256 @@
+import os
+import re
+import shutil
+from bisect import bisect_right
+from typing import Iterable, Optional
+
+import cv2
+import numpy as np
+
+# Çalışma dizininden bağımsız mutlak kök; varsayılan backend/thumbnails
+THUMBNAIL_DIR = os.path.abspath(os.getenv(
+    "THUMBNAIL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "thumbnails")))
+# Sonuçlardaki yollar dosya sistemi yolu değil, `GET /thumbnails/...` adresidir
+THUMBNAIL_URL_PREFIX = "thumbnails"
+# Üretilen küçük resim genişlikleri; ilk öğe listelerde kullanılan varsayılandır
+THUMBNAIL_SIZES = tuple(int(w) for w in os.getenv("THUMBNAIL_SIZES", "320,160,640").split(","))
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "82"))
+SPRITE_TILE_WIDTH = int(os.getenv("SPRITE_TILE_WIDTH", "160"))
+SPRITE_MAX_TILES = int(os.getenv("SPRITE_MAX_TILES", "100"))
+SPRITE_MIN_INTERVAL = float(os.getenv("SPRITE_MIN_INTERVAL", "1.0"))  # saniye
+SPRITE_COLUMNS = 10
+# Temsili kare için değerlendirilen aday sayısı (baştaki/sondaki %5 atlanır)
+CANDIDATES = 50
+# Sahne kesmeleri bilinince seçim yapılabilsin diye saklanan en iyi aday sayısı
+KEPT_CANDIDATES = 4
+
+KEY_PATTERN = re.compile(r"^[0-9a-f]{16,64}$")
+FILE_PATTERN = re.compile(r"^(\d+|sprite)\.jpg$")
+
+
+def thumbnail_dir(key: str) -> str:
+    return os.path.join(THUMBNAIL_DIR, key)
+
+
+def thumbnail_path(key: str, width: int) -> str:
+    return os.path.join(thumbnail_dir(key), f"{width}.jpg")
+
+
+def sprite_path(key: str) -> str:
+    return os.path.join(thumbnail_dir(key), "sprite.jpg")
+
+
+def thumbnail_url(key: str, name: str) -> str:
+    return f"{THUMBNAIL_URL_PREFIX}/{key}/{name}"
+
+
+def is_thumbnail_url(path: str) -> bool:
+    # Eski kayıtlarda `thumbnail_path` dosya yoludur; yenilerde `thumbnail_url` çıktısı
+    prefix, _, rest = (path or "").partition("/")
+    key, _, name = rest.partition("/")
+    return prefix == THUMBNAIL_URL_PREFIX and bool(KEY_PATTERN.match(key)) and bool(FILE_PATTERN.match(name))
+
+
+def frame_score(frame: np.ndarray) -> float:
+    # İyi pozlanmış ve ayrıntılı kareler öne çıkar; siyah/beyaz geçişler elenir
+    small = cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+    mean, std = cv2.meanStdDev(gray)
+    contrast = float(std[0][0])
+    if not 30 <= mean[0][0] <= 225:
+        contrast *= 0.1
+    return contrast
+
+
+def sprite_layout(frame_count: int, fps: float) -> tuple:
+    # Ön izleme karoları arası süre ve karoların kare indisleri
+    duration = frame_count / fps if fps else 0.0
+    if duration <= 0:
+        return 0.0, []
+    interval = max(SPRITE_MIN_INTERVAL, duration / SPRITE_MAX_TILES)
+    count = max(1, int(duration // interval))
+    return interval, [min(frame_count - 1, int(round((k + 0.5) * interval * fps))) for k in range(count)]
+
+
+class ThumbnailCollector:
+    """Hareket taraması sırasında görülen karelerden küçük resimleri toplar.
+
+    Tarama döngüsü her örnek için `observe(indis, kare)` çağırır. Sprite
+    karoları hedef indislere ulaşıldığında hemen küçültülerek saklanır; temsili
+    kare için eşit aralıklı adaylar puanlanır ve en iyi birkaçı en büyük küçük
+    resim genişliğinde tutulur, `avoid` kesme anlarına yakın olanları eler.
+    Paralel taramada her segment `seek` ile konumlanmış kendi kopyasını
+    doldurur ve kopyalar sırayla `merge` edilir. Video sonuna ulaşıldığında
+    `close` son örnekten sonraki hedefleri son görülen kareyle doldurur;
+    tarama videonun sonuna varamadıysa `missing` indisleri ayrıca okunur.
+    """
+
+    def __init__(self, frame_count: int, fps: float, width: int, height: int):
+        self.interval, self.tile_indices = sprite_layout(frame_count, fps)
+        first, last = int(frame_count * 0.05), max(int(frame_count * 0.95), 1)
+        count = min(CANDIDATES, max(1, last - first))
+        self.candidate_indices = sorted({first + (last - first) * i // count for i in range(count)})
+        self.tile_size = (SPRITE_TILE_WIDTH, max(2, int(round(height * SPRITE_TILE_WIDTH / width))) & ~1) \
+            if width else (SPRITE_TILE_WIDTH, SPRITE_TILE_WIDTH * 9 // 16)
+        self.tiles = []
+        self.best = None
+        self.best_score = -1.0
+        self.kept = []  # (puan, indis, kare), puana göre azalan
+        self._tile = 0
+        self._candidate = 0
+        self._last = None  # son görülen (indis, kare)
+
+    def observe(self, index: int, frame: np.ndarray):
+        self._last = (index, frame)
+        while self._tile < len(self.tile_indices) and index >= self.tile_indices[self._tile]:
+            self.tiles.append(cv2.resize(frame, self.tile_size, interpolation=cv2.INTER_AREA))
+            self._tile += 1
+        scored = False
+        while self._candidate < len(self.candidate_indices) and index >= self.candidate_indices[self._candidate]:
+            self._candidate += 1
+            if not scored:
+                scored = True
+                self._keep(index, frame, frame_score(frame))
+        if self.best is None:
+            # Adaylara ulaşılamayan kısa videolarda ilk kare yedek olarak kalır
+            self.best = frame.copy()
+
+    def _keep(self, index: int, frame: np.ndarray, score: float):
+        if len(self.kept) == KEPT_CANDIDATES and score <= self.kept[-1][0]:
+            return
+        height, width = frame.shape[:2]
+        target = max(THUMBNAIL_SIZES)
+        if width > target:
+            frame = cv2.resize(frame, (target, max(2, int(round(height * target / width)))),
+                               interpolation=cv2.INTER_AREA)
+        else:
+            frame = frame.copy()
+        self.kept.append((score, index, frame))
+        self.kept.sort(key=lambda candidate: -candidate[0])
+        del self.kept[KEPT_CANDIDATES:]
+        self.best_score, _, self.best = self.kept[0]
+
+    def seek(self, after: int):
+        # Segment taraması: `after` indisine kadarki hedefler önceki segmentindir
+        self._tile = bisect_right(self.tile_indices, after)
+        self._candidate = bisect_right(self.candidate_indices, after)
+
+    def merge(self, other: "ThumbnailCollector"):
+        # Sıradaki segmentin topladıkları; adaylar indis sırasıyla eklenir ki eşit puanda öndeki kalsın
+        self.tiles.extend(other.tiles)
+        self._tile = max(self._tile, other._tile)
+        self._candidate = max(self._candidate, other._candidate)
+        for score, index, frame in sorted(other.kept, key=lambda candidate: candidate[1]):
+            self._keep(index, frame, score)
+        if self.best is None:
+            self.best = other.best
+
+    def close(self, complete: bool):
+        # Son örnekten sonraki karolar ve adaylar son kareden alınır; kare
+        # referansı bırakılır ki segment kopyası süreçler arası taşınırken büyümesin
+        last, self._last = self._last, None
+        if not complete or last is None:
+            return
+        index, frame = last
+        while self._tile < len(self.tile_indices):
+            self.tiles.append(cv2.resize(frame, self.tile_size, interpolation=cv2.INTER_AREA))
+            self._tile += 1
+        if self._candidate < len(self.candidate_indices):
+            self._candidate = len(self.candidate_indices)
+            if all(kept != index for _, kept, _ in self.kept):
+                self._keep(index, frame, frame_score(frame))
+
+    def avoid(self, cut_frames: list, guard: int):
+        # Kesmeye `guard` kareden yakın adaylar atlanır; hepsi yakınsa en iyisi kalır
+        for score, index, frame in self.kept:
+            if all(abs(index - cut) > guard for cut in cut_frames):
+                self.best_score, self.best = score, frame
+                return
+
+    def missing(self) -> list:
+        return sorted(set(self.tile_indices[self._tile:]) | set(self.candidate_indices[self._candidate:]))
+
+    def read_missing(self, video_path: str) -> int:
+        # Kareleri görmeyen kiplerde (anahtar kare, son karolar) eksik kareleri atlayarak oku;
+        # okunan kare sayısını döner
+        indices = self.missing()
+        if not indices:
+            return 0
+        cap = cv2.VideoCapture(video_path)
+        try:
+            for index in indices:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                ret, frame = cap.read()
+                if ret:
+                    self.observe(index, frame)
+        finally:
+            cap.release()
+        return len(indices)
+
+
+def _write_jpeg(path: str, image: np.ndarray):
+    tmp = f"{path}.tmp.jpg"
+    cv2.imwrite(tmp, image, [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_QUALITY])
+    os.replace(tmp, path)
+
+
+def write_thumbnails(key: str, collector: ThumbnailCollector) -> Optional[dict]:
+    """Toplanan karelerden tüm boyutları ve sprite sayfasını yazar."""
+    if collector.best is None:
+        return None
+    os.makedirs(thumbnail_dir(key), exist_ok=True)
+    height, width = collector.best.shape[:2]
+    for target in THUMBNAIL_SIZES:
+        size = (target, max(2, int(round(height * target / width))))
+        interpolation = cv2.INTER_AREA if target < width else cv2.INTER_LINEAR
+        _write_jpeg(thumbnail_path(key, target), cv2.resize(collector.best, size, interpolation=interpolation))
+
+    if collector.tiles:
+        tile_w, tile_h = collector.tile_size
+        columns, rows = sprite_grid(len(collector.tiles))
+        sheet = np.zeros((rows * tile_h, columns * tile_w, 3), np.uint8)
+        for i, tile in enumerate(collector.tiles):
+            r, c = divmod(i, columns)
+            sheet[r * tile_h:(r + 1) * tile_h, c * tile_w:(c + 1) * tile_w] = tile
+        _write_jpeg(sprite_path(key), sheet)
+    return thumbnail_info(key, collector, len(collector.tiles))
+
+
+def sprite_grid(count: int) -> tuple:
+    columns = min(SPRITE_COLUMNS, count)
+    return columns, -(-count // columns)
+
+
+def thumbnail_info(key: str, collector: ThumbnailCollector, tiles: int) -> dict:
+    sprite = None
+    if tiles:
+        columns, rows = sprite_grid(tiles)
+        sprite = {
+            "path": thumbnail_url(key, "sprite.jpg"),
+            "columns": columns,
+            "rows": rows,
+            "tile_width": collector.tile_size[0],
+            "tile_height": collector.tile_size[1],
+            "count": tiles,
+            "interval": collector.interval,  # karo başına saniye
+        }
+    return {
+        "key": key,
+        "sizes": {str(width): thumbnail_url(key, f"{width}.jpg") for width in THUMBNAIL_SIZES},
+        "sprite": sprite,
+    }
+
+
+def cached_thumbnails(key: str, collector: ThumbnailCollector) -> Optional[dict]:
+    # Aynı içerik için üretilmiş küçük resimler varsa kareler hiç toplanmaz;
+    # sprite yerleşimi kare sayısı ve fps'ten yeniden hesaplanır
+    if not all(os.path.exists(thumbnail_path(key, width)) for width in THUMBNAIL_SIZES):
+        return None
+    tiles = len(collector.tile_indices) if os.path.exists(sprite_path(key)) else 0
+    return thumbnail_info(key, collector, tiles)
+
+
+def remove_thumbnails(keys: Iterable[str]):
+    for key in keys:
+        if key and KEY_PATTERN.match(key):
+            shutil.rmtree(thumbnail_dir(key), ignore_errors=True)
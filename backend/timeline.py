@@ -0,0 +1,60 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+# Her analiz edilen örnek için bir float32 hareket değeri, video dosyasının yanında
+TIMELINE_SUFFIX = ".motion.npy"
+
+
+def timeline_path_for(video_path: str) -> str:
+    return f"{video_path}{TIMELINE_SUFFIX}"
+
+
+def save_timeline(path: str, values) -> int:
+    # Yarım kalmış bir dosya okunmasın diye önce geçici dosyaya yazılır
+    data = np.asarray(values, dtype=np.float32)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as fp:
+        np.save(fp, data)
+    os.replace(tmp_path, path)
+    return int(data.size)
+
+
+def load_timeline(path: str) -> np.ndarray:
+    # Bellek eşlemeli okuma: yalnızca istenen aralığın sayfaları diskten okunur
+    return np.load(path, mmap_mode="r")
+
+
+def downsample(values: np.ndarray, interval: float, start: Optional[float] = None,
+               end: Optional[float] = None, buckets: int = 1000) -> dict:
+    """[start, end) saniye aralığını en fazla `buckets` dilime indirger.
+
+    Her dilim için min ve max döner; böylece grafik piksel genişliği kadar
+    nokta çizer ama kısa tepe noktaları kaybolmaz.
+    """
+    total = values.shape[0]
+    interval = interval or 1.0
+    first = 0 if start is None else min(total, max(0, int(start / interval)))
+    last = total if end is None else min(total, max(first, int(np.ceil(end / interval))))
+    window = values[first:last]
+    count = window.shape[0]
+    buckets = max(1, buckets)
+
+    if count <= buckets:
+        indices = np.arange(count)
+        mins = maxs = np.asarray(window, dtype=np.float64)
+    else:
+        indices = np.linspace(0, count, buckets, endpoint=False).astype(np.int64)
+        mins = np.minimum.reduceat(window, indices).astype(np.float64)
+        maxs = np.maximum.reduceat(window, indices).astype(np.float64)
+
+    return {
+        "interval": interval,
+        "start": first * interval,
+        "end": last * interval,
+        "samples": int(count),
+        "t": ((indices + first) * interval).round(3).tolist(),
+        "min": mins.tolist(),
+        "max": maxs.tolist(),
+    }
@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import AsyncIterator
+
+from starlette.concurrency import run_in_threadpool
+
+
+class UploadTooLarge(Exception):
+    """Yükleme izin verilen azami boyutu aştığında fırlatılır."""
+
+
+class OffsetMismatch(Exception):
+    """İstemcinin gönderdiği ofset sunucudaki ofsetle uyuşmadığında fırlatılır."""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Beklenen ofset: {expected}")
+        self.expected = expected
+
+
+class UploadNotFound(Exception):
+    """Yükleme oturumu bulunamadığında fırlatılır."""
+
+
+async def iter_upload_file(file, chunk_size: int) -> AsyncIterator[bytes]:
+    # UploadFile içeriğini sabit boyutlu parçalar halinde oku
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def write_stream(fp, chunks: AsyncIterator[bytes], hasher, max_size: int,
+                       written: int = 0) -> int:
+    """Parçaları diske yazarken aynı anda özet hesaplar.
+
+    Her parça yazılmadan bir sonraki okunmaz; böylece istemci diskten hızlı
+    gönderemez ve bellekte en fazla bir parça tutulur.
+    """
+    def _write(chunk):
+        fp.write(chunk)
+        hasher.update(chunk)
+
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        if written + len(chunk) > max_size:
+            raise UploadTooLarge()
+        await run_in_threadpool(_write, chunk)
+        written += len(chunk)
+    return written
+
+
+async def save_upload(file, dest: str, max_size: int, chunk_size: int):
+    """UploadFile'ı geçici dosya üzerinden `dest`e akıtır, (boyut, sha256) döner."""
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    tmp_path = f"{dest}.{uuid.uuid4().hex}.part"
+    hasher = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as fp:
+            size = await write_stream(fp, iter_upload_file(file, chunk_size), hasher, max_size)
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size, hasher.hexdigest()
+
+
+class ResumableUploads:
+    """tus benzeri, ofset tabanlı devam ettirilebilir yükleme deposu.
+
+    Her oturum `root` altında bir `.part` veri dosyası ve bir `.json` meta
+    dosyasından oluşur. Geçerli ofset daima veri dosyasının boyutudur; bu
+    sayede yarıda kesilen bir istek sonrası istemci kaldığı yerden devam eder.
+    `ttl` saniye boyunca veri gelmeyen oturumların süresi dolar; `sweep`
+    bunları (ve sahipsiz geçici dosyaları) siler, `create` de en fazla
+    `sweep_interval` saniyede bir süpürme yapar. Silinen her oturum için
+    `on_discard(upload_id)` çağrılır (ör. bağlı artımlı analizi bırakmak için).
+    """
+
+    def __init__(self, root: str, max_size: int, ttl: float = 24 * 3600, sweep_interval: float = 3600,
+                 on_discard=None):
+        self.root = root
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.on_discard = on_discard
+        self._hashers = {}
+        self._locks = {}
+        self._last_sweep = 0.0
+        os.makedirs(root, exist_ok=True)
+
+    def _paths(self, upload_id: str):
+        if not upload_id.isalnum():
+            raise UploadNotFound()
+        base = os.path.join(self.root, upload_id)
+        return f"{base}.part", f"{base}.json"
+
+    def part_path(self, upload_id: str) -> str:
+        return self._paths(upload_id)[0]
+
+    def create(self, length: int, metadata: dict) -> str:
+        if length > self.max_size:
+            raise UploadTooLarge()
+        if time.time() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+        upload_id = uuid.uuid4().hex
+        part_path, meta_path = self._paths(upload_id)
+        open(part_path, "wb").close()
+        with open(meta_path, "w") as fp:
+            json.dump({"length": length, **metadata}, fp)
+        self._hashers[upload_id] = hashlib.sha256()
+        return upload_id
+
+    def info(self, upload_id: str) -> dict:
+        part_path, meta_path = self._paths(upload_id)
+        try:
+            with open(meta_path) as fp:
+                meta = json.load(fp)
+            stat = os.stat(part_path)
+        except FileNotFoundError:
+            raise UploadNotFound()
+        # Son yazmadan itibaren `ttl` saniye; süresi dolan oturum bulunamaz sayılır
+        meta["offset"] = stat.st_size
+        meta["expires"] = stat.st_mtime + self.ttl
+        if meta["expires"] <= time.time() and not self._writing(upload_id):
+            self.discard(upload_id)
+            raise UploadNotFound()
+        return meta
+
+    def _hasher(self, upload_id: str, part_path: str):
+        hasher = self._hashers.get(upload_id)
+        if hasher is None:
+            # Sunucu yeniden başladıysa özet durumu kaybolmuştur, mevcut kısmı bir kez oku
+            hasher = hashlib.sha256()
+            with open(part_path, "rb") as fp:
+                for block in iter(lambda: fp.read(1024 * 1024), b""):
+                    hasher.update(block)
+            self._hashers[upload_id] = hasher
+        return hasher
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> dict:
+        lock = self._locks.setdefault(upload_id, asyncio.Lock())
+        async with lock:
+            meta = self.info(upload_id)
+            if offset != meta["offset"]:
+                raise OffsetMismatch(meta["offset"])
+            part_path, _ = self._paths(upload_id)
+            hasher = await run_in_threadpool(self._hasher, upload_id, part_path)
+            with open(part_path, "ab") as fp:
+                try:
+                    meta["offset"] = await write_stream(
+                        fp, chunks, hasher, meta["length"], written=offset
+                    )
+                except UploadTooLarge:
+                    raise
+                except Exception:
+                    # Bağlantı koptu: yazılan kısım kalır, istemci HEAD ile devam eder
+                    meta["offset"] = fp.tell()
+            return meta
+
+    def finish(self, upload_id: str, dest: str):
+        """Tamamlanmış yüklemeyi `dest`e taşır ve (boyut, sha256) döner."""
+        meta = self.info(upload_id)
+        if meta["offset"] != meta["length"]:
+            raise OffsetMismatch(meta["offset"])
+        part_path, meta_path = self._paths(upload_id)
+        digest = self._hasher(upload_id, part_path).hexdigest()
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        os.replace(part_path, dest)
+        os.remove(meta_path)
+        self._forget(upload_id)
+        return meta["length"], digest
+
+    def discard(self, upload_id: str):
+        part_path, meta_path = self._paths(upload_id)
+        for path in (part_path, meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._forget(upload_id)
+        if self.on_discard is not None:
+            self.on_discard(upload_id)
+
+    def sweep(self) -> int:
+        """Süresi dolmuş yüklemeleri ve sahipsiz geçici dosyaları siler; silinen oturum sayısını döner."""
+        self._last_sweep = time.time()
+        deadline = self._last_sweep - self.ttl
+        removed = 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            upload_id, ext = os.path.splitext(name)
+            try:
+                if ext == ".json" and upload_id.isalnum():
+                    if self._writing(upload_id):
+                        continue
+                    part_path = os.path.join(self.root, f"{upload_id}.part")
+                    last = os.path.getmtime(part_path) if os.path.exists(part_path) else os.path.getmtime(path)
+                    if last < deadline:
+                        self.discard(upload_id)
+                        removed += 1
+                elif ext == ".part" and os.path.getmtime(path) < deadline \
+                        and not os.path.exists(os.path.join(self.root, f"{upload_id}.json")):
+                    # Yarıda kalmış doğrudan yüklemeler ve meta dosyası kaybolmuş oturumlar
+                    os.remove(path)
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def _writing(self, upload_id: str) -> bool:
+        lock = self._locks.get(upload_id)
+        return lock is not None and lock.locked()
+
+    def _forget(self, upload_id: str):
+        self._hashers.pop(upload_id, None)
+        self._locks.pop(upload_id, None)
@@ -172,7 +172,6 @@ const HomeScreen = ({ navigation }) => {
   const renderVideoItem = ({ item }) => {
     const statusBadge = getStatusBadge(item.status);
     const uploadDate = new Date(item.upload_date).toLocaleDateString('tr-TR');
-    const analysisResults = item.analysis_results ? JSON.parse(item.analysis_results) : null;
 
     return (
       <TouchableOpacity
@@ -180,7 +179,10 @@ const HomeScreen = ({ navigation }) => {
         onPress={() => navigation.navigate('VideoDetail', { videoId: item.id, title: item.title })}>
         {item.thumbnail_path && (
           <Image
-            source={{ uri: `${API_URL}/${item.thumbnail_path}` }}
+            source={{
+              uri: `${API_URL}/${item.thumbnail_path}`,
+              headers: { 'Authorization': `Bearer ${token}` }
+            }}
             style={styles.thumbnail}
           />
         )}
@@ -190,9 +192,9 @@ const HomeScreen = ({ navigation }) => {
             <Text style={styles.statusText}>{statusBadge.text}</Text>
           </View>
           <Text style={styles.dateText}>Yüklenme: {uploadDate}</Text>
-          {analysisResults && (
+          {item.duration != null && (
             <Text style={styles.analysisText}>
-              Süre: {Math.floor(analysisResults.duration / 60)}:{(analysisResults.duration % 60).toFixed(0).padStart(2, '0')}
+              Süre: {Math.floor(item.duration / 60)}:{(item.duration % 60).toFixed(0).padStart(2, '0')}
             </Text>
           )}
         </View>
@@ -10,6 +10,7 @@ import {
   RefreshControl,
   Image,
 } from 'react-native';
+import AsyncStorage from '@react-native-async-storage/async-storage';
 import { API_URL, COLORS } from '../config';
 
 const VideoDetailScreen = ({ route, navigation }) => {
@@ -17,6 +18,7 @@ const VideoDetailScreen = ({ route, navigation }) => {
   const [video, setVideo] = useState(null);
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
+  const [token, setToken] = useState(null);
 
   useEffect(() => {
     fetchVideoDetails();
@@ -24,7 +26,11 @@ const VideoDetailScreen = ({ route, navigation }) => {
 
   const fetchVideoDetails = async () => {
     try {
-      const response = await fetch(`${API_URL}/videos/${videoId}`);
+      const storedToken = token || (await AsyncStorage.getItem('token'));
+      setToken(storedToken);
+      const response = await fetch(`${API_URL}/videos/${videoId}`, {
+        headers: { 'Authorization': `Bearer ${storedToken}` },
+      });
       if (!response.ok) {
         throw new Error('Video detayları alınamadı');
       }
@@ -60,6 +66,7 @@ const VideoDetailScreen = ({ route, navigation }) => {
               setLoading(true);
               const response = await fetch(`${API_URL}/videos/${videoId}`, {
                 method: 'DELETE',
+                headers: { 'Authorization': `Bearer ${token}` },
               });
 
               if (!response.ok) {
@@ -128,7 +135,10 @@ const VideoDetailScreen = ({ route, navigation }) => {
 
       {video.thumbnail_path && (
         <Image
-          source={{ uri: `${API_URL}/${video.thumbnail_path}` }}
+          source={{
+            uri: `${API_URL}/${video.thumbnail_path}`,
+            headers: { 'Authorization': `Bearer ${token}` }
+          }}
           style={styles.thumbnail}
           resizeMode="cover"
         />
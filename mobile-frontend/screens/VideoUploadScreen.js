@@ -88,7 +88,7 @@ const VideoUploadScreen = ({ navigation }) => {
       };
 
       xhr.onload = () => {
-        if (xhr.status === 200) {
+        if (xhr.status >= 200 && xhr.status < 300) {
           Alert.alert('Başarılı', 'Video başarıyla yüklendi', [
             {
               text: 'Tamam',
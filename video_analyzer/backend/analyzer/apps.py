@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using='default', **kwargs):
+    # SQLite'ta tabloyu yeniden kuran migration'lar FTS tetikleyicilerini düşürür
+    from .search import install_search_index
+    install_search_index(connections[using])
 
 
 class AnalyzerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analyzer'
+
+    def ready(self):
+        post_migrate.connect(ensure_search_index, sender=self)
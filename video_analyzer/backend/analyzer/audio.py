@@ -0,0 +1,102 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+import ffmpeg
+import numpy as np
+from django.conf import settings
+
+# Whisper 16 kHz mono float32 ses bekler
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 4
+PIPE_CHUNK_SIZE = 1024 * 1024
+
+
+def _decoder(video_path, start=None, duration=None):
+    # ffmpeg sesi doğrudan 16 kHz mono float32 PCM olarak stdout'a yazar;
+    # start/duration verilirse yalnızca o aralık çözülür (girişte arama yapılır)
+    input_args = {'threads': 0}
+    if start:
+        input_args['ss'] = start
+    if duration is not None:
+        input_args['t'] = duration
+    return (
+        ffmpeg
+        .input(video_path, **input_args)
+        .output('pipe:', format='f32le', acodec='pcm_f32le', ac=1, ar=SAMPLE_RATE)
+        .global_args('-nostdin', '-loglevel', 'error')
+        .run_async(pipe_stdout=True, pipe_stderr=True)
+    )
+
+
+def _finish(process, stdout=b''):
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise ffmpeg.Error('ffmpeg', stdout, stderr)
+
+
+def probe_duration(video_path):
+    try:
+        return float(ffmpeg.probe(video_path)['format']['duration'])
+    except (ffmpeg.Error, KeyError, ValueError):
+        return None
+
+
+def decode_audio(video_path, start=None, duration=None):
+    # Sesi (veya bir aralığını) bellekte tek bir NumPy dizisine çözer (kopyasız)
+    process = _decoder(video_path, start, duration)
+    data = process.stdout.read()
+    _finish(process, data)
+    return np.frombuffer(data, dtype=np.float32)
+
+
+def iter_audio_chunks(video_path, seconds=30.0):
+    """Sesi `seconds` uzunluğunda float32 parçalar halinde üretir (uzun dosyalar için)."""
+    chunk_bytes = int(seconds * SAMPLE_RATE) * BYTES_PER_SAMPLE
+    process = _decoder(video_path)
+    try:
+        while True:
+            data = process.stdout.read(chunk_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data, dtype=np.float32)
+    finally:
+        process.stdout.close()
+        _finish(process)
+
+
+@contextmanager
+def open_audio(video_path, duration=None, start=None):
+    """Transkripsiyon için sesi hazırlar.
+
+    Çözülmüş ses `AUDIO_IN_MEMORY_MAX_MB` sınırına sığıyorsa hiç disk
+    kullanılmaz. Daha uzun dosyalarda PCM geçici dizine akıtılır ve bellek
+    eşlemeli dizi olarak verilir; dosya çıkışta her durumda silinir.
+
+    `start` verilirse yalnızca [start, start + duration) aralığı çözülür;
+    aksi halde `duration` yalnızca boyut tahmini için kullanılır.
+    """
+    length = duration if start is not None else None
+    size_hint = duration or probe_duration(video_path)
+    limit = settings.AUDIO_IN_MEMORY_MAX_MB * 1024 * 1024
+    if size_hint is None or size_hint * SAMPLE_RATE * BYTES_PER_SAMPLE <= limit:
+        yield decode_audio(video_path, start, length)
+        return
+
+    fd, pcm_path = tempfile.mkstemp(suffix='.f32')
+    try:
+        process = _decoder(video_path, start, length)
+        with os.fdopen(fd, 'wb') as fp:
+            for data in iter(lambda: process.stdout.read(PIPE_CHUNK_SIZE), b''):
+                fp.write(data)
+        _finish(process)
+        if os.path.getsize(pcm_path) == 0:
+            yield np.zeros(0, dtype=np.float32)
+        else:
+            audio = np.memmap(pcm_path, dtype=np.float32, mode='r')
+            try:
+                yield audio
+            finally:
+                del audio
+    finally:
+        os.remove(pcm_path)
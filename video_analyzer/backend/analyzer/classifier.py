@@ -0,0 +1,194 @@
+import json
+import os
+import unicodedata
+from collections import defaultdict, deque
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+
+try:
+    import ahocorasick  # pyahocorasick kuruluysa C otomatı kullanılır
+except ImportError:
+    ahocorasick = None
+
+DEFAULT_LEXICON = os.path.join(os.path.dirname(__file__), 'lexicon.json')
+# Toplu taramada segmentleri ayırır; hiçbir terim içermediğinden eşleşme segment sınırını aşamaz
+SEPARATOR = '\x00'
+# Tek bir terim tek başına kesinlik sayılmasın
+MAX_WEIGHT = 0.99
+
+
+class FoldTable(dict):
+    # str.translate tablosu: her karakter tek karaktere iner, böylece konumlar korunur
+    EXTRA = {'ı': 'i', '’': "'", '‘': "'", '`': "'"}
+
+    def __missing__(self, code):
+        char = chr(code)
+        if char.isspace():
+            folded = ' '
+        else:
+            folded = self.EXTRA.get(char) or (unicodedata.normalize('NFKD', char)[:1].lower() or char)[0]
+            folded = self.EXTRA.get(folded, folded)
+        self[code] = folded
+        return folded
+
+
+FOLD_TABLE = FoldTable()
+
+
+def fold(text):
+    # Küçük harf ve aksansız biçim (Öldür -> oldur, İ/ı -> i); uzunluk değişmez
+    return text.translate(FOLD_TABLE)
+
+
+class Automaton:
+    """Saf Python Aho–Corasick otomatı; pyahocorasick ile aynı arayüz.
+
+    Tüm terimler tek otomatta durur ve metin terim sayısından bağımsız olarak
+    bir kez taranır.
+    """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+
+    def add_word(self, word, value):
+        state = 0
+        for char in word:
+            following = self.goto[state].get(char)
+            if following is None:
+                following = len(self.goto)
+                self.goto[state][char] = following
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            state = following
+        self.out[state] = (value,)
+
+    def make_automaton(self):
+        # Başarısızlık bağlantıları genişlik öncelikli kurulur; çıktılar bağlantı boyunca birleşir
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[following] = self.goto[fallback].get(char, 0)
+                self.out[following] += self.out[self.fail[following]]
+
+    def iter(self, text):
+        # (eşleşmenin son karakterinin konumu, değer)
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                for value in out[state]:
+                    yield index, value
+
+
+class Lexicon:
+    """Kategori -> {terim: ağırlık} sözlüğünden derlenmiş çoklu desen eşleyici.
+
+    `*` ile biten terimler kelime başı olarak eşleşir (öldür* -> öldürecek),
+    diğerleri tam kelime ya da öbek olarak. Bir kategorinin güveni eşleşen
+    terimlerin gürültülü-VEYA birleşimidir: 1 - Π(1 - ağırlık).
+    """
+
+    def __init__(self, entries):
+        self.categories = sorted(entries)
+        by_word = defaultdict(list)
+        categories, weights, lengths, prefixes = [], [], [], []
+        for category_index, category in enumerate(self.categories):
+            for term, weight in entries[category].items():
+                word = fold(term.rstrip('*').strip())
+                if not word:
+                    continue
+                by_word[word].append(len(categories))
+                categories.append(category_index)
+                weights.append(min(float(weight), MAX_WEIGHT))
+                lengths.append(len(word))
+                prefixes.append(term.endswith('*'))
+
+        self.term_category = np.array(categories, dtype=np.intp)
+        self.term_log_keep = np.log1p(-np.clip(np.array(weights, dtype=np.float64), 0.0, MAX_WEIGHT))
+        self.term_length = lengths
+        self.term_prefix = prefixes
+        self.automaton = ahocorasick.Automaton() if ahocorasick is not None else Automaton()
+        for word, terms in by_word.items():
+            self.automaton.add_word(word, (len(word), tuple(terms)))
+        if by_word:
+            self.automaton.make_automaton()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.term_length)
+
+    def score(self, texts):
+        """Metinleri tek geçişte puanlar; (metin, kategori) güven matrisi döner.
+
+        Metinler ayraçla birleştirilip bir kez taranır, eşleşmeler konumlarından
+        metinlere dağıtılır ve güvenler numpy ile toplu hesaplanır. Aynı terimin
+        bir metinde tekrar geçmesi güveni artırmaz.
+        """
+        scores = np.zeros((len(texts), len(self.categories)))
+        if not texts or not len(self):
+            return scores
+        text = fold(SEPARATOR.join(texts))
+        last = len(text) - 1
+        positions, hits = [], []
+        for end, (length, terms) in self.automaton.iter(text):
+            start = end - length + 1
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            whole_word = end == last or not text[end + 1].isalnum()
+            for term in terms:
+                if whole_word or self.term_prefix[term]:
+                    positions.append(start)
+                    hits.append(term)
+        if not hits:
+            return scores
+
+        offsets = np.cumsum([0] + [len(t) + len(SEPARATOR) for t in texts[:-1]])
+        rows = np.searchsorted(offsets, np.array(positions), side='right') - 1
+        pairs = np.unique(rows * len(self) + np.array(hits))
+        rows, terms = np.divmod(pairs, len(self))
+        log_keep = np.zeros_like(scores)
+        np.add.at(log_keep, (rows, self.term_category[terms]), self.term_log_keep[terms])
+        return 1.0 - np.exp(log_keep)
+
+
+@lru_cache(maxsize=4)
+def load_lexicon(path):
+    return Lexicon.load(path)
+
+
+def get_lexicon():
+    return load_lexicon(settings.CONTENT_LEXICON_PATH or DEFAULT_LEXICON)
+
+
+def classify_segments(segments, min_confidence=None, batch_size=None):
+    """Transkript segmentlerini gruplar halinde puanlar.
+
+    Eşiği geçen her (segment, kategori, güven) üçlüsünü zaman sırasıyla üretir.
+    """
+    lexicon = get_lexicon()
+    min_confidence = settings.CONTENT_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    batch_size = batch_size or settings.CONTENT_SCORE_BATCH
+    segments = list(segments)
+    for offset in range(0, len(segments), batch_size):
+        batch = segments[offset:offset + batch_size]
+        scores = lexicon.score([segment.text for segment in batch])
+        rows, columns = np.nonzero(scores >= min_confidence)
+        for row, column in zip(rows.tolist(), columns.tolist()):
+            yield batch[row], lexicon.categories[column], float(scores[row, column])
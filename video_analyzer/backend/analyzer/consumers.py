@@ -1,12 +1,53 @@
+import abc
+import asyncio
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
 from .models import AnalysisJob
+from .progress import TERMINAL_STATUSES, job_group, job_snapshot
 
-class AnalysisConsumer(AsyncWebsocketConsumer):
+class TickFlushMixin(abc.ABC):
+    """Soket başına gönderimi ANALYSIS_PROGRESS_SOCKET_INTERVAL ile sınırlar.
+
+    Alt sınıflar bekleyen mesajları biriktirir ve `flush_progress` içinde
+    tek seferde gönderir; `schedule_flush` bir sonraki tike zamanlar.
+    """
+    flush_handle = None
+    last_sent = 0.0
+
+    async def schedule_flush(self, immediate=False):
+        if immediate:
+            await self.flush_now()
+            return
+        if self.flush_handle is not None:
+            return
+        loop = asyncio.get_running_loop()
+        delay = self.last_sent + settings.ANALYSIS_PROGRESS_SOCKET_INTERVAL - loop.time()
+        if delay <= 0:
+            await self.flush_now()
+        else:
+            self.flush_handle = loop.call_later(delay, lambda: asyncio.ensure_future(self.flush_now()))
+
+    async def flush_now(self):
+        self.cancel_flush()
+        self.last_sent = asyncio.get_running_loop().time()
+        await self.flush_progress()
+
+    def cancel_flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+    @abc.abstractmethod
+    async def flush_progress(self):
+        """Biriken mesajları gönderir; gönderilecek bir şey yoksa hiçbir şey yapmaz."""
+
+class AnalysisConsumer(TickFlushMixin, AsyncWebsocketConsumer):
     async def connect(self):
         self.job_id = self.scope['url_route']['kwargs']['job_id']
-        self.room_group_name = f'analysis_{self.job_id}'
+        self.room_group_name = job_group(self.job_id)
+        self.pending = None
 
         # Join room group
         await self.channel_layer.group_add(
@@ -16,7 +57,12 @@ class AnalysisConsumer(AsyncWebsocketConsumer):
 
         await self.accept()
 
+        # Bağlanan istemci beklemeden işin güncel durumunu alır
+        await self.send_snapshot()
+
     async def disconnect(self, close_code):
+        self.cancel_flush()
+
         # Leave room group
         await self.channel_layer.group_discard(
             self.room_group_name,
@@ -25,17 +71,21 @@ class AnalysisConsumer(AsyncWebsocketConsumer):
 
     # Receive message from WebSocket
     async def receive(self, text_data):
-        text_data_json = json.loads(text_data)
-        message = text_data_json['message']
+        # İstemciler yalnızca durum isteyebilir; ilerleme yalnızca worker'lardan gelir
+        try:
+            text_data_json = json.loads(text_data)
+        except ValueError:
+            return
+        if text_data_json.get('action') == 'status':
+            await self.send_snapshot()
 
-        # Send message to room group
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'analysis_message',
-                'message': message
-            }
-        )
+    async def send_snapshot(self):
+        snapshot = await self.get_job_status()
+        if snapshot is None:
+            await self.send(text_data=json.dumps({'type': 'error', 'message': 'Analiz işi bulunamadı'}))
+            await self.close(code=4404)
+            return
+        await self.send(text_data=json.dumps({'type': 'snapshot', **snapshot}))
 
     # Receive message from room group
     async def analysis_message(self, event):
@@ -46,14 +96,116 @@ class AnalysisConsumer(AsyncWebsocketConsumer):
             'message': message
         }))
 
+    async def analysis_progress(self, event):
+        # Sık gelen güncellemeler birleştirilir: soket başına en fazla
+        # ANALYSIS_PROGRESS_SOCKET_INTERVAL'da bir, yalnızca son durum gönderilir
+        self.pending = event['progress']
+        await self.schedule_flush(immediate=self.pending['status'] in TERMINAL_STATUSES)
+
+    async def flush_progress(self):
+        if self.pending is None:
+            return
+        progress, self.pending = self.pending, None
+        await self.send(text_data=json.dumps({'type': 'progress', **progress}))
+
     @database_sync_to_async
     def get_job_status(self):
         try:
             job = AnalysisJob.objects.get(job_id=self.job_id)
-            return {
-                'status': job.status,
-                'progress': job.progress,
-                'error_message': job.error_message
-            }
+            return job_snapshot(job)
         except AnalysisJob.DoesNotExist:
-            return None 
\ No newline at end of file
+            return None
+
+class AnalysisStreamConsumer(TickFlushMixin, AsyncWebsocketConsumer):
+    """Tek bağlantı üzerinden birden çok analiz işini izler.
+
+    İstemci `{"action": "subscribe", "job_ids": [...]}` ve
+    `{"action": "unsubscribe", "job_ids": [...]}` gönderir. Gelen ilerlemeler
+    iş başına birleştirilir ve her tikte tek bir `batch` mesajıyla iletilir.
+    """
+
+    async def connect(self):
+        self.subscriptions = set()
+        self.pending = {}
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        self.cancel_flush()
+        for job_id in self.subscriptions:
+            await self.channel_layer.group_discard(job_group(job_id), self.channel_name)
+        self.subscriptions.clear()
+
+    async def receive(self, text_data):
+        try:
+            data = json.loads(text_data)
+            action = data.get('action')
+            job_ids = [str(job_id) for job_id in data.get('job_ids', [])]
+        except (ValueError, AttributeError, TypeError):
+            await self.send_error('Geçersiz mesaj')
+            return
+
+        if action == 'subscribe':
+            await self.subscribe(job_ids)
+        elif action == 'unsubscribe':
+            await self.unsubscribe(job_ids)
+        elif action == 'status':
+            await self.send_batch(list((await self.get_snapshots(job_ids or self.subscriptions)).values()))
+        else:
+            await self.send_error('Bilinmeyen işlem')
+
+    async def subscribe(self, job_ids):
+        new_ids = [job_id for job_id in dict.fromkeys(job_ids) if job_id not in self.subscriptions]
+        room = settings.ANALYSIS_STREAM_MAX_SUBSCRIPTIONS - len(self.subscriptions)
+        if len(new_ids) > room:
+            await self.send_error(f'En fazla {settings.ANALYSIS_STREAM_MAX_SUBSCRIPTIONS} iş izlenebilir')
+            new_ids = new_ids[:max(room, 0)]
+
+        # Yalnızca var olan işlere abone olunur; anlık durumları tek mesajda gelir
+        snapshots = await self.get_snapshots(new_ids)
+        for job_id in snapshots:
+            await self.channel_layer.group_add(job_group(job_id), self.channel_name)
+            self.subscriptions.add(job_id)
+        missing = [job_id for job_id in new_ids if job_id not in snapshots]
+        await self.send(text_data=json.dumps({
+            'type': 'subscribed',
+            'job_ids': list(snapshots),
+            'missing': missing,
+        }))
+        await self.send_batch(list(snapshots.values()))
+
+    async def unsubscribe(self, job_ids):
+        for job_id in job_ids:
+            if job_id in self.subscriptions:
+                self.subscriptions.discard(job_id)
+                self.pending.pop(job_id, None)
+                await self.channel_layer.group_discard(job_group(job_id), self.channel_name)
+        await self.send(text_data=json.dumps({'type': 'unsubscribed', 'job_ids': job_ids}))
+
+    async def analysis_progress(self, event):
+        # İş başına yalnızca son durum tutulur, gönderim tik başına bir kez
+        progress = event['progress']
+        if progress['job_id'] not in self.subscriptions:
+            return
+        self.pending[progress['job_id']] = progress
+        await self.schedule_flush()
+
+    async def analysis_message(self, event):
+        pass
+
+    async def flush_progress(self):
+        if not self.pending:
+            return
+        events, self.pending = list(self.pending.values()), {}
+        await self.send_batch(events)
+
+    async def send_batch(self, events):
+        if events:
+            await self.send(text_data=json.dumps({'type': 'batch', 'events': events}))
+
+    async def send_error(self, message):
+        await self.send(text_data=json.dumps({'type': 'error', 'message': message}))
+
+    @database_sync_to_async
+    def get_snapshots(self, job_ids):
+        jobs = AnalysisJob.objects.filter(job_id__in=list(job_ids))
+        return {job.job_id: job_snapshot(job) for job in jobs}
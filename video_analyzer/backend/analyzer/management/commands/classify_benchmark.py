@@ -0,0 +1,73 @@
+"""Transkript içerik sınıflandırması için yerel ölçüm (veritabanı kullanılmaz).
+
+Kullanım:
+    python manage.py classify_benchmark [--minutes 60 --words-per-minute 150 --repeat 20]
+    python manage.py classify_benchmark --flagged 0.05   # işaretli terim içeren segment oranı
+
+Sentetik transkript Whisper segmentlerine benzer uzunlukta parçalara bölünür
+ve yapılandırılmış sözlükle gruplar halinde puanlanır.
+"""
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from analyzer.classifier import ahocorasick, classify_segments, get_lexicon, load_lexicon
+
+SYLLABLES = ['ka', 'le', 'mi', 'so', 'tu', 'ra', 'ne', 'di', 'yo', 'ba', 'şe', 'çı', 'gö', 'ül', 'ar', 'en']
+PLANTED = ['öldürecek', 'silahını', 'seni bulacağım', 'lanet olsun', 'uyuşturucu', 'kill you']
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Sözlük tabanlı içerik sınıflandırmasının bir saatlik transkriptteki süresini ölçer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=float, default=60)
+        parser.add_argument('--words-per-minute', type=int, default=150)
+        parser.add_argument('--segment-seconds', type=float, default=5.0)
+        parser.add_argument('--flagged', type=float, default=0.02, help='işaretli terim içeren segment oranı')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        words_per_segment = max(1, int(options['words_per_minute'] * options['segment_seconds'] / 60))
+        count = int(options['minutes'] * 60 / options['segment_seconds'])
+        segments = []
+        for i in range(count):
+            words = [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4)))
+                     for _ in range(words_per_segment)]
+            if rng.random() < options['flagged']:
+                words[rng.randrange(len(words))] = rng.choice(PLANTED)
+            start = i * options['segment_seconds']
+            segments.append(SimpleNamespace(start=start, end=start + options['segment_seconds'],
+                                            text=' '.join(words).capitalize() + '.'))
+
+        load_lexicon.cache_clear()
+        started = time.perf_counter()
+        lexicon = get_lexicon()
+        compile_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(
+            f'segment: {count}  kelime: {count * words_per_segment}  '
+            f'karakter: {sum(len(s.text) for s in segments)}  terim: {len(lexicon)}  '
+            f'otomat: {"pyahocorasick" if ahocorasick is not None else "saf Python"}  '
+            f'derleme: {compile_ms:.1f} ms'
+        )
+
+        timings, flags = [], []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            flags = list(classify_segments(segments))
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(
+            f'puanlama (grup {settings.CONTENT_SCORE_BATCH}): p50 {statistics.median(timings):.1f} ms  '
+            f'p95 {percentile(timings, 0.95):.1f} ms  bulgu: {len(flags)}'
+        )
+
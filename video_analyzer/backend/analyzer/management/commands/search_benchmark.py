@@ -0,0 +1,131 @@
+"""Transkript tam metin araması için ölçüm (yapılandırılmış veritabanında).
+
+Kullanım:
+    python manage.py search_benchmark [--transcripts 100000 --segments 10 --repeat 20]
+    python manage.py search_benchmark --keep   # üretilen veriyi geri alma
+
+Sentetik veri tek bir transaction içinde üretilir ve varsayılan olarak
+sonunda geri alınır. Her sorgu için indeksli arama ile satır taraması
+(icontains) karşılaştırılır.
+"""
+import itertools
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from analyzer.models import Transcript, TranscriptSegment, Video
+from analyzer.search import search_transcripts
+
+SYLLABLES = ['ka', 'le', 'mi', 'so', 'tu', 'ra', 'ne', 'di', 'yo', 'ba', 'şe', 'çı', 'gö', 'ül', 'ar', 'en']
+# Ölçülen sorgular ve yaklaşık eşleşme oranları
+PLANTED = {'kırmızı balon': 0.001, 'deniz feneri': 0.01}
+
+
+class Rollback(Exception):
+    pass
+
+
+def vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Transkript aramasının indeksleme hızını ve sorgu gecikmesini ölçer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transcripts', type=int, default=100000)
+        parser.add_argument('--segments', type=int, default=10, help='transkript başına segment')
+        parser.add_argument('--words', type=int, default=12, help='segment başına kelime')
+        parser.add_argument('--vocabulary', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=20, help='sorgu başına tekrar')
+        parser.add_argument('--batch', type=int, default=2000)
+        parser.add_argument('--keep', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                if not options['keep']:
+                    raise Rollback()
+        except Rollback:
+            self.stdout.write('üretilen veri geri alındı')
+
+    def run(self, options):
+        rng = random.Random(0)
+        words = vocabulary(options['vocabulary'], rng)
+        # Zipf benzeri dağılım: az sayıda kelime çok sık geçer
+        weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(words))))
+        common = words[0]
+
+        start = time.perf_counter()
+        created = 0
+        for offset in range(0, options['transcripts'], options['batch']):
+            count = min(options['batch'], options['transcripts'] - offset)
+            videos = Video.objects.bulk_create([Video(title=f'bench {offset + i}') for i in range(count)])
+            texts = []
+            for _ in videos:
+                segments = []
+                for _ in range(options['segments']):
+                    segment = rng.choices(words, cum_weights=weights, k=options['words'])
+                    for phrase, rate in PLANTED.items():
+                        if rng.random() < rate / options['segments']:
+                            segment[rng.randrange(len(segment))] = phrase
+                    segments.append(' '.join(segment))
+                texts.append(segments)
+            transcripts = Transcript.objects.bulk_create([
+                Transcript(video=video, content=' '.join(segments), language='tr')
+                for video, segments in zip(videos, texts)
+            ])
+            TranscriptSegment.objects.bulk_create([
+                TranscriptSegment(video=video, transcript=transcript, start=i * 5.0, end=i * 5.0 + 5.0, text=text)
+                for video, transcript, segments in zip(videos, transcripts, texts)
+                for i, text in enumerate(segments)
+            ])
+            created += count
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'veritabanı: {connection.vendor}  transkript: {created}  '
+            f'segment: {created * options["segments"]}\n'
+            f'yazma (indeks bakımı dahil): {elapsed:.1f} s, {created / elapsed:.0f} transkript/s'
+        )
+
+        queries = {
+            'nadir öbek': '"kırmızı balon"',
+            'orta öbek': '"deniz feneri"',
+            'sık kelime': common,
+            'önek': common[:3],
+            'iki kelime': f'{words[50]} {words[500]}',
+        }
+        for label, query in queries.items():
+            fts, hits = self.measure(lambda: search_transcripts(query), options['repeat'])
+            needle = query.strip('"').split()[0]
+            # İndekssiz karşılık: hangi videoların geçtiğini bulmak için tüm satırlar taranır
+            scan, _ = self.measure(
+                lambda: Transcript.objects.filter(content__icontains=needle)
+                .values('video_id').distinct().count(),
+                max(1, options['repeat'] // 10),
+            )
+            self.stdout.write(
+                f'{label:<11} {query!r:<24} sonuç: {len(hits):>2}  '
+                f'indeks p50 {statistics.median(fts):7.1f} ms  p95 {percentile(fts, 0.95):7.1f} ms  |  '
+                f'tarama p50 {statistics.median(scan):8.1f} ms'
+            )
+
+    def measure(self, func, repeat):
+        timings, result = [], None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings, result
@@ -0,0 +1,182 @@
+"""Analiz WebSocket dağıtımı için yerel ölçüm (bellek içi kanal katmanı).
+
+Kullanım:
+    python manage.py ws_benchmark [--connections 100 --per-connection 100 --jobs 1000 --events 20000]
+    python manage.py ws_benchmark --mode single   # iş başına ayrı soket (karşılaştırma)
+"""
+import asyncio
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import DEFAULT_CHANNEL_LAYER, InMemoryChannelLayer, channel_layers
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from analyzer.consumers import AnalysisConsumer, AnalysisStreamConsumer
+from analyzer.progress import job_group
+
+
+def fake_snapshot(job_id, progress=0.0):
+    return {
+        'job_id': job_id, 'video': 0, 'status': 'processing', 'stage': 'transcribing',
+        'progress': progress, 'eta': None, 'error_message': '',
+    }
+
+
+class BenchChannelLayer(InMemoryChannelLayer):
+    # InMemoryChannelLayer her gönderim/alımda tüm grupları tarayıp süresi
+    # dolanları temizler (O(abonelik)); kısa ölçümde gereksiz ve sonucu boğuyor
+    def _clean_expired(self):
+        pass
+
+
+# Ölçümde veritabanına gidilmez; anlık durumlar sentetik üretilir
+class BenchStreamConsumer(AnalysisStreamConsumer):
+    async def get_snapshots(self, job_ids):
+        return {job_id: fake_snapshot(job_id) for job_id in job_ids}
+
+
+class BenchJobConsumer(AnalysisConsumer):
+    async def get_job_status(self):
+        return fake_snapshot(self.job_id)
+
+
+def drain(communicator):
+    # Bekleyen soket mesajlarını okur; (mesaj, olay) sayısını döndürür
+    messages = events = 0
+    queue = communicator.output_queue
+    while not queue.empty():
+        message = queue.get_nowait()
+        if message['type'] != 'websocket.send':
+            continue
+        data = json.loads(message['text'])
+        messages += 1
+        events += len(data['events']) if data['type'] == 'batch' else 1
+    return messages, events
+
+
+class Command(BaseCommand):
+    help = 'Analiz ilerleme soketlerinin mesaj hızını ve bağlantı başına belleğini ölçer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['stream', 'single'], default='stream')
+        parser.add_argument('--connections', type=int, default=100)
+        parser.add_argument('--per-connection', type=int, default=100, help='bağlantı başına izlenen iş')
+        parser.add_argument('--jobs', type=int, default=1000, help='farklı iş sayısı')
+        parser.add_argument('--events', type=int, default=20000, help='yayınlanan ilerleme olayı')
+        parser.add_argument('--tick', type=float, default=settings.ANALYSIS_PROGRESS_SOCKET_INTERVAL)
+
+    def handle(self, *args, **options):
+        settings.ANALYSIS_PROGRESS_SOCKET_INTERVAL = options['tick']
+        settings.ANALYSIS_STREAM_MAX_SUBSCRIPTIONS = max(
+            settings.ANALYSIS_STREAM_MAX_SUBSCRIPTIONS, options['per_connection']
+        )
+        asyncio.run(self.run(options))
+
+    async def run(self, options):
+        layer = BenchChannelLayer(capacity=10**6)
+        channel_layers.set(DEFAULT_CHANNEL_LAYER, layer)
+        rng = random.Random(0)
+        job_ids = [f'job-{i}' for i in range(options['jobs'])]
+        per_connection = min(options['per_connection'], len(job_ids))
+        plan = [rng.sample(job_ids, per_connection) for _ in range(options['connections'])]
+        subscriptions = sum(len(ids) for ids in plan)
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        if options['mode'] == 'stream':
+            communicators = await self.open_stream(plan)
+        else:
+            communicators = await self.open_single(plan)
+        setup = time.perf_counter() - start
+        await asyncio.sleep(0)
+        for communicator in communicators:
+            drain(communicator)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        used = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+        # Rastgele işlere ilerleme yayınla; tüketiciler kanal kuyruklarını boşaltana
+        # kadar geçen süre dağıtım (fan-out) hızını verir
+        start = time.perf_counter()
+        fanout = 0
+        for i in range(options['events']):
+            job_id = rng.choice(job_ids)
+            fanout += len(layer.groups.get(job_group(job_id), ()))
+            await layer.group_send(job_group(job_id), {
+                'type': 'analysis_progress',
+                'progress': fake_snapshot(job_id, i * 100.0 / options['events']),
+            })
+        publish = time.perf_counter() - start
+        while any(not queue.empty() for queue in layer.channels.values()):
+            await asyncio.sleep(0)
+        consume = time.perf_counter() - start
+
+        # Tiklerde biriken soket mesajlarını say
+
+        messages = events = idle = 0
+        start = time.perf_counter()
+        while idle < 3:
+            await asyncio.sleep(options['tick'] or 0.01)
+            delivered = [drain(c) for c in communicators]
+            got = sum(m for m, _ in delivered)
+            messages += got
+            events += sum(e for _, e in delivered)
+            idle = idle + 1 if got == 0 else 0
+        elapsed = time.perf_counter() - start - 3 * (options['tick'] or 0.01)
+
+        for communicator in communicators:
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        for communicator in communicators:
+            await communicator.wait(timeout=1)
+
+        self.stdout.write(
+            f"mod: {options['mode']}  soket: {len(communicators)}  abonelik: {subscriptions}  "
+            f"tik: {options['tick']} s\n"
+            f"kurulum: {setup:.2f} s  bellek/soket: {used / len(communicators) / 1024:.1f} KiB  "
+            f"bellek/abonelik: {used / subscriptions:.0f} B\n"
+            f"yayın: {options['events']} olay, {options['events'] / publish:.0f} olay/s\n"
+            f"dağıtım: {fanout} kanal mesajı, {consume:.2f} s, {fanout / consume:.0f} mesaj/s\n"
+            f"soket: {messages} mesaj, {events} olay (birleştirme oranı {fanout / max(events, 1):.1f}x, "
+            f"boşaltma {elapsed:.2f} s)"
+        )
+
+    async def connect(self, consumer, path, kwargs=None):
+        scope = {'type': 'websocket', 'path': path, 'headers': [], 'subprotocols': []}
+        if kwargs is not None:
+            scope['url_route'] = {'args': (), 'kwargs': kwargs}
+        communicator = ApplicationCommunicator(consumer.as_asgi(), scope)
+        await communicator.send_input({'type': 'websocket.connect'})
+        response = await communicator.receive_output(timeout=5)
+        assert response['type'] == 'websocket.accept', response
+        return communicator
+
+    async def open_stream(self, plan):
+        communicators = []
+        for ids in plan:
+            communicator = await self.connect(BenchStreamConsumer, '/ws/analysis/')
+            await communicator.send_input({
+                'type': 'websocket.receive',
+                'text': json.dumps({'action': 'subscribe', 'job_ids': ids}),
+            })
+            await communicator.receive_output(timeout=5)  # subscribed
+            communicators.append(communicator)
+        return communicators
+
+    async def open_single(self, plan):
+        communicators = []
+        for ids in plan:
+            for job_id in ids:
+                communicator = await self.connect(
+                    BenchJobConsumer, f'/ws/analysis/{job_id}/', {'job_id': job_id}
+                )
+                await communicator.receive_output(timeout=5)  # snapshot
+                communicators.append(communicator)
+        return communicators
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0004_video_upload_date_id_idx_video_status_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chunk_index', models.IntegerField(default=0)),
+                ('start', models.FloatField()),
+                ('end', models.FloatField()),
+                ('text', models.TextField()),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='analyzer.analysisjob')),
+                ('transcript', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='analyzer.transcript')),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transcript_segments', to='analyzer.video')),
+            ],
+            options={
+                'ordering': ['start'],
+                'indexes': [models.Index(fields=['video', 'start'], name='segment_video_start_idx')],
+            },
+        ),
+    ]
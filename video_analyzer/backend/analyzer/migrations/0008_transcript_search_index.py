@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from analyzer.search import install_search_index
+    install_search_index(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    from analyzer.search import drop_search_index
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    # SQLite: FTS5 tabloları + tetikleyiciler, Postgres: to_tsvector GIN ifade indeksleri
+
+    dependencies = [
+        ('analyzer', '0007_video_probe_metadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
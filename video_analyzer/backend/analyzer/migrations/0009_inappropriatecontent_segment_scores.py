@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0008_transcript_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inappropriatecontent',
+            name='category',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='inappropriatecontent',
+            name='end',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='inappropriatecontent',
+            name='segment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='flags', to='analyzer.transcriptsegment'),
+        ),
+        migrations.AddField(
+            model_name='inappropriatecontent',
+            name='start',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='inappropriatecontent',
+            index=models.Index(fields=['video', 'start'], name='flag_video_start_idx'),
+        ),
+    ]
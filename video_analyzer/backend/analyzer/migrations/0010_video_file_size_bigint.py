@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0009_inappropriatecontent_segment_scores'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='video',
+            name='file_size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
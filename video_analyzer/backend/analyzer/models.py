@@ -17,7 +17,19 @@ class Video(models.Model):
     
     # Video metadata
     duration = models.FloatField(null=True, blank=True)  # seconds
-    file_size = models.IntegerField(null=True, blank=True)  # bytes
+    file_size = models.BigIntegerField(null=True, blank=True)  # bytes
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # sha256
+    width = models.IntegerField(null=True, blank=True)
+    height = models.IntegerField(null=True, blank=True)
+    fps = models.FloatField(null=True, blank=True)
+    video_codec = models.CharField(max_length=32, blank=True)  # boşsa dosya henüz okunmadı
+    audio_codec = models.CharField(max_length=32, blank=True)  # boşsa ses akışı yok
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['upload_date', 'id'], name='video_upload_date_id_idx'),
+            models.Index(fields=['status'], name='video_status_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -30,3 +42,66 @@ class AnalysisResult(models.Model):
 
     def __str__(self):
         return f"Analysis Result for {self.video.title}"
+
+class AnalysisJob(models.Model):
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='analysis_jobs')
+    job_id = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=20, default='pending')  # pending, processing, completed, failed
+    progress = models.FloatField(default=0)
+    stage = models.CharField(max_length=20, blank=True)  # probing, transcribing, finalizing
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)  # son ilerleme; toplu update()'lerde elle yazılır
+
+    def __str__(self):
+        return f"Analysis Job {self.job_id} ({self.status})"
+
+class Transcript(models.Model):
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='transcripts')
+    content = models.TextField()
+    language = models.CharField(max_length=10, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Transcript for {self.video.title}"
+
+class InappropriateContent(models.Model):
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='inappropriate_contents')
+    content_type = models.CharField(max_length=20)  # text, visual
+    category = models.CharField(max_length=32, blank=True)  # violence, threat, profanity, ...
+    content = models.TextField()
+    confidence = models.FloatField(default=0.0)
+    # Metin bulguları işaretlenen transkript segmentine ve zaman aralığına bağlanır
+    segment = models.ForeignKey('TranscriptSegment', on_delete=models.CASCADE, related_name='flags', null=True, blank=True)
+    start = models.FloatField(null=True, blank=True)  # seconds
+    end = models.FloatField(null=True, blank=True)  # seconds
+    timestamp = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['video', 'start'], name='flag_video_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type} content in {self.video.title}"
+
+class TranscriptSegment(models.Model):
+    # Zaman damgalı transkript parçası; istemciler bu aralıklara atlayabilir
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='transcript_segments')
+    job = models.ForeignKey(AnalysisJob, on_delete=models.CASCADE, related_name='segments', null=True, blank=True)
+    transcript = models.ForeignKey(Transcript, on_delete=models.CASCADE, related_name='segments', null=True, blank=True)
+    chunk_index = models.IntegerField(default=0)
+    start = models.FloatField()  # seconds
+    end = models.FloatField()  # seconds
+    text = models.TextField()
+
+    class Meta:
+        ordering = ['start']
+        indexes = [
+            models.Index(fields=['video', 'start'], name='segment_video_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.start:.2f}-{self.end:.2f}s in {self.video.title}"
@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class VideoCursorPagination(CursorPagination):
+    # (upload_date, id) üzerinden keyset sayfalama; COUNT(*) ve OFFSET yok
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-upload_date', '-id')
@@ -0,0 +1,41 @@
+import ffmpeg
+from django.conf import settings
+
+
+def _rate(value):
+    # ffprobe oranları "30000/1001" biçiminde verir
+    try:
+        num, _, den = (value or '').partition('/')
+        return float(num) / float(den or 1) or None
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def probe_video(path):
+    """Süre, çözünürlük, fps ve codec bilgisini yalnızca kap başlığından okur.
+
+    ffprobe kare çözmez ve en fazla VIDEO_PROBE_MAX_BYTES okur. Okunamayan
+    dosyalar için boş sözlük döner.
+    """
+    try:
+        info = ffmpeg.probe(path, probesize=settings.VIDEO_PROBE_MAX_BYTES)
+    except (ffmpeg.Error, OSError, ValueError):
+        return {}
+
+    metadata = {}
+    duration = info.get('format', {}).get('duration')
+    if duration:
+        metadata['duration'] = float(duration)
+    for stream in info.get('streams', []):
+        if stream.get('codec_type') == 'video' and 'video_codec' not in metadata:
+            metadata.update(
+                video_codec=stream.get('codec_name', ''),
+                width=stream.get('width'),
+                height=stream.get('height'),
+                fps=_rate(stream.get('avg_frame_rate')),
+            )
+        elif stream.get('codec_type') == 'audio' and 'audio_codec' not in metadata:
+            metadata['audio_codec'] = stream.get('codec_name', '')
+    if 'video_codec' in metadata:
+        metadata.setdefault('audio_codec', '')
+    return metadata
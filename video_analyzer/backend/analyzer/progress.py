@@ -0,0 +1,124 @@
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from .models import AnalysisJob
+
+# Aşamaların toplam ilerlemedeki payları (yüzde)
+STAGE_RANGES = {
+    'probing': (0.0, 5.0),
+    'transcribing': (5.0, 95.0),
+    'finalizing': (95.0, 100.0),
+}
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+def job_group(job_id):
+    return f'analysis_{job_id}'
+
+
+def stage_progress(stage, fraction):
+    # Aşama içindeki [0, 1] ilerlemeyi toplam yüzdeye çevirir
+    low, high = STAGE_RANGES[stage]
+    return low + (high - low) * min(max(fraction, 0.0), 1.0)
+
+
+def estimate_eta(started_at, progress):
+    # Şimdiye kadarki hıza göre kalan süre (saniye)
+    if started_at is None or progress <= 0 or progress >= 100:
+        return None
+    elapsed = (timezone.now() - started_at).total_seconds()
+    return round(elapsed * (100.0 - progress) / progress, 1)
+
+
+def job_snapshot(job):
+    return {
+        'job_id': job.job_id,
+        'video': job.video_id,
+        'status': job.status,
+        'stage': job.stage,
+        'progress': round(job.progress, 1),
+        'eta': estimate_eta(job.started_at, job.progress),
+        'error_message': job.error_message,
+    }
+
+
+def publish(job):
+    """İşin güncel durumunu `analysis_{job_id}` grubuna gönderir."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(
+        job_group(job.job_id),
+        {'type': 'analysis_progress', 'progress': job_snapshot(job)},
+    )
+
+
+class ProgressReporter:
+    """Worker tarafında ilerlemeyi kısarak kaydeder ve yayınlar.
+
+    Aynı aşamadaki güncellemeler en fazla `interval` saniyede bir veritabanına
+    yazılıp yayınlanır; aradakiler birleştirilir ve yalnızca sonuncusu kalır.
+    Aşama veya durum değişiklikleri her zaman hemen gönderilir.
+    """
+
+    def __init__(self, job_id, interval=None):
+        self.job_id = job_id
+        self.interval = settings.ANALYSIS_PROGRESS_INTERVAL if interval is None else interval
+        self._last_sent = 0.0
+        self._stage = None
+        self._status = None
+        self._pending = None
+
+    def update(self, progress=None, stage=None, status=None, **fields):
+        changes = dict(fields)
+        if progress is not None:
+            changes['progress'] = progress
+        if stage is not None:
+            changes['stage'] = stage
+        if status is not None:
+            changes['status'] = status
+        self._pending = {**(self._pending or {}), **changes}
+
+        force = status in TERMINAL_STATUSES
+        if stage is not None and stage != self._stage:
+            self._stage, force = stage, True
+        if status is not None and status != self._status:
+            self._status, force = status, True
+        if force or time.monotonic() - self._last_sent >= self.interval:
+            self.flush()
+
+    def stage(self, stage, fraction):
+        self.update(progress=stage_progress(stage, fraction), stage=stage)
+
+    def flush(self):
+        if not self._pending:
+            return None
+        changes, self._pending = self._pending, None
+        if changes.get('status') in TERMINAL_STATUSES:
+            changes.setdefault('completed_at', timezone.now())
+        changes['updated_at'] = timezone.now()
+        AnalysisJob.objects.filter(job_id=self.job_id).update(**changes)
+        self._last_sent = time.monotonic()
+        job = AnalysisJob.objects.get(job_id=self.job_id)
+        publish(job)
+        return job
+
+
+def advance(job_id, stage, fraction):
+    # Paralel parçalar aşama içindeki paylarını atomik olarak ekler; tekrar
+    # çalışan bir parça aşamanın üst sınırını aşamaz
+    low, high = STAGE_RANGES[stage]
+    AnalysisJob.objects.filter(job_id=job_id).update(
+        progress=Least(F('progress') + (high - low) * fraction, Value(high)), stage=stage,
+        updated_at=timezone.now(),
+    )
+    job = AnalysisJob.objects.get(job_id=job_id)
+    publish(job)
+    return job
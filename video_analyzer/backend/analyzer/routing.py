@@ -2,5 +2,6 @@ from django.urls import re_path
 from . import consumers
 
 websocket_urlpatterns = [
-    re_path(r'ws/analysis/(?P<job_id>\w+)/$', consumers.AnalysisConsumer.as_asgi()),
+    re_path(r'ws/analysis/$', consumers.AnalysisStreamConsumer.as_asgi()),
+    re_path(r'ws/analysis/(?P<job_id>[\w-]+)/$', consumers.AnalysisConsumer.as_asgi()),
 ] 
\ No newline at end of file
@@ -0,0 +1,305 @@
+import html
+import re
+
+from django.db import connection
+
+# Postgres metin arama yapılandırması; ifade indeksleri bununla kurulur, sorgular
+# indeksi kullanabilsin diye aynı ifadeyi kullanmalıdır. Transkriptler çok dilli
+# olduğundan kök bulma yapılmaz, bunun yerine kelimeler önek olarak aranır.
+SEARCH_CONFIG = 'simple'
+MAX_TERMS = 16
+SNIPPET_WORDS = 16
+
+# Vurgu işaretleri metin kaçırıldıktan sonra <mark> etiketine çevrilir
+MARK_START, MARK_END = '\x02', '\x03'
+
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+WORD_PATTERN = re.compile(r'\w+')
+
+SQLITE_INDEX = [
+    # İçeriği asıl tablolardan okuyan (external content) FTS5 tabloları. Önek
+    # indeksleri kısa önek sorgularında terim listelerinin birleştirilmesini önler
+    """CREATE VIRTUAL TABLE IF NOT EXISTS analyzer_transcript_fts USING fts5(
+        content, content='analyzer_transcript', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS analyzer_transcriptsegment_fts USING fts5(
+        text, video_id, content='analyzer_transcriptsegment', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')""",
+    # Tetikleyiciler bulk_create ve queryset.update() dahil her yazımda indeksi günceller
+    """CREATE TRIGGER IF NOT EXISTS analyzer_transcript_fts_ai AFTER INSERT ON analyzer_transcript BEGIN
+        INSERT INTO analyzer_transcript_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS analyzer_transcript_fts_ad AFTER DELETE ON analyzer_transcript BEGIN
+        INSERT INTO analyzer_transcript_fts(analyzer_transcript_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS analyzer_transcript_fts_au AFTER UPDATE OF content ON analyzer_transcript BEGIN
+        INSERT INTO analyzer_transcript_fts(analyzer_transcript_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+        INSERT INTO analyzer_transcript_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS analyzer_transcriptsegment_fts_ai AFTER INSERT ON analyzer_transcriptsegment BEGIN
+        INSERT INTO analyzer_transcriptsegment_fts(rowid, text, video_id) VALUES (new.id, new.text, new.video_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS analyzer_transcriptsegment_fts_ad AFTER DELETE ON analyzer_transcriptsegment BEGIN
+        INSERT INTO analyzer_transcriptsegment_fts(analyzer_transcriptsegment_fts, rowid, text, video_id)
+        VALUES ('delete', old.id, old.text, old.video_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS analyzer_transcriptsegment_fts_au
+    AFTER UPDATE OF text, video_id ON analyzer_transcriptsegment BEGIN
+        INSERT INTO analyzer_transcriptsegment_fts(analyzer_transcriptsegment_fts, rowid, text, video_id)
+        VALUES ('delete', old.id, old.text, old.video_id);
+        INSERT INTO analyzer_transcriptsegment_fts(rowid, text, video_id) VALUES (new.id, new.text, new.video_id);
+    END""",
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS analyzer_transcript_fts_ai',
+    'DROP TRIGGER IF EXISTS analyzer_transcript_fts_ad',
+    'DROP TRIGGER IF EXISTS analyzer_transcript_fts_au',
+    'DROP TRIGGER IF EXISTS analyzer_transcriptsegment_fts_ai',
+    'DROP TRIGGER IF EXISTS analyzer_transcriptsegment_fts_ad',
+    'DROP TRIGGER IF EXISTS analyzer_transcriptsegment_fts_au',
+    'DROP TABLE IF EXISTS analyzer_transcript_fts',
+    'DROP TABLE IF EXISTS analyzer_transcriptsegment_fts',
+]
+
+# Postgres ifade indeksleri satırlarla birlikte güncellenir, ayrı bakım gerekmez
+POSTGRES_INDEX = [
+    f"""CREATE INDEX IF NOT EXISTS transcript_content_fts_idx ON analyzer_transcript
+        USING GIN (to_tsvector('{SEARCH_CONFIG}', content))""",
+    f"""CREATE INDEX IF NOT EXISTS segment_text_fts_idx ON analyzer_transcriptsegment
+        USING GIN (to_tsvector('{SEARCH_CONFIG}', text))""",
+]
+
+POSTGRES_DROP = [
+    'DROP INDEX IF EXISTS transcript_content_fts_idx',
+    'DROP INDEX IF EXISTS segment_text_fts_idx',
+]
+
+
+def install_search_index(conn=None):
+    """Tam metin indeksini kurar; tekrar çağrılması güvenlidir.
+
+    SQLite'ta tabloyu yeniden kuran migration'lar tetikleyicileri düşürür,
+    bu yüzden her migrate sonrasında yeniden çağrılır. FTS tablosu yeni
+    oluşturulduysa mevcut satırlar indekslenir.
+    """
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            existing = set(conn.introspection.table_names(cursor))
+            for statement in SQLITE_INDEX:
+                cursor.execute(statement)
+            for table in ('analyzer_transcript_fts', 'analyzer_transcriptsegment_fts'):
+                if table not in existing:
+                    cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        elif conn.vendor == 'postgresql':
+            for statement in POSTGRES_INDEX:
+                cursor.execute(statement)
+
+
+def drop_search_index(conn=None):
+    conn = conn or connection
+    statements = {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}.get(conn.vendor, [])
+    with conn.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def parse_query(query):
+    """Sorguyu terimlere ayırır: tırnaklı öbekler tam sırayla, tek kelimeler önek olarak aranır."""
+    terms = []
+    for phrase, word in QUERY_PATTERN.findall(query or ''):
+        words = WORD_PATTERN.findall((phrase or word).lower())
+        if words:
+            terms.append((words, bool(phrase) or len(words) > 1))
+    return terms[:MAX_TERMS]
+
+
+def fts5_query(terms):
+    parts = []
+    for words, exact in terms:
+        # \w+ kelimeleri tırnak içermez; FTS5 sözdizimine güvenle gömülür
+        parts.append(f'"{" ".join(words)}"' if exact else f'"{words[0]}"*')
+    return ' AND '.join(parts)
+
+
+def tsquery(terms):
+    parts = []
+    for words, exact in terms:
+        parts.append(f"({' <-> '.join(words)})" if exact else f'{words[0]}:*')
+    return ' & '.join(parts)
+
+
+def highlight(raw):
+    return html.escape(raw).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def search_transcripts(query, limit=20, offset=0, snippets=3):
+    """Sorguyla eşleşen videoları alaka sırasıyla döndürür.
+
+    Videolar en iyi eşleşen transkriptlerine göre sıralanır (SQLite'ta bm25,
+    Postgres'te ts_rank). Her video için en alakalı `snippets` segment,
+    zaman damgası ve vurgulu alıntıyla verilir; segmenti olmayan
+    transkriptlerde alıntı transkriptin kendisinden alınır.
+    """
+    terms = parse_query(query)
+    if not terms:
+        return []
+    if connection.vendor == 'sqlite':
+        backend = SqliteSearch(terms)
+    elif connection.vendor == 'postgresql':
+        backend = PostgresSearch(terms)
+    else:
+        backend = ScanSearch(terms)
+
+    hits = backend.videos(limit, offset)
+    if not hits:
+        return []
+    by_transcript = {hit['transcript']: hit for hit in hits}
+    for hit in hits:
+        hit['snippets'] = []
+    for row in backend.segments([hit['video'] for hit in hits]):
+        hit = by_transcript.get(row['transcript'])
+        if hit is not None and len(hit['snippets']) < snippets:
+            hit['snippets'].append({
+                'segment': row['segment'],
+                'start': row['start'],
+                'end': row['end'],
+                'snippet': highlight(row['snippet']),
+            })
+    for hit in hits:
+        if not hit['snippets']:
+            snippet = backend.transcript_snippet(hit['transcript'])
+            if snippet:
+                hit['snippets'].append({'segment': None, 'start': None, 'end': None,
+                                        'snippet': highlight(snippet)})
+    return hits
+
+
+def _rows(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class SqliteSearch:
+    def __init__(self, terms):
+        self.match = fts5_query(terms)
+
+    def videos(self, limit, offset):
+        # rank (bm25) küçük olan daha alakalıdır; SQLite MIN() ile gruplamada diğer
+        # sütunları en küçük değerin satırından alır
+        rows = _rows(
+            """SELECT t.video_id AS video, t.id AS transcript, v.title AS title,
+                      t.language AS language, MIN(f.score) AS score
+               FROM (SELECT rowid, rank AS score
+                     FROM analyzer_transcript_fts WHERE analyzer_transcript_fts MATCH %s) f
+               JOIN analyzer_transcript t ON t.id = f.rowid
+               JOIN analyzer_video v ON v.id = t.video_id
+               GROUP BY t.video_id ORDER BY score, t.video_id LIMIT %s OFFSET %s""",
+            [self.match, limit, offset],
+        )
+        for row in rows:
+            row['score'] = -row['score']
+        return rows
+
+    def segments(self, video_ids):
+        # video_id sütun süzgeci eşleşmeyi yalnızca bu sayfadaki videolarla sınırlar
+        videos = ' OR '.join(f'"{int(video_id)}"' for video_id in video_ids)
+        return _rows(
+            f"""SELECT s.id AS segment, s.transcript_id AS transcript, s.start AS start, s."end" AS "end",
+                       snippet(analyzer_transcriptsegment_fts, 0, %s, %s, '…', {SNIPPET_WORDS}) AS snippet
+                FROM analyzer_transcriptsegment_fts
+                JOIN analyzer_transcriptsegment s ON s.id = analyzer_transcriptsegment_fts.rowid
+                WHERE analyzer_transcriptsegment_fts MATCH %s
+                ORDER BY bm25(analyzer_transcriptsegment_fts, 1.0, 0.0), s.start""",
+            [MARK_START, MARK_END, f'({self.match}) AND video_id : ({videos})'],
+        )
+
+    def transcript_snippet(self, transcript_id):
+        rows = _rows(
+            f"""SELECT snippet(analyzer_transcript_fts, 0, %s, %s, '…', {SNIPPET_WORDS}) AS snippet
+                FROM analyzer_transcript_fts WHERE analyzer_transcript_fts MATCH %s AND rowid = %s""",
+            [MARK_START, MARK_END, self.match, transcript_id],
+        )
+        return rows[0]['snippet'] if rows else None
+
+
+class PostgresSearch:
+    def __init__(self, terms):
+        self.query = tsquery(terms)
+        self.headline = (f'StartSel={MARK_START}, StopSel={MARK_END}, '
+                         f'MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 3}')
+
+    def videos(self, limit, offset):
+        rows = _rows(
+            f"""SELECT best.video_id AS video, best.id AS transcript, v.title AS title,
+                       best.language AS language, best.score AS score
+                FROM (SELECT DISTINCT ON (t.video_id) t.video_id, t.id, t.language,
+                             ts_rank(to_tsvector('{SEARCH_CONFIG}', t.content), q) AS score
+                      FROM analyzer_transcript t, to_tsquery('{SEARCH_CONFIG}', %s) q
+                      WHERE to_tsvector('{SEARCH_CONFIG}', t.content) @@ q
+                      ORDER BY t.video_id, score DESC) best
+                JOIN analyzer_video v ON v.id = best.video_id
+                ORDER BY best.score DESC, best.video_id LIMIT %s OFFSET %s""",
+            [self.query, limit, offset],
+        )
+        for row in rows:
+            row['score'] = float(row['score'])
+        return rows
+
+    def segments(self, video_ids):
+        return _rows(
+            f"""SELECT s.id AS segment, s.transcript_id AS transcript, s.start AS start, s."end" AS "end",
+                       ts_headline('{SEARCH_CONFIG}', s.text, q, %s) AS snippet
+                FROM analyzer_transcriptsegment s, to_tsquery('{SEARCH_CONFIG}', %s) q
+                WHERE s.video_id = ANY(%s) AND to_tsvector('{SEARCH_CONFIG}', s.text) @@ q
+                ORDER BY ts_rank(to_tsvector('{SEARCH_CONFIG}', s.text), q) DESC, s.start""",
+            [self.headline, self.query, list(video_ids)],
+        )
+
+    def transcript_snippet(self, transcript_id):
+        rows = _rows(
+            f"""SELECT ts_headline('{SEARCH_CONFIG}', content, to_tsquery('{SEARCH_CONFIG}', %s), %s) AS snippet
+                FROM analyzer_transcript WHERE id = %s""",
+            [self.query, self.headline, transcript_id],
+        )
+        return rows[0]['snippet'] if rows else None
+
+
+class ScanSearch:
+    # İndeks desteği olmayan veritabanlarında satır taraması (sıralamasız)
+    def __init__(self, terms):
+        self.terms = [' '.join(words) for words, _ in terms]
+
+    def _filter(self, queryset, field):
+        for term in self.terms:
+            queryset = queryset.filter(**{f'{field}__icontains': term})
+        return queryset
+
+    def videos(self, limit, offset):
+        from .models import Transcript
+        transcripts = self._filter(Transcript.objects.select_related('video'), 'content').order_by('-created_at')
+        hits, seen = [], set()
+        for transcript in transcripts.iterator():
+            if transcript.video_id in seen:
+                continue
+            seen.add(transcript.video_id)
+            if len(seen) > offset:
+                hits.append({'video': transcript.video_id, 'transcript': transcript.id,
+                             'title': transcript.video.title, 'language': transcript.language, 'score': None})
+            if len(hits) >= limit:
+                break
+        return hits
+
+    def segments(self, video_ids):
+        from .models import TranscriptSegment
+        segments = self._filter(TranscriptSegment.objects.filter(video_id__in=video_ids), 'text')
+        return [{'segment': s.id, 'transcript': s.transcript_id, 'start': s.start, 'end': s.end,
+                 'snippet': s.text} for s in segments.order_by('start')]
+
+    def transcript_snippet(self, transcript_id):
+        return None
@@ -1,20 +1,52 @@
 from rest_framework import serializers
-from .models import Video, AnalysisResult, InappropriateContent, Transcript, AnalysisJob
+from .models import Video, AnalysisResult, InappropriateContent, Transcript, TranscriptSegment, AnalysisJob
+from .probe import probe_video
+from .storage import file_sha256, find_stored_duplicate
+
+# Ön okumayla doldurulan alanlar
+PROBED_FIELDS = ['duration', 'width', 'height', 'fps', 'video_codec', 'audio_codec']
 
 class VideoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Video
-        fields = ['id', 'title', 'file_path', 'video_file', 'upload_date', 'status', 'duration', 'file_size']
-        read_only_fields = ['upload_date', 'duration', 'file_size']
+        fields = ['id', 'title', 'file_path', 'video_file', 'upload_date', 'status', 'duration', 'file_size', 'content_hash',
+                  'width', 'height', 'fps', 'video_codec', 'audio_codec']
+        read_only_fields = ['upload_date', 'duration', 'file_size', 'content_hash',
+                            'width', 'height', 'fps', 'video_codec', 'audio_codec']
 
     def create(self, validated_data):
+        # Aynı içerik daha önce yüklendiyse mevcut dosyayı paylaş
+        video_file = validated_data.get('video_file')
+        duplicate = None
+        if video_file:
+            validated_data['content_hash'] = file_sha256(video_file)
+            validated_data['file_size'] = video_file.size
+            duplicate = find_stored_duplicate(validated_data['content_hash'])
+            if duplicate is not None:
+                validated_data['video_file'] = duplicate.video_file.name
+                if duplicate.video_codec:
+                    validated_data.update({field: getattr(duplicate, field) for field in PROBED_FIELDS})
         # Eğer video_file yüklendiyse, file_path'i otomatik dolduralım
         video = Video.objects.create(**validated_data)
         if video.video_file and not video.file_path:
             video.file_path = video.video_file.url
             video.save()
+        if video.video_file and not video.video_codec:
+            # Kap başlığından hızlı ön okuma; süre analiz önceliği için hemen gerekli
+            metadata = probe_video(video.video_file.path)
+            if metadata:
+                for field, value in metadata.items():
+                    setattr(video, field, value)
+                video.save(update_fields=list(metadata))
         return video
 
+class VideoListSerializer(serializers.ModelSerializer):
+    # Liste görünümü için hafif alanlar
+    class Meta:
+        model = Video
+        fields = ['id', 'title', 'status', 'upload_date', 'duration', 'file_size']
+        read_only_fields = fields
+
 class AnalysisResultSerializer(serializers.ModelSerializer):
     video_title = serializers.CharField(source='video.title', read_only=True)
     
@@ -26,7 +58,7 @@ class AnalysisResultSerializer(serializers.ModelSerializer):
 class InappropriateContentSerializer(serializers.ModelSerializer):
     class Meta:
         model = InappropriateContent
-        fields = ['id', 'video', 'content_type', 'content', 'confidence', 'timestamp']
+        fields = ['id', 'video', 'content_type', 'category', 'content', 'confidence', 'segment', 'start', 'end', 'timestamp']
         read_only_fields = ['timestamp']
 
 class TranscriptSerializer(serializers.ModelSerializer):
@@ -35,6 +67,12 @@ class TranscriptSerializer(serializers.ModelSerializer):
         fields = ['id', 'video', 'content', 'language', 'created_at']
         read_only_fields = ['created_at']
 
+class TranscriptSegmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TranscriptSegment
+        fields = ['id', 'video', 'transcript', 'start', 'end', 'text']
+        read_only_fields = fields
+
 class AnalysisJobSerializer(serializers.ModelSerializer):
     class Meta:
         model = AnalysisJob
@@ -0,0 +1,30 @@
+import hashlib
+
+from .models import Video
+
+
+def file_sha256(f):
+    # Django File/UploadedFile içeriğini parça parça okuyarak özetle
+    hasher = hashlib.sha256()
+    for chunk in f.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def find_stored_duplicate(content_hash, exclude_id=None):
+    # Aynı içeriğe sahip, dosyası saklanmış ilk videoyu bul
+    if not content_hash:
+        return None
+    qs = Video.objects.filter(content_hash=content_hash).exclude(video_file='')
+    if exclude_id is not None:
+        qs = qs.exclude(id=exclude_id)
+    return qs.order_by('id').first()
+
+
+def release_video_file(video):
+    # Dosyayı yalnızca ona başvuran son video silindiğinde kaldır
+    if not video.video_file:
+        return
+    name = video.video_file.name
+    if not Video.objects.filter(video_file=name).exclude(id=video.id).exists():
+        video.video_file.delete(save=False)
@@ -0,0 +1,115 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """Tek aralıklı `Range` başlığını (başlangıç, bitiş) çiftine çevirir.
+
+    Başlık yoksa, biçimi tanınmıyorsa veya birden çok aralık istenmişse None
+    döner ve dosyanın tamamı gönderilir. Dosya dışında kalan aralıklar için
+    RangeNotSatisfiable fırlatılır.
+    """
+    match = RANGE_PATTERN.match((header or '').strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # bytes=-N: son N bayt
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    # If-Range eşleşmezse dosya değişmiştir; aralık yok sayılıp tamamı gönderilir
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith('"'):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def read_range(path, start, end, chunk_size):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+def stream_file(request, path, name=None, content_type=None):
+    """Dosyayı Range/206 ve koşullu istek desteğiyle gönderir.
+
+    - If-None-Match / If-Modified-Since eşleşirse 304 döner.
+    - Tam yanıt FileResponse ile verilir; sunucu `wsgi.file_wrapper`
+      sağlıyorsa (gunicorn, uWSGI) gövde sendfile ile kopyalanmadan gider.
+    - VIDEO_STREAM_ACCEL_REDIRECT tanımlıysa gövde hiç okunmaz; nginx'e
+      X-Accel-Redirect ile devredilir, aralık ve sendfile'ı nginx yürütür.
+    - Diğer durumlarda aralık VIDEO_STREAM_CHUNK_SIZE'lık parçalarla okunur.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = f'"{size:x}-{stat.st_mtime_ns:x}"'
+    content_type = content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': settings.VIDEO_STREAM_CACHE_CONTROL,
+    }
+
+    if settings.VIDEO_STREAM_ACCEL_REDIRECT and name:
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Accel-Redirect'] = settings.VIDEO_STREAM_ACCEL_REDIRECT.rstrip('/') + '/' + name.lstrip('/')
+        return response
+
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size) \
+            if if_range_matches(request, etag, last_modified) else None
+    except RangeNotSatisfiable:
+        return HttpResponse(status=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+
+    if byte_range is None or byte_range == (0, size - 1):
+        response = FileResponse(open(path, 'rb'), content_type=content_type, headers=headers)
+        response.block_size = settings.VIDEO_STREAM_CHUNK_SIZE
+        return response
+
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        read_range(path, start, end, settings.VIDEO_STREAM_CHUNK_SIZE),
+        status=206, content_type=content_type, headers=headers,
+    )
+    response['Content-Length'] = str(end - start + 1)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
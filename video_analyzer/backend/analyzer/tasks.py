@@ -1,70 +1,250 @@
 import os
+from collections import Counter
+from contextlib import ExitStack
 import ffmpeg
-import whisper
-from celery import shared_task
+from celery import chord, group, shared_task
 from django.conf import settings
-from .models import Video, AnalysisJob, Transcript, InappropriateContent
+from django.db import transaction
+from django.utils import timezone
+from .models import Video, AnalysisJob, Transcript, TranscriptSegment, InappropriateContent
+from .audio import open_audio, probe_duration
+from .classifier import classify_segments
+from .progress import ProgressReporter, advance
+from .transcription import FRAME_SECONDS, frame_energies, owned_segments, plan_chunks, split_points
+from .whisper_models import registry
+
+def reuse_cached_results(video):
+    # Aynı içeriğe sahip, transkripti çıkarılmış başka bir video varsa sonuçlarını kopyala
+    if not video.content_hash:
+        return False
+    source = Transcript.objects.filter(
+        video__content_hash=video.content_hash
+    ).exclude(video=video).select_related('video').order_by('-created_at').first()
+    if source is None:
+        return False
+    transcript = Transcript.objects.create(video=video, content=source.content, language=source.language)
+    source_segments = list(source.segments.all())
+    segments = TranscriptSegment.objects.bulk_create([
+        TranscriptSegment(
+            video=video,
+            transcript=transcript,
+            chunk_index=segment.chunk_index,
+            start=segment.start,
+            end=segment.end,
+            text=segment.text,
+        )
+        for segment in source_segments
+    ])
+    # Bulgular kopyalanan segmentlere yeniden bağlanır
+    copies = {original.id: copy for original, copy in zip(source_segments, segments)}
+    InappropriateContent.objects.bulk_create([
+        InappropriateContent(
+            video=video,
+            content_type=item.content_type,
+            category=item.category,
+            content=item.content,
+            confidence=item.confidence,
+            segment=copies.get(item.segment_id),
+            start=item.start,
+            end=item.end,
+        )
+        for item in InappropriateContent.objects.filter(video=source.video)
+    ])
+    return True
+
+def screen_transcript(video, segments):
+    # Segment başına metin bulguları; aynı segment birden çok kategoride işaretlenebilir
+    return [
+        InappropriateContent(
+            video=video,
+            content_type='text',
+            category=category,
+            content=segment.text,
+            confidence=round(confidence, 4),
+            segment=segment,
+            start=segment.start,
+            end=segment.end,
+        )
+        for segment, category, confidence in classify_segments(segments)
+    ]
+
+# Redis önceliği: 0 en yüksek
+PRIORITY_SHORT = 0
+PRIORITY_MEDIUM = 3
+PRIORITY_LONG = 6
+PRIORITY_BULK = 9
+
+def has_audio(video):
+    # Ön okuma yapılmamışsa ses olduğu varsayılır
+    return not video.video_codec or bool(video.audio_codec)
+
+def analysis_priority(video, bulk=False):
+    # İş maliyeti yazıya dökülecek ses süresidir: kısa videolar ve etkileşimli
+    # istekler önce, toplu doldurma işleri en sona
+    if bulk:
+        return PRIORITY_BULK
+    if not has_audio(video):
+        return PRIORITY_SHORT
+    duration = video.duration
+    if duration is None:
+        size = video.file_size
+        if size is None and video.video_file:
+            try:
+                size = video.video_file.size
+            except OSError:
+                size = None
+        if size:
+            duration = size / settings.ANALYSIS_PRIORITY_BYTES_PER_SECOND
+    if duration is None:
+        return PRIORITY_MEDIUM
+    if duration <= settings.ANALYSIS_PRIORITY_SHORT_SECONDS:
+        return PRIORITY_SHORT
+    if duration <= settings.ANALYSIS_PRIORITY_MEDIUM_SECONDS:
+        return PRIORITY_MEDIUM
+    return PRIORITY_LONG
+
+def enqueue_analysis(video, job, model_name=None, bulk=False):
+    priority = analysis_priority(video, bulk)
+    analyze_video.apply_async(
+        args=[video.id, job.job_id],
+        kwargs={'model_name': model_name, 'priority': priority},
+        priority=priority,
+    )
+    return priority
+
+def video_path_for(video):
+    return os.path.join(settings.MEDIA_ROOT, str(video.video_file))
+
+def transcription_chunks(video_path, duration, on_progress=None):
+    # Kısa videolar tek parça; uzunlarda sessiz noktalar için ses bir kez taranır
+    chunk_seconds = settings.TRANSCRIPTION_CHUNK_SECONDS
+    search_seconds = settings.TRANSCRIPTION_SILENCE_SEARCH_SECONDS
+    if duration is not None and duration <= chunk_seconds + search_seconds:
+        points = []
+    else:
+        energies = frame_energies(video_path, on_progress)
+        points = split_points(energies, chunk_seconds, search_seconds)
+        if duration is None:
+            duration = len(energies) * FRAME_SECONDS
+    return plan_chunks(duration or 0.0, points, settings.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS)
 
 @shared_task
-def analyze_video(video_id, job_id):
+def analyze_video(video_id, job_id, model_name=None, priority=None):
+    reporter = ProgressReporter(job_id)
     try:
         video = Video.objects.get(id=video_id)
-        job = AnalysisJob.objects.get(job_id=job_id)
-        
-        # Video dosyasının tam yolunu al
-        video_path = os.path.join(settings.MEDIA_ROOT, str(video.video_file))
-        
-        # Ses dosyasını çıkar
-        audio_path = os.path.join(settings.MEDIA_ROOT, f'audio_{video_id}.wav')
-        try:
-            stream = ffmpeg.input(video_path)
-            stream = ffmpeg.output(stream, audio_path)
-            ffmpeg.run(stream, overwrite_output=True)
-        except ffmpeg.Error as e:
-            job.status = 'failed'
-            job.error_message = f'FFmpeg error: {str(e)}'
-            job.save()
+
+        # Aynı içerik daha önce analiz edildiyse tekrar çalıştırma
+        if reuse_cached_results(video):
+            reporter.update(progress=100, stage='finalizing', status='completed')
             return
-        
-        # Whisper ile sesi metne dönüştür
+
+        # Ses akışı yoksa yazıya dökülecek bir şey yok (ffmpeg de hata verirdi)
+        if not has_audio(video):
+            Transcript.objects.create(video=video, content='', language='')
+            reporter.update(progress=100, stage='finalizing', status='completed', started_at=timezone.now())
+            return
+
+        reporter.update(progress=0, stage='probing', status='processing', started_at=timezone.now())
+        video_path = video_path_for(video)
+        duration = video.duration or probe_duration(video_path)
+
+        def on_scan(seconds):
+            if duration:
+                reporter.stage('probing', seconds / duration)
+
+        # Sesi sessiz noktalardan parçalara böl
         try:
-            model = whisper.load_model("base")
-            result = model.transcribe(audio_path)
-            
-            # Transkripti kaydet
-            transcript = Transcript.objects.create(
-                video=video,
-                content=result['text'],
-                language=result['language']
-            )
-            
-            # Uygunsuz içerik analizi yap
-            # TODO: Daha gelişmiş içerik analizi ekle
-            inappropriate_content = InappropriateContent.objects.create(
-                video=video,
-                content_type='text',
-                content=result['text'],
-                confidence=0.0  # Şimdilik sabit değer
+            chunks = transcription_chunks(video_path, duration, on_scan)
+        except ffmpeg.Error as e:
+            reporter.update(
+                status='failed',
+                error_message=f'FFmpeg error: {e.stderr.decode(errors="replace") if e.stderr else e}'
             )
-            
-            # İş durumunu güncelle
-            job.status = 'completed'
-            job.save()
-            
-            # Geçici ses dosyasını sil
-            os.remove(audio_path)
-            
-        except Exception as e:
-            job.status = 'failed'
-            job.error_message = f'Whisper error: {str(e)}'
-            job.save()
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
             return
-            
+
+        reporter.stage('transcribing', 0.0)
+        total = sum(chunk.core_end - chunk.core_start for chunk in chunks) or 1.0
+
+        # Her parça ayrı bir görev; çöken worker yalnızca kendi parçasını tekrarlar.
+        # Parçalar whisper kuyruğuna, birleştirme media kuyruğuna işin önceliğiyle gider
+        options = {} if priority is None else {'priority': priority}
+        chord(
+            group(
+                transcribe_chunk.s(
+                    video_id, job_id,
+                    dict(chunk.to_dict(), share=(chunk.core_end - chunk.core_start) / total),
+                    model_name,
+                ).set(**options)
+                for chunk in chunks
+            ),
+            finalize_transcript.s(video_id, job_id).set(**options),
+        ).on_error(transcription_failed.s(job_id)).delay()
+
     except Exception as e:
-        if job:
-            job.status = 'failed'
-            job.error_message = f'General error: {str(e)}'
-            job.save()
-        return 
\ No newline at end of file
+        reporter.update(status='failed', error_message=f'General error: {str(e)}')
+        return
+
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def transcribe_chunk(self, video_id, job_id, chunk, model_name=None):
+    """Tek bir ses parçasını yazıya döker ve segmentlerini mutlak zamanlarla kaydeder.
+
+    Görev tekrar çalıştırılabilir: parçaya ait eski segmentler silinip yeniden yazılır.
+    """
+    video = Video.objects.get(id=video_id)
+    job = AnalysisJob.objects.get(job_id=job_id)
+
+    with ExitStack() as stack:
+        audio = stack.enter_context(open_audio(
+            video_path_for(video),
+            duration=chunk['end'] - chunk['start'],
+            start=chunk['start'],
+        ))
+        model = registry.get(model_name)
+        result = model.transcribe(audio)
+
+    segments = owned_segments(chunk, result['segments'])
+    with transaction.atomic():
+        TranscriptSegment.objects.filter(job=job, chunk_index=chunk['index']).delete()
+        TranscriptSegment.objects.bulk_create([
+            TranscriptSegment(
+                video=video,
+                job=job,
+                chunk_index=chunk['index'],
+                start=start,
+                end=end,
+                text=text,
+            )
+            for start, end, text in segments
+        ])
+    advance(job_id, 'transcribing', chunk.get('share', 0.0))
+    return {'index': chunk['index'], 'language': result.get('language', ''), 'segments': len(segments)}
+
+@shared_task
+def finalize_transcript(chunk_results, video_id, job_id):
+    # Parça sonuçlarını zaman sırasına göre birleştirip transkripti oluştur
+    reporter = ProgressReporter(job_id)
+    reporter.stage('finalizing', 0.0)
+    video = Video.objects.get(id=video_id)
+    job = AnalysisJob.objects.get(job_id=job_id)
+    queryset = TranscriptSegment.objects.filter(job=job).order_by('start')
+    segments = list(queryset)
+    text = ' '.join(segment.text for segment in segments if segment.text)
+    languages = Counter(r['language'] for r in chunk_results if r.get('language'))
+
+    with transaction.atomic():
+        transcript = Transcript.objects.create(
+            video=video,
+            content=text,
+            language=languages.most_common(1)[0][0] if languages else ''
+        )
+        queryset.update(transcript=transcript)
+
+        # Uygunsuz içerik analizi: segmentler sözlükle puanlanır, eşiği geçenler zamanlarıyla kaydedilir
+        InappropriateContent.objects.bulk_create(screen_transcript(video, segments))
+
+    reporter.update(progress=100, status='completed')
+
+@shared_task
+def transcription_failed(request, exc, traceback, job_id):
+    ProgressReporter(job_id).update(status='failed', error_message=f'Whisper error: {exc}')
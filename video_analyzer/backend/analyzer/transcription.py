@@ -0,0 +1,91 @@
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+from .audio import SAMPLE_RATE, iter_audio_chunks
+
+# Enerji penceresi: 30 ms
+FRAME_SECONDS = 0.03
+FRAME_SAMPLES = int(SAMPLE_RATE * FRAME_SECONDS)
+
+
+@dataclass
+class Chunk:
+    index: int
+    start: float  # çözülecek aralık (örtüşme dahil)
+    end: float
+    core_start: float  # bu parçanın sahip olduğu aralık (örtüşme hariç)
+    core_end: float
+    last: bool = False  # son parça videonun sonuna kadar her şeye sahiptir
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def frame_energies(video_path, on_progress=None):
+    # Sesi akış halinde okuyup 30 ms'lik pencerelerin RMS enerjisini çıkarır;
+    # tüm ses hiçbir zaman bellekte tutulmaz. on_progress(saniye) taranan süreyi alır
+    energies = []
+    scanned = 0
+    remainder = np.zeros(0, dtype=np.float32)
+    for block in iter_audio_chunks(video_path, seconds=30.0):
+        block = np.concatenate([remainder, block]) if remainder.size else block
+        usable = block.size - block.size % FRAME_SAMPLES
+        frames = block[:usable].reshape(-1, FRAME_SAMPLES)
+        energies.append(np.sqrt(np.mean(frames * frames, axis=1)))
+        remainder = block[usable:]
+        scanned += block.size - remainder.size
+        if on_progress is not None:
+            on_progress(scanned / SAMPLE_RATE)
+    return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+
+
+def split_points(energies, chunk_seconds, search_seconds):
+    """Her `chunk_seconds` civarında, ±`search_seconds` içindeki en sessiz noktayı seçer."""
+    duration = energies.size * FRAME_SECONDS
+    points = []
+    target = chunk_seconds
+    while target < duration - search_seconds:
+        lo = int(max(target - search_seconds, (points[-1] if points else 0) + 1) / FRAME_SECONDS)
+        hi = int(min(target + search_seconds, duration) / FRAME_SECONDS)
+        if hi <= lo:
+            break
+        quietest = lo + int(np.argmin(energies[lo:hi]))
+        points.append(round(quietest * FRAME_SECONDS, 3))
+        target = points[-1] + chunk_seconds
+    return points
+
+
+def plan_chunks(duration, points, overlap):
+    # Bölme noktalarından, iki yanda `overlap` saniye örtüşen parçalar üretir
+    bounds = [0.0] + list(points) + [duration]
+    chunks = []
+    for i in range(len(bounds) - 1):
+        core_start, core_end = bounds[i], bounds[i + 1]
+        chunks.append(Chunk(
+            index=i,
+            start=max(0.0, core_start - overlap),
+            end=min(duration, core_end + overlap),
+            core_start=core_start,
+            core_end=core_end,
+            last=i == len(bounds) - 2,
+        ))
+    return chunks
+
+
+def owned_segments(chunk, segments):
+    """Whisper segmentlerini mutlak zamana çevirir ve örtüşmeyi ayıklar.
+
+    Komşu parçalar örtüşen bölgeyi ikişer kez yazıya döker; her segment orta
+    noktası hangi parçanın [core_start, core_end) aralığına düşüyorsa yalnızca
+    orada tutulur. Sınırdaki orta nokta sonraki parçaya aittir; son parça
+    videonun sonunu da kapsar.
+    """
+    owned = []
+    for segment in segments:
+        start = chunk['start'] + segment['start']
+        end = chunk['start'] + segment['end']
+        middle = (start + end) / 2
+        if chunk['core_start'] <= middle and (middle < chunk['core_end'] or chunk.get('last')):
+            owned.append((start, end, segment['text'].strip()))
+    return owned
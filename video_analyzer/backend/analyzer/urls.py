@@ -6,6 +6,7 @@ router = DefaultRouter()
 router.register(r'videos', views.VideoViewSet)
 router.register(r'inappropriate-content', views.InappropriateContentViewSet)
 router.register(r'transcripts', views.TranscriptViewSet)
+router.register(r'transcript-segments', views.TranscriptSegmentViewSet)
 router.register(r'analysis-jobs', views.AnalysisJobViewSet)
 
 urlpatterns = [
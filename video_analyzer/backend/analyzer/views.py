@@ -1,13 +1,27 @@
 from django.shortcuts import render, get_object_or_404
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Video, AnalysisResult, InappropriateContent, Transcript, AnalysisJob
-from .serializers import VideoSerializer, AnalysisResultSerializer, InappropriateContentSerializer, TranscriptSerializer, AnalysisJobSerializer
+from .models import Video, AnalysisResult, InappropriateContent, Transcript, TranscriptSegment, AnalysisJob
+from .pagination import VideoCursorPagination
+from .serializers import VideoSerializer, VideoListSerializer, AnalysisResultSerializer, InappropriateContentSerializer, TranscriptSerializer, TranscriptSegmentSerializer, AnalysisJobSerializer
+from .progress import job_snapshot
+from .search import search_transcripts
+from .storage import release_video_file
+from .streaming import stream_file
+from .tasks import analysis_priority, enqueue_analysis
 import uuid
 import os
+from datetime import timedelta
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+# Bu durumlardaki işler için aynı videoya yeni iş açılmaz
+ACTIVE_JOB_STATUSES = ('pending', 'processing')
 
 # HTML View functions
 def index(request):
@@ -18,13 +32,50 @@ def video_detail(request, video_id):
     video = get_object_or_404(Video, id=video_id)
     return render(request, 'video-detail.html', {'video': video})
 
+class PassthroughRenderer(BaseRenderer):
+    # Dosya yanıtları olduğu gibi döner; <video> etiketinin Accept başlığı 406'ya düşmesin
+    media_type = '*/*'
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
 # API ViewSets
 class VideoViewSet(viewsets.ModelViewSet):
     queryset = Video.objects.all()
     serializer_class = VideoSerializer
+    pagination_class = VideoCursorPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.only(*VideoListSerializer.Meta.fields)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return VideoListSerializer
+        return super().get_serializer_class()
+
+    def get_permissions(self):
+        if self.action == 'stream' and settings.VIDEO_STREAM_REQUIRE_AUTH:
+            return [IsAuthenticated()]
+        return super().get_permissions()
+
+    def perform_destroy(self, instance):
+        release_video_file(instance)
+        instance.delete()
+
+    @action(detail=True, methods=['get'], renderer_classes=[JSONRenderer, PassthroughRenderer])
+    def stream(self, request, pk=None):
+        # Oynatıcı ileri sarınca yalnızca istenen aralık okunur (Range/206)
+        video = self.get_object()
+        if not video.video_file or not video.video_file.storage.exists(video.video_file.name):
+            return Response({"error": "Video dosyası bulunamadı"}, status=status.HTTP_404_NOT_FOUND)
+        return stream_file(request, video.video_file.path, name=video.video_file.name)
+
     @action(detail=True, methods=['post'])
     def start_analysis(self, request, pk=None):
         video = self.get_object()
@@ -36,22 +87,48 @@ class VideoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Yeni bir analiz işi oluştur
-        analysis_job = AnalysisJob.objects.create(
-            video=video,
-            status='pending',
-            job_id=str(uuid.uuid4())
-        )
-        
-        # TODO: Burada gerçek analiz işlemi başlatılacak
-        # Şimdilik sadece iş durumunu güncelle
-        analysis_job.status = 'processing'
-        analysis_job.save()
+        bulk = str(request.data.get('bulk', '')).lower() in ('1', 'true', 'yes')
+        with transaction.atomic():
+            # Aynı video için eşzamanlı istekler sıraya girsin
+            Video.objects.select_for_update().filter(pk=video.pk).first()
+
+            # Devam eden bir iş varsa yenisini açma, onu döndür. Uzun süredir ilerleme
+            # kaydetmeyen işler (çöken worker) engel olmasın diye başarısız sayılır
+            now = timezone.now()
+            stale_before = now - timedelta(seconds=settings.ANALYSIS_JOB_STALE_SECONDS)
+            active = video.analysis_jobs.filter(status__in=ACTIVE_JOB_STATUSES)
+            active.filter(updated_at__lt=stale_before).update(
+                status='failed', error_message='İş zaman aşımına uğradı (worker yanıt vermiyor)',
+                completed_at=now, updated_at=now,
+            )
+            running = active.filter(updated_at__gte=stale_before).order_by('-created_at').first()
+            if running is not None:
+                return Response(
+                    {
+                        "message": "Video analizi zaten devam ediyor",
+                        "job_id": running.job_id
+                    },
+                    status=status.HTTP_200_OK
+                )
+
+            # Yeni bir analiz işi oluştur
+            analysis_job = AnalysisJob.objects.create(
+                video=video,
+                status='pending',
+                job_id=str(uuid.uuid4())
+            )
+            priority = analysis_priority(video, bulk)
+
+            # Görev, iş kaydı commit edildikten sonra kuyruğa alınır
+            transaction.on_commit(lambda: enqueue_analysis(
+                video, analysis_job, request.data.get('model'), bulk
+            ))
         
         return Response(
             {
                 "message": "Video analizi başlatıldı",
-                "job_id": analysis_job.job_id
+                "job_id": analysis_job.job_id,
+                "priority": priority
             },
             status=status.HTTP_202_ACCEPTED
         )
@@ -59,11 +136,12 @@ class VideoViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def analysis_status(self, request, pk=None):
         video = self.get_object()
-        analysis_job = get_object_or_404(AnalysisJob, video=video)
+        analysis_job = video.analysis_jobs.order_by('-created_at').first()
+        if analysis_job is None:
+            return Response({"error": "Analiz işi bulunamadı"}, status=status.HTTP_404_NOT_FOUND)
         
         return Response({
-            "status": analysis_job.status,
-            "progress": analysis_job.progress,
+            **job_snapshot(analysis_job),
             "created_at": analysis_job.created_at,
             "completed_at": analysis_job.completed_at
         })
@@ -75,13 +153,38 @@ class AnalysisResultViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['video']
 
 class InappropriateContentViewSet(viewsets.ModelViewSet):
-    queryset = InappropriateContent.objects.all()
+    # ?video=&category=&content_type= ile süzülür, videoda zaman sırasıyla
+    queryset = InappropriateContent.objects.order_by('video', 'start', 'id')
     serializer_class = InappropriateContentSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['video', 'content_type', 'category', 'segment']
 
 class TranscriptViewSet(viewsets.ModelViewSet):
     queryset = Transcript.objects.all()
     serializer_class = TranscriptSerializer
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        # ?q=kelime "tam öbek" -> alaka sırasına göre videolar ve eşleşen segmentler
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "q parametresi gerekli"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+        except ValueError:
+            return Response({"error": "Geçersiz limit/offset"}, status=status.HTTP_400_BAD_REQUEST)
+        results = search_transcripts(query, limit=limit, offset=offset,
+                                     snippets=settings.TRANSCRIPT_SEARCH_SNIPPETS)
+        return Response({"query": query, "limit": limit, "offset": offset, "results": results})
+
+class TranscriptSegmentViewSet(viewsets.ReadOnlyModelViewSet):
+    # Zaman damgalı segmentler; ?video= veya ?transcript= ile süzülür, başlangıca göre sıralı
+    queryset = TranscriptSegment.objects.order_by('start')
+    serializer_class = TranscriptSegmentSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['video', 'transcript']
+
 class AnalysisJobViewSet(viewsets.ModelViewSet):
     queryset = AnalysisJob.objects.all()
     serializer_class = AnalysisJobSerializer
@@ -0,0 +1,113 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from celery.signals import task_postrun, worker_process_init
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def model_size_bytes(model):
+    # Parametre ve tamponların kapladığı bellek (yaklaşık)
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ModelRegistry:
+    """Worker süreci başına Whisper modellerini bir kez yükleyip saklar.
+
+    Modeller ilk kullanımda yüklenir. Toplam boyut bellek bütçesini aşarsa
+    en uzun süredir kullanılmayan modeller atılır; belirli bir süre
+    kullanılmayan modeller de bir sonraki erişimde boşaltılır.
+    """
+
+    def __init__(self, memory_budget_mb, idle_seconds, loader=None):
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.idle_seconds = idle_seconds
+        self._loader = loader
+        self._models = OrderedDict()  # name -> (model, size, last_used)
+        self._lock = threading.Lock()
+        self.metrics = {'loads': 0, 'hits': 0, 'evictions': 0, 'load_seconds': 0.0}
+
+    def _load(self, name):
+        if self._loader is not None:
+            return self._loader(name)
+        import whisper
+        return whisper.load_model(name)
+
+    def get(self, name=None):
+        name = name or settings.WHISPER_DEFAULT_MODEL
+        with self._lock:
+            self._evict_idle()
+            entry = self._models.get(name)
+            if entry is not None:
+                self._models[name] = (entry[0], entry[1], time.monotonic())
+                self._models.move_to_end(name)
+                self.metrics['hits'] += 1
+                return entry[0]
+
+            start = time.monotonic()
+            model = self._load(name)
+            elapsed = time.monotonic() - start
+            size = model_size_bytes(model)
+            self.metrics['loads'] += 1
+            self.metrics['load_seconds'] += elapsed
+            logger.info('Whisper modeli yüklendi: %s (%.1f MB, %.1f s)', name, size / 2**20, elapsed)
+
+            self._evict_until(self.memory_budget - size)
+            self._models[name] = (model, size, time.monotonic())
+            return model
+
+    def _evict(self, name):
+        del self._models[name]
+        self.metrics['evictions'] += 1
+        logger.info('Whisper modeli bellekten atıldı: %s', name)
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    def _evict_until(self, limit):
+        while self._models and self.memory_used() > limit:
+            self._evict(next(iter(self._models)))
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        for name, (_, _, last_used) in list(self._models.items()):
+            if now - last_used > self.idle_seconds:
+                self._evict(name)
+
+    def memory_used(self):
+        return sum(size for _, size, _ in self._models.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                **self.metrics,
+                'loaded': list(self._models),
+                'memory_mb': round(self.memory_used() / 2**20, 1),
+                'memory_budget_mb': round(self.memory_budget / 2**20, 1),
+            }
+
+
+registry = ModelRegistry(settings.WHISPER_MODEL_MEMORY_MB, settings.WHISPER_MODEL_IDLE_SECONDS)
+
+
+@worker_process_init.connect
+def preload_default_model(**kwargs):
+    # Her worker süreci başlarken varsayılan modeli hazırla
+    if settings.WHISPER_PRELOAD:
+        registry.get()
+
+
+@task_postrun.connect
+def log_model_stats(sender=None, **kwargs):
+    # Worker filosunu boyutlandırmak için süreç başına yükleme/isabet metrikleri
+    if registry.metrics['loads']:
+        logger.info('whisper_models %s', registry.stats())
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'rest_framework',  # Django REST Framework
     'corsheaders',  # CORS headers for API
     'django_filters',  # Filtering support
+    'channels',  # WebSocket desteği
     'analyzer',
 ]
 
@@ -172,3 +173,76 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+
+# Whisper model ayarları (worker süreci başına)
+WHISPER_DEFAULT_MODEL = 'base'
+WHISPER_PRELOAD = True  # worker süreci başlarken varsayılan modeli yükle
+WHISPER_MODEL_MEMORY_MB = 2048  # süreç başına yüklü modellerin toplam bütçesi
+WHISPER_MODEL_IDLE_SECONDS = 600  # bu kadar kullanılmayan model boşaltılır
+
+# Yüklemede ffprobe'un kap başlığından okuyacağı en fazla bayt (kare çözülmez)
+VIDEO_PROBE_MAX_BYTES = 1024 * 1024
+
+# Video oynatma (Range/206). Tam yanıtlar wsgi.file_wrapper (sendfile) ile gider;
+# nginx arkasında VIDEO_STREAM_ACCEL_REDIRECT, MEDIA_ROOT'u gösteren `internal`
+# bir location'a (ör. '/protected-media/') ayarlanırsa gövdeyi nginx gönderir
+VIDEO_STREAM_CHUNK_SIZE = 512 * 1024
+VIDEO_STREAM_ACCEL_REDIRECT = ''
+VIDEO_STREAM_CACHE_CONTROL = 'private, max-age=3600'
+VIDEO_STREAM_REQUIRE_AUTH = False  # True ise yalnızca oturum açmış kullanıcılar izleyebilir
+
+# Transkript aramasında video başına döndürülen eşleşen segment sayısı
+TRANSCRIPT_SEARCH_SNIPPETS = 3
+
+# Transkript içerik taraması: sözlük terimleri tek bir Aho–Corasick otomatıyla
+# aranır, segmentler gruplar halinde puanlanır. Sözlük biçimi analyzer/lexicon.json
+CONTENT_LEXICON_PATH = ''  # boşsa varsayılan sözlük
+CONTENT_MIN_CONFIDENCE = 0.4  # bu güvenin altındaki segmentler kaydedilmez
+CONTENT_SCORE_BATCH = 1000  # tek taramada birleştirilen segment sayısı
+
+# Çözülmüş ses (16 kHz mono float32) bu boyuta kadar bellekte tutulur, üstü geçici dosyaya yazılır
+AUDIO_IN_MEMORY_MAX_MB = 512
+
+# Uzun videolar sessiz noktalardan parçalara bölünüp paralel yazıya dökülür
+TRANSCRIPTION_CHUNK_SECONDS = 300  # hedef parça uzunluğu
+TRANSCRIPTION_SILENCE_SEARCH_SECONDS = 30  # bölme noktası için hedefin iki yanında aranan pencere
+TRANSCRIPTION_CHUNK_OVERLAP_SECONDS = 2  # komşu parçaların örtüşmesi (kelime kesilmesin)
+
+# Celery kuyrukları: ucuz ffmpeg işleri (probe, sessizlik taraması, birleştirme) ile
+# CPU ağırlıklı Whisper işleri ayrı worker'larda çalışır ki transkripsiyon diğerlerini aç bırakmasın:
+#   celery -A config worker -Q media -c 4
+#   celery -A config worker -Q whisper -c 1
+CELERY_TASK_DEFAULT_QUEUE = 'media'
+CELERY_TASK_ROUTES = {
+    'analyzer.tasks.transcribe_chunk': {'queue': 'whisper'},
+    'analyzer.tasks.*': {'queue': 'media'},
+}
+# Redis'te öncelik alt kuyruklarla sağlanır; 0 en yüksek öncelik
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+}
+CELERY_TASK_DEFAULT_PRIORITY = 5
+# Aynı anda yalnızca bir görev önceden alınır; uzun görevler kısa olanları bekletmez
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Analiz önceliği: kısa videolar önce, toplu (bulk) işler en son
+ANALYSIS_PRIORITY_SHORT_SECONDS = 120
+ANALYSIS_PRIORITY_MEDIUM_SECONDS = 900
+ANALYSIS_PRIORITY_BYTES_PER_SECOND = 250_000  # süre bilinmiyorsa dosya boyutundan tahmin
+
+# Channels: worker'lar ilerlemeyi Redis kanal katmanı üzerinden soketlere iletir
+ASGI_APPLICATION = 'config.asgi.application'
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {'hosts': [('localhost', 6379)]},
+    },
+}
+# Bu kadar saniye ilerleme kaydetmeyen bekleyen/çalışan iş çökmüş sayılır; aynı video
+# yeniden analize gönderildiğinde 'failed' işaretlenir ve yeni iş açılır
+ANALYSIS_JOB_STALE_SECONDS = 2 * 3600
+ANALYSIS_PROGRESS_INTERVAL = 1.0  # worker başına en sık ilerleme yazma/yayınlama aralığı (saniye)
+ANALYSIS_PROGRESS_SOCKET_INTERVAL = 0.25  # soket başına en sık ilerleme mesajı aralığı (saniye)
+ANALYSIS_STREAM_MAX_SUBSCRIPTIONS = 500  # ws/analysis/ bağlantısı başına izlenebilecek iş sayısı